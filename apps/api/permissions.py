@@ -3,6 +3,8 @@ Permisos personalizados para la API REST.
 """
 from rest_framework import permissions
 
+from apps.core import alcance
+
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """
@@ -54,11 +56,8 @@ class EmpresaAnclaPermission(permissions.BasePermission):
         return request.user.rol in ['ADMIN', 'EMPRESA_ANCLA']
 
     def has_object_permission(self, request, view, obj):
-        if request.user.rol == 'ADMIN':
-            return True
-
         # Verificar si el usuario pertenece a esta empresa
-        return obj.usuarios_empresa.filter(usuario=request.user).exists()
+        return alcance.obtener(request.user).puede_empresa(obj.pk)
 
 
 class ProyectoPermission(permissions.BasePermission):
@@ -72,24 +71,19 @@ class ProyectoPermission(permissions.BasePermission):
         return True
 
     def has_object_permission(self, request, view, obj):
-        user = request.user
-
-        if user.rol == 'ADMIN':
-            return True
-
-        # Consultor líder del proyecto
-        if obj.consultor_lider == user:
-            return True
+        # Director, consultor asignado, usuario de la empresa ancla o proveedor del proyecto
+        return alcance.obtener(request.user).puede_proyecto(obj.pk)
 
-        # Usuario de la empresa ancla
-        if obj.empresa_ancla.usuarios_empresa.filter(usuario=user).exists():
-            return True
 
-        # Proveedor del proyecto
-        if obj.proveedores_proyecto.filter(proveedor__usuario_principal=user).exists():
-            return True
+class AdminPermission(permissions.BasePermission):
+    """
+    Permiso solo para administradores.
+    """
 
-        return False
+    def has_permission(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return False
+        return request.user.rol == 'ADMIN'
 
 
 class ConsultorPermission(permissions.BasePermission):
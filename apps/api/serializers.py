@@ -2,6 +2,7 @@
 Serializadores para la API REST.
 """
 from rest_framework import serializers
+from django.db.models import Sum
 from apps.core.models import Usuario
 from apps.empresas.models import EmpresaAncla, UsuarioEmpresaAncla
 from apps.proveedores.models import Proveedor, ProveedorEmpresaAncla, DocumentoProveedor
@@ -10,9 +11,11 @@ from apps.etapas.models import (
     Etapa1Diagnostico, VozCliente, DiagnosticoCompetitividad, ObjetivoFortalecimiento,
     Etapa2Plan, HallazgoProblema, AccionMejora, CronogramaImplementacion,
     Etapa3Implementacion, TareaImplementacion, EvidenciaImplementacion, SesionAcompanamiento,
-    Etapa4Monitoreo, IndicadorKPI, MedicionKPI, ReporteSemanal, InformeCierre
+    Etapa4Monitoreo, IndicadorKPI, MedicionKPI, ReporteSemanal, InformeCierre,
+    IndiceBusqueda
 )
 from apps.talleres.models import Taller, SesionTaller, InscripcionTaller, AsistenciaTaller
+from apps.reportes.models import ResumenParticipacion, ResumenProyecto, ResumenEmpresa
 
 
 # =====================
@@ -60,15 +63,15 @@ class EmpresaAnclaSerializer(serializers.ModelSerializer):
     class Meta:
         model = EmpresaAncla
         fields = [
-            'id', 'nit', 'razon_social', 'nombre_comercial', 'sector',
+            'id', 'nit', 'nombre', 'razon_social', 'sector_economico',
             'direccion', 'ciudad', 'telefono', 'email', 'sitio_web',
-            'logo', 'is_active', 'fecha_vinculacion',
+            'logo', 'is_active', 'created_at',
             'total_proveedores', 'proyectos_activos'
         ]
-        read_only_fields = ['id', 'fecha_vinculacion']
+        read_only_fields = ['id', 'created_at']
 
     def get_total_proveedores(self, obj):
-        return obj.proveedores_empresa.filter(is_active=True).count()
+        return obj.proveedores_vinculados.filter(estado='ACTIVO').count()
 
     def get_proyectos_activos(self, obj):
         return obj.proyectos.filter(estado='EN_CURSO').count()
@@ -79,7 +82,7 @@ class EmpresaAnclaListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = EmpresaAncla
-        fields = ['id', 'nit', 'razon_social', 'nombre_comercial', 'sector', 'is_active']
+        fields = ['id', 'nit', 'nombre', 'razon_social', 'sector_economico', 'is_active']
 
 
 # =====================
@@ -131,7 +134,7 @@ class ProyectoSerializer(serializers.ModelSerializer):
         source='empresa_ancla.razon_social', read_only=True
     )
     consultor_nombre = serializers.CharField(
-        source='consultor_lider.get_full_name', read_only=True
+        source='director_proyecto.get_full_name', read_only=True
     )
     total_proveedores = serializers.SerializerMethodField()
     progreso_general = serializers.SerializerMethodField()
@@ -140,22 +143,18 @@ class ProyectoSerializer(serializers.ModelSerializer):
         model = Proyecto
         fields = [
             'id', 'codigo', 'nombre', 'descripcion', 'empresa_ancla',
-            'empresa_ancla_nombre', 'consultor_lider', 'consultor_nombre',
-            'fecha_inicio', 'fecha_fin_estimada', 'fecha_fin_real',
+            'empresa_ancla_nombre', 'director_proyecto', 'consultor_nombre',
+            'fecha_inicio', 'fecha_fin_planeada', 'fecha_fin_real',
             'estado', 'presupuesto', 'total_proveedores', 'progreso_general',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'codigo', 'created_at', 'updated_at']
 
     def get_total_proveedores(self, obj):
-        return obj.proveedores_proyecto.count()
+        return obj.proveedores.count()
 
     def get_progreso_general(self, obj):
-        proveedores = obj.proveedores_proyecto.all()
-        if not proveedores:
-            return 0
-        total_progreso = sum(p.progreso_general for p in proveedores)
-        return round(total_progreso / proveedores.count(), 2)
+        return round(obj.avance_promedio, 2)
 
 
 class ProyectoListSerializer(serializers.ModelSerializer):
@@ -166,7 +165,7 @@ class ProyectoListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Proyecto
-        fields = ['id', 'codigo', 'nombre', 'empresa_ancla_nombre', 'estado', 'fecha_inicio', 'fecha_fin_estimada']
+        fields = ['id', 'codigo', 'nombre', 'empresa_ancla_nombre', 'estado', 'fecha_inicio', 'fecha_fin_planeada']
 
 
 class ProveedorProyectoSerializer(serializers.ModelSerializer):
@@ -189,11 +188,10 @@ class ProveedorProyectoSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'proyecto', 'proyecto_nombre', 'proveedor', 'proveedor_nombre',
             'consultor_asignado', 'etapa_actual', 'etapa_display', 'estado',
-            'estado_display', 'fecha_inicio', 'fecha_fin', 'progreso_general',
-            'progreso_etapa1', 'progreso_etapa2', 'progreso_etapa3', 'progreso_etapa4',
-            'observaciones'
+            'estado_display', 'fecha_inicio', 'fecha_fin_planeada', 'fecha_fin_real',
+            'porcentaje_avance', 'horas_planeadas', 'horas_consumidas', 'notas'
         ]
-        read_only_fields = ['id', 'fecha_inicio', 'progreso_general']
+        read_only_fields = ['id', 'fecha_inicio', 'porcentaje_avance', 'horas_consumidas']
 
 
 # =====================
@@ -320,7 +318,7 @@ class IndicadorKPISerializer(serializers.ModelSerializer):
     class Meta:
         model = IndicadorKPI
         fields = '__all__'
-        read_only_fields = ['id', 'created_at']
+        read_only_fields = ['id', 'created_at', 'valor_actual', 'tendencia', 'pendiente', 'ventana_tendencia']
 
 
 class MedicionKPISerializer(serializers.ModelSerializer):
@@ -355,7 +353,7 @@ class TallerSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_inscritos_count(self, obj):
-        return obj.inscripciones.filter(estado='CONFIRMADA').count()
+        return obj.sesiones.aggregate(total=Sum('cupos_ocupados'))['total'] or 0
 
 
 class TallerListSerializer(serializers.ModelSerializer):
@@ -363,25 +361,23 @@ class TallerListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Taller
-        fields = ['id', 'nombre', 'tipo', 'modalidad', 'cupo_maximo', 'estado', 'fecha_inicio']
+        fields = ['id', 'nombre', 'tipo', 'modalidad', 'capacidad_maxima', 'is_active', 'created_at']
 
 
 class SesionTallerSerializer(serializers.ModelSerializer):
     """Serializador para Sesión de Taller."""
+    cupos_disponibles = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = SesionTaller
         fields = '__all__'
-        read_only_fields = ['id']
+        read_only_fields = ['id', 'cupos_ocupados']
 
 
 class InscripcionTallerSerializer(serializers.ModelSerializer):
     """Serializador para Inscripción a Taller."""
-    usuario_nombre = serializers.CharField(
-        source='usuario.get_full_name', read_only=True
-    )
     taller_nombre = serializers.CharField(
-        source='taller.nombre', read_only=True
+        source='sesion.taller.nombre', read_only=True
     )
 
     class Meta:
@@ -390,6 +386,15 @@ class InscripcionTallerSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'fecha_inscripcion']
 
 
+class SolicitudInscripcionSerializer(serializers.Serializer):
+    """Solicitud de inscripción a una sesión de taller."""
+    sesion = serializers.UUIDField()
+    proveedor = serializers.UUIDField(required=False)
+    participante_nombre = serializers.CharField(required=False, max_length=200)
+    participante_email = serializers.EmailField(required=False)
+    participante_cargo = serializers.CharField(required=False, allow_blank=True, max_length=100)
+
+
 class AsistenciaTallerSerializer(serializers.ModelSerializer):
     """Serializador para Asistencia a Taller."""
 
@@ -399,6 +404,97 @@ class AsistenciaTallerSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
+class RegistroAsistenciaSerializer(serializers.Serializer):
+    """Fila de la planilla de asistencia de una sesión."""
+    inscripcion = serializers.UUIDField()
+    asistio = serializers.BooleanField(default=True)
+    hora_entrada = serializers.TimeField(required=False, allow_null=True)
+    hora_salida = serializers.TimeField(required=False, allow_null=True)
+    observaciones = serializers.CharField(required=False, allow_blank=True)
+
+
+class PlanillaAsistenciaSerializer(serializers.Serializer):
+    """Planilla completa de asistencia en un solo envío."""
+    registros = RegistroAsistenciaSerializer(many=True, allow_empty=False)
+    finalizar = serializers.BooleanField(default=False)
+
+
+class LecturaQRSerializer(serializers.Serializer):
+    """Lectura de QR de check-in (el QR codifica el ID de la inscripción)."""
+    inscripcion = serializers.UUIDField()
+    hora = serializers.TimeField(required=False, allow_null=True)
+
+
+class CheckinQRSerializer(serializers.Serializer):
+    """Lote de lecturas de QR, posiblemente acumuladas sin conexión."""
+    lecturas = LecturaQRSerializer(many=True, allow_empty=False)
+
+
+# =====================
+# Resúmenes Analíticos Serializers
+# =====================
+
+class ResumenParticipacionSerializer(serializers.ModelSerializer):
+    """Serializador para resúmenes precalculados de participación."""
+    proveedor_nombre = serializers.CharField(source='proveedor.razon_social', read_only=True)
+    proyecto_nombre = serializers.CharField(source='proyecto.nombre', read_only=True)
+    porcentaje_horas = serializers.DecimalField(max_digits=7, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = ResumenParticipacion
+        fields = '__all__'
+
+
+class ResumenProyectoSerializer(serializers.ModelSerializer):
+    """Serializador para resúmenes precalculados de proyecto."""
+    proyecto_nombre = serializers.CharField(source='proyecto.nombre', read_only=True)
+    porcentaje_horas = serializers.DecimalField(max_digits=7, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = ResumenProyecto
+        fields = '__all__'
+
+
+class ResumenEmpresaSerializer(serializers.ModelSerializer):
+    """Serializador para resúmenes precalculados de empresa ancla."""
+    empresa_nombre = serializers.CharField(source='empresa_ancla.nombre', read_only=True)
+    porcentaje_horas = serializers.DecimalField(max_digits=7, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = ResumenEmpresa
+        fields = '__all__'
+
+
+# =====================
+# Búsqueda Serializers
+# =====================
+
+class IndiceBusquedaSerializer(serializers.ModelSerializer):
+    """Serializador para resultados de la búsqueda global."""
+    tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
+    proveedor = serializers.CharField(
+        source='proveedor_proyecto.proveedor.razon_social', read_only=True
+    )
+    proyecto = serializers.CharField(source='proveedor_proyecto.proyecto.nombre', read_only=True)
+    enlace = serializers.SerializerMethodField()
+
+    class Meta:
+        model = IndiceBusqueda
+        fields = [
+            'tipo', 'tipo_display', 'objeto_id', 'titulo', 'resumen',
+            'proveedor_proyecto', 'proveedor', 'proyecto', 'enlace', 'actualizado'
+        ]
+
+    def get_enlace(self, obj):
+        from django.urls import reverse
+        from apps.etapas.busqueda import ETAPA_POR_TIPO
+
+        etapa = ETAPA_POR_TIPO.get(obj.tipo)
+        if not etapa:
+            return ''
+        return reverse(f'etapas:etapa{etapa}_detalle', kwargs={'pk': obj.proveedor_proyecto_id})
+
+
 # =====================
 # Dashboard Serializers
 # =====================
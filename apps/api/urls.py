@@ -20,6 +20,8 @@ from .viewsets import (
     EvidenciaImplementacionViewSet, SesionAcompanamientoViewSet,
     Etapa4MonitoreoViewSet, IndicadorKPIViewSet, MedicionKPIViewSet, InformeCierreViewSet,
     TallerViewSet, SesionTallerViewSet, InscripcionTallerViewSet, AsistenciaTallerViewSet,
+    ResumenParticipacionViewSet, ResumenProyectoViewSet, ResumenEmpresaViewSet, ImpactoViewSet,
+    BusquedaViewSet, CalendarioViewSet, InstrumentacionViewSet,
 )
 
 app_name = 'api'
@@ -63,6 +65,21 @@ router.register(r'sesiones-taller', SesionTallerViewSet, basename='sesion-taller
 router.register(r'inscripciones-taller', InscripcionTallerViewSet, basename='inscripcion-taller')
 router.register(r'asistencias-taller', AsistenciaTallerViewSet, basename='asistencia-taller')
 
+# Resúmenes analíticos
+router.register(r'resumenes/participaciones', ResumenParticipacionViewSet, basename='resumen-participacion')
+router.register(r'resumenes/proyectos', ResumenProyectoViewSet, basename='resumen-proyecto')
+router.register(r'resumenes/empresas', ResumenEmpresaViewSet, basename='resumen-empresa')
+router.register(r'impacto', ImpactoViewSet, basename='impacto')
+
+# Búsqueda global
+router.register(r'busqueda', BusquedaViewSet, basename='busqueda')
+
+# Agenda de sesiones
+router.register(r'calendario', CalendarioViewSet, basename='calendario')
+
+# Instrumentación por petición
+router.register(r'instrumentacion', InstrumentacionViewSet, basename='instrumentacion')
+
 urlpatterns = [
     # JWT Authentication
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
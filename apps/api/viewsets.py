@@ -1,23 +1,41 @@
 """
 ViewSets para la API REST.
 """
+import uuid
+from datetime import timedelta
+
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
 
 from apps.core.models import Usuario
+from apps.core import alcance, calendario, instrumentacion
 from apps.empresas.models import EmpresaAncla
 from apps.proveedores.models import Proveedor, DocumentoProveedor
+from apps.proveedores.snapshot import obtener_snapshot
 from apps.proyectos.models import Proyecto, ProveedorProyecto
 from apps.etapas.models import (
     Etapa1Diagnostico, VozCliente, DiagnosticoCompetitividad, ObjetivoFortalecimiento,
     Etapa2Plan, HallazgoProblema, AccionMejora,
     Etapa3Implementacion, TareaImplementacion, EvidenciaImplementacion, SesionAcompanamiento,
-    Etapa4Monitoreo, IndicadorKPI, MedicionKPI, InformeCierre
+    Etapa4Monitoreo, IndicadorKPI, MedicionKPI, InformeCierre, RUTAS_PROVEEDOR_PROYECTO
 )
+from apps.etapas.busqueda import buscar, LONGITUD_MINIMA, LIMITE_RESULTADOS
+from apps.etapas import sla
 from apps.talleres.models import Taller, SesionTaller, InscripcionTaller, AsistenciaTaller
+from apps.talleres.tasks import generar_certificados_sesion
+from apps.talleres import asistencia, inscripciones, satisfaccion
+from apps.reportes.models import ResumenParticipacion, ResumenProyecto, ResumenEmpresa
+from apps.reportes.services import obtener_resumen_empresa, obtener_resumen_proyecto
+from apps.reportes.benchmarking import COHORTES, benchmark_cohorte, benchmark_participacion
+from apps.reportes import burndown, impacto
 
 from .serializers import (
     UsuarioSerializer, UsuarioCreateSerializer,
@@ -30,9 +48,86 @@ from .serializers import (
     EvidenciaImplementacionSerializer, SesionAcompanamientoSerializer,
     Etapa4MonitoreoSerializer, IndicadorKPISerializer, MedicionKPISerializer,
     InformeCierreSerializer, TallerSerializer, TallerListSerializer,
-    SesionTallerSerializer, InscripcionTallerSerializer, AsistenciaTallerSerializer
+    SesionTallerSerializer, InscripcionTallerSerializer, AsistenciaTallerSerializer,
+    PlanillaAsistenciaSerializer, CheckinQRSerializer, SolicitudInscripcionSerializer,
+    IndiceBusquedaSerializer,
+    ResumenParticipacionSerializer, ResumenProyectoSerializer, ResumenEmpresaSerializer
+)
+from .permissions import (
+    IsAdminOrReadOnly, IsOwnerOrAdmin, EmpresaAnclaPermission, ProyectoPermission, ConsultorPermission,
+    AdminPermission
 )
-from .permissions import IsAdminOrReadOnly, IsOwnerOrAdmin, EmpresaAnclaPermission
+
+
+def parametro_uuid(request, nombre):
+    """
+    UUID de un parámetro de consulta (None si no viene).
+
+    Raises:
+        ValidationError: Si el valor no es un UUID (respuesta 400)
+    """
+    valor = request.query_params.get(nombre)
+    if not valor:
+        return None
+    try:
+        return uuid.UUID(valor)
+    except ValueError:
+        raise ValidationError({nombre: 'Identificador no válido.'})
+
+
+class AlcanceMixin:
+    """
+    Acota el queryset al alcance de acceso del usuario (``apps.core.alcance``).
+
+    ``ruta_participacion`` es la ruta desde el modelo hasta ProveedorProyecto
+    (por defecto la de ``RUTAS_PROVEEDOR_PROYECTO``); el filtro se resuelve en
+    SQL como ``proyecto_id IN (...) OR proveedor_id IN (...)`` sobre la
+    participación unida, usando los índices de las claves foráneas. Al crear
+    o modificar se verifica que la participación de destino también esté en
+    el alcance. Los modelos que cuelgan de un proveedor y no de una
+    participación indican ``ruta_proveedor``.
+    """
+    ruta_participacion = None
+    ruta_proveedor = None
+
+    def get_ruta_participacion(self):
+        if self.ruta_participacion is None:
+            return RUTAS_PROVEEDOR_PROYECTO.get(self.queryset.model)
+        return self.ruta_participacion
+
+    def get_queryset(self):
+        alcance_usuario = alcance.obtener(self.request.user)
+        if self.ruta_proveedor:
+            return alcance_usuario.filtrar_por_proveedor(super().get_queryset(), self.ruta_proveedor)
+        return alcance_usuario.filtrar(super().get_queryset(), self.get_ruta_participacion())
+
+    def _verificar_alcance(self, serializer):
+        datos = serializer.validated_data
+        ruta = self.get_ruta_participacion()
+        if ruta:
+            segmentos = ruta.split('__')
+            participacion = datos.get(segmentos[0])
+            for segmento in segmentos[1:]:
+                participacion = getattr(participacion, segmento, None)
+            if participacion is None:
+                return
+            proyecto_id, proveedor_id = participacion.proyecto_id, participacion.proveedor_id
+        elif 'proyecto' in datos or 'proveedor' in datos:
+            instancia = serializer.instance
+            proyecto_id = datos['proyecto'].pk if 'proyecto' in datos else instancia.proyecto_id
+            proveedor_id = datos['proveedor'].pk if 'proveedor' in datos else instancia.proveedor_id
+        else:
+            return
+        if not alcance.obtener(self.request.user).puede_participacion(proyecto_id, proveedor_id):
+            raise PermissionDenied('La participación está fuera de su alcance.')
+
+    def perform_create(self, serializer):
+        self._verificar_alcance(serializer)
+        super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        self._verificar_alcance(serializer)
+        super().perform_update(serializer)
 
 
 # =====================
@@ -80,7 +175,7 @@ class EmpresaAnclaViewSet(viewsets.ModelViewSet):
     queryset = EmpresaAncla.objects.all()
     permission_classes = [IsAuthenticated, EmpresaAnclaPermission]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['sector', 'is_active']
+    filterset_fields = ['sector_economico', 'is_active']
     search_fields = ['nit', 'razon_social', 'nombre_comercial']
     ordering_fields = ['razon_social', 'fecha_vinculacion']
     ordering = ['razon_social']
@@ -91,13 +186,8 @@ class EmpresaAnclaViewSet(viewsets.ModelViewSet):
         return EmpresaAnclaSerializer
 
     def get_queryset(self):
-        """Filtrar empresas según rol del usuario."""
-        user = self.request.user
-        if user.rol == 'ADMIN':
-            return EmpresaAncla.objects.all()
-        return EmpresaAncla.objects.filter(
-            usuarios_empresa__usuario=user
-        ).distinct()
+        """Filtrar empresas según el alcance del usuario."""
+        return alcance.obtener(self.request.user).filtrar(EmpresaAncla.objects.all())
 
     @action(detail=True, methods=['get'])
     def proveedores(self, request, pk=None):
@@ -120,27 +210,13 @@ class EmpresaAnclaViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def dashboard(self, request, pk=None):
-        """Dashboard de la empresa."""
+        """Dashboard de la empresa (lee el resumen analítico precalculado)."""
         empresa = self.get_object()
-
-        # Estadísticas
-        proveedores_activos = empresa.proveedores_empresa.filter(is_active=True).count()
-        proyectos_activos = empresa.proyectos.filter(estado='EN_CURSO').count()
-        proyectos_finalizados = empresa.proyectos.filter(estado='FINALIZADO').count()
-
-        # Distribución por etapas
-        distribucion = {}
-        for proyecto in empresa.proyectos.filter(estado='EN_CURSO'):
-            for pp in proyecto.proveedores_proyecto.all():
-                etapa = pp.get_etapa_actual_display()
-                distribucion[etapa] = distribucion.get(etapa, 0) + 1
+        resumen = obtener_resumen_empresa(empresa)
 
         return Response({
             'empresa': EmpresaAnclaSerializer(empresa).data,
-            'total_proveedores': proveedores_activos,
-            'proyectos_activos': proyectos_activos,
-            'proyectos_finalizados': proyectos_finalizados,
-            'distribucion_etapas': distribucion
+            'resumen': ResumenEmpresaSerializer(resumen).data if resumen else None,
         })
 
 
@@ -153,9 +229,9 @@ class ProveedorViewSet(viewsets.ModelViewSet):
     queryset = Proveedor.objects.all()
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['sector', 'tamano', 'ciudad', 'is_active']
+    filterset_fields = ['sector_economico', 'tamano_empresa', 'ciudad']
     search_fields = ['nit', 'razon_social', 'nombre_comercial']
-    ordering_fields = ['razon_social', 'fecha_registro']
+    ordering_fields = ['razon_social', 'created_at']
     ordering = ['razon_social']
 
     def get_serializer_class(self):
@@ -164,17 +240,8 @@ class ProveedorViewSet(viewsets.ModelViewSet):
         return ProveedorSerializer
 
     def get_queryset(self):
-        """Filtrar proveedores según rol del usuario."""
-        user = self.request.user
-        if user.rol == 'ADMIN':
-            return Proveedor.objects.all()
-        elif user.rol == 'EMPRESA_ANCLA':
-            return Proveedor.objects.filter(
-                proveedores_empresa__empresa_ancla__usuarios_empresa__usuario=user
-            ).distinct()
-        elif user.rol == 'PROVEEDOR':
-            return Proveedor.objects.filter(usuario_principal=user)
-        return Proveedor.objects.none()
+        """Filtrar proveedores según el alcance del usuario."""
+        return alcance.obtener(self.request.user).filtrar(Proveedor.objects.all())
 
     @action(detail=True, methods=['get'])
     def documentos(self, request, pk=None):
@@ -194,6 +261,28 @@ class ProveedorViewSet(viewsets.ModelViewSet):
         serializer = ProveedorProyectoSerializer(proyectos_proveedor, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def snapshot(self, request, pk=None):
+        """
+        Vista 360° del proveedor (vinculaciones, participaciones y etapas con
+        sus registros), acotada al alcance del usuario y servida desde caché
+        mientras la marca de agua no cambie. Responde 304 si coincide
+        ``If-None-Match``.
+        """
+        proveedor = self.get_object()
+        conocidas = [etag.strip('"') for etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))]
+        snapshot, marca = obtener_snapshot(
+            proveedor, request.user, alcance.obtener(request.user), conocidas=conocidas
+        )
+        etag = quote_etag(marca)
+        if snapshot is None:
+            respuesta = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            respuesta = Response(snapshot)
+        respuesta['ETag'] = etag
+        respuesta['Cache-Control'] = 'private, no-cache'
+        return respuesta
+
 
 class DocumentoProveedorViewSet(viewsets.ModelViewSet):
     """ViewSet para gestión de documentos de proveedores."""
@@ -211,9 +300,9 @@ class DocumentoProveedorViewSet(viewsets.ModelViewSet):
 class ProyectoViewSet(viewsets.ModelViewSet):
     """ViewSet para gestión de Proyectos."""
     queryset = Proyecto.objects.all()
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, ProyectoPermission]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['empresa_ancla', 'estado', 'consultor_lider']
+    filterset_fields = ['empresa_ancla', 'estado', 'director_proyecto']
     search_fields = ['codigo', 'nombre']
     ordering_fields = ['fecha_inicio', 'nombre', 'created_at']
     ordering = ['-fecha_inicio']
@@ -224,21 +313,8 @@ class ProyectoViewSet(viewsets.ModelViewSet):
         return ProyectoSerializer
 
     def get_queryset(self):
-        """Filtrar proyectos según rol del usuario."""
-        user = self.request.user
-        if user.rol == 'ADMIN':
-            return Proyecto.objects.all()
-        elif user.rol == 'EMPRESA_ANCLA':
-            return Proyecto.objects.filter(
-                empresa_ancla__usuarios_empresa__usuario=user
-            ).distinct()
-        elif user.rol == 'CONSULTOR':
-            return Proyecto.objects.filter(consultor_lider=user)
-        elif user.rol == 'PROVEEDOR':
-            return Proyecto.objects.filter(
-                proveedores_proyecto__proveedor__usuario_principal=user
-            ).distinct()
-        return Proyecto.objects.none()
+        """Filtrar proyectos según el alcance del usuario."""
+        return alcance.obtener(self.request.user).filtrar(Proyecto.objects.all())
 
     @action(detail=True, methods=['get'])
     def proveedores(self, request, pk=None):
@@ -249,33 +325,38 @@ class ProyectoViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
-    def dashboard(self, request, pk=None):
-        """Dashboard del proyecto."""
+    def burndown(self, request, pk=None):
+        """Burn-down del presupuesto de horas y pronóstico de agotamiento."""
         proyecto = self.get_object()
+        data = burndown.burndown_proyecto(proyecto)
+        if request.query_params.get('serie') == '0':
+            data = {clave: valor for clave, valor in data.items() if clave != 'serie'}
+        return Response(data)
 
-        # Distribución por etapas
-        proveedores_por_etapa = {
-            'Etapa 1': proyecto.proveedores_proyecto.filter(etapa_actual=1).count(),
-            'Etapa 2': proyecto.proveedores_proyecto.filter(etapa_actual=2).count(),
-            'Etapa 3': proyecto.proveedores_proyecto.filter(etapa_actual=3).count(),
-            'Etapa 4': proyecto.proveedores_proyecto.filter(etapa_actual=4).count(),
-        }
+    @action(detail=True, methods=['get'])
+    def dashboard(self, request, pk=None):
+        """Dashboard del proyecto (lee el resumen analítico precalculado)."""
+        proyecto = self.get_object()
+        resumen = obtener_resumen_proyecto(proyecto)
 
         # Tareas pendientes
         tareas_pendientes = TareaImplementacion.objects.filter(
-            implementacion__proveedor_proyecto__proyecto=proyecto,
+            etapa3__proveedor_proyecto__proyecto=proyecto,
             estado__in=['PENDIENTE', 'EN_PROGRESO']
         ).count()
+        tareas_vencidas = sla.tareas_vencidas().filter(
+            etapa3__proveedor_proyecto__proyecto=proyecto
+        ).count()
 
         return Response({
             'proyecto': ProyectoSerializer(proyecto).data,
-            'proveedores_por_etapa': proveedores_por_etapa,
+            'resumen': ResumenProyectoSerializer(resumen).data if resumen else None,
             'tareas_pendientes': tareas_pendientes,
-            'total_proveedores': proyecto.proveedores_proyecto.count()
+            'tareas_vencidas': tareas_vencidas,
         })
 
 
-class ProveedorProyectoViewSet(viewsets.ModelViewSet):
+class ProveedorProyectoViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para gestión de Proveedores en Proyectos."""
     queryset = ProveedorProyecto.objects.all()
     serializer_class = ProveedorProyectoSerializer
@@ -303,12 +384,37 @@ class ProveedorProyectoViewSet(viewsets.ModelViewSet):
             'mensaje': 'No es posible avanzar de etapa. Verifique el progreso actual.'
         }, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'])
+    def benchmarking(self, request, pk=None):
+        """Posición de la participación frente a su cohorte (sector, tamano o proyecto)."""
+        proveedor_proyecto = self.get_object()
+        cohorte = request.query_params.get('cohorte', 'sector')
+        if cohorte not in COHORTES:
+            return Response({
+                'error': f"Cohorte no válida. Opciones: {', '.join(COHORTES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response(benchmark_participacion(proveedor_proyecto, cohorte))
+
+    @action(detail=False, methods=['get'], url_path='benchmarking-cohorte',
+            permission_classes=[IsAuthenticated, ConsultorPermission])
+    def benchmarking_cohorte(self, request):
+        """Benchmark completo de una cohorte (solo administradores y consultores)."""
+        cohorte = request.query_params.get('cohorte', 'sector')
+        valor = request.query_params.get('valor')
+        if cohorte not in COHORTES or not valor:
+            return Response({
+                'error': f"Parámetros requeridos: cohorte ({', '.join(COHORTES)}) y valor"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if cohorte == 'proyecto':
+            valor = parametro_uuid(request, 'valor')
+        return Response(benchmark_cohorte(cohorte, valor))
+
 
 # =====================
 # Etapas ViewSets
 # =====================
 
-class Etapa1DiagnosticoViewSet(viewsets.ModelViewSet):
+class Etapa1DiagnosticoViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Etapa 1 - Diagnóstico."""
     queryset = Etapa1Diagnostico.objects.all()
     serializer_class = Etapa1DiagnosticoSerializer
@@ -317,25 +423,25 @@ class Etapa1DiagnosticoViewSet(viewsets.ModelViewSet):
     filterset_fields = ['proveedor_proyecto', 'estado']
 
 
-class VozClienteViewSet(viewsets.ModelViewSet):
+class VozClienteViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Voz del Cliente."""
     queryset = VozCliente.objects.all()
     serializer_class = VozClienteSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['diagnostico', 'categoria']
+    filterset_fields = ['etapa1']
 
 
-class DiagnosticoCompetitividadViewSet(viewsets.ModelViewSet):
+class DiagnosticoCompetitividadViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Diagnóstico de Competitividad."""
     queryset = DiagnosticoCompetitividad.objects.all()
     serializer_class = DiagnosticoCompetitividadSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['diagnostico', 'dimension', 'estado']
+    filterset_fields = ['etapa1', 'area_evaluada', 'nivel_madurez']
 
 
-class Etapa2PlanViewSet(viewsets.ModelViewSet):
+class Etapa2PlanViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Etapa 2 - Plan."""
     queryset = Etapa2Plan.objects.all()
     serializer_class = Etapa2PlanSerializer
@@ -344,25 +450,25 @@ class Etapa2PlanViewSet(viewsets.ModelViewSet):
     filterset_fields = ['proveedor_proyecto', 'estado']
 
 
-class HallazgoProblemaViewSet(viewsets.ModelViewSet):
+class HallazgoProblemaViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Hallazgos/Problemas."""
     queryset = HallazgoProblema.objects.all()
     serializer_class = HallazgoProblemaSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['plan', 'tipo', 'criticidad']
+    filterset_fields = ['etapa2', 'prioridad']
 
 
-class AccionMejoraViewSet(viewsets.ModelViewSet):
+class AccionMejoraViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Acciones de Mejora."""
     queryset = AccionMejora.objects.all()
     serializer_class = AccionMejoraSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['hallazgo', 'prioridad', 'estado']
+    filterset_fields = ['hallazgo', 'tipo_accion', 'seleccionada']
 
 
-class Etapa3ImplementacionViewSet(viewsets.ModelViewSet):
+class Etapa3ImplementacionViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Etapa 3 - Implementación."""
     queryset = Etapa3Implementacion.objects.all()
     serializer_class = Etapa3ImplementacionSerializer
@@ -371,16 +477,51 @@ class Etapa3ImplementacionViewSet(viewsets.ModelViewSet):
     filterset_fields = ['proveedor_proyecto', 'estado']
 
 
-class TareaImplementacionViewSet(viewsets.ModelViewSet):
+class TareaImplementacionViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Tareas de Implementación."""
     queryset = TareaImplementacion.objects.all()
     serializer_class = TareaImplementacionSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['implementacion', 'responsable', 'estado', 'prioridad']
+    filterset_fields = ['etapa3', 'responsable', 'estado', 'prioridad']
     search_fields = ['titulo']
-    ordering_fields = ['fecha_limite', 'prioridad', 'created_at']
-    ordering = ['fecha_limite']
+    ordering_fields = ['fecha_fin_planeada', 'prioridad', 'created_at']
+    ordering = ['fecha_fin_planeada']
+
+    def _acotar(self, tareas, request):
+        """Filtra por ?consultor= y ?proyecto= sobre la participación."""
+        consultor = parametro_uuid(request, 'consultor')
+        proyecto = parametro_uuid(request, 'proyecto')
+        if consultor:
+            tareas = tareas.filter(etapa3__proveedor_proyecto__consultor_asignado=consultor)
+        if proyecto:
+            tareas = tareas.filter(etapa3__proveedor_proyecto__proyecto=proyecto)
+        return tareas
+
+    @action(detail=False, methods=['get'])
+    def vencidas(self, request):
+        """Tareas abiertas con fecha fin planeada vencida (índice parcial)."""
+        tareas = sla.tareas_vencidas(tareas=self._acotar(self.get_queryset(), request))
+        tareas = tareas.select_related('responsable').order_by('fecha_fin_planeada')
+        page = self.paginate_queryset(tareas)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='vencidas/resumen')
+    def vencidas_resumen(self, request):
+        """Contador de tareas vencidas por consultor, responsable o proyecto."""
+        agrupacion = request.query_params.get('agrupacion', 'consultor')
+        try:
+            resultado = sla.contar_vencidas(
+                agrupacion, tareas=self._acotar(self.get_queryset(), request)
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'agrupacion': agrupacion,
+            'total': sum(fila['vencidas'] for fila in resultado),
+            'resultados': resultado,
+        })
 
     @action(detail=True, methods=['post'])
     def cambiar_estado(self, request, pk=None):
@@ -402,7 +543,7 @@ class TareaImplementacionViewSet(viewsets.ModelViewSet):
         })
 
 
-class EvidenciaImplementacionViewSet(viewsets.ModelViewSet):
+class EvidenciaImplementacionViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Evidencias de Implementación."""
     queryset = EvidenciaImplementacion.objects.all()
     serializer_class = EvidenciaImplementacionSerializer
@@ -411,17 +552,17 @@ class EvidenciaImplementacionViewSet(viewsets.ModelViewSet):
     filterset_fields = ['tarea', 'tipo']
 
 
-class SesionAcompanamientoViewSet(viewsets.ModelViewSet):
+class SesionAcompanamientoViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Sesiones de Acompañamiento."""
     queryset = SesionAcompanamiento.objects.all()
     serializer_class = SesionAcompanamientoSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['implementacion', 'tipo', 'estado']
-    ordering = ['-fecha_programada']
+    filterset_fields = ['etapa3', 'modalidad', 'consultor']
+    ordering = ['-fecha']
 
 
-class Etapa4MonitoreoViewSet(viewsets.ModelViewSet):
+class Etapa4MonitoreoViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Etapa 4 - Monitoreo."""
     queryset = Etapa4Monitoreo.objects.all()
     serializer_class = Etapa4MonitoreoSerializer
@@ -430,33 +571,304 @@ class Etapa4MonitoreoViewSet(viewsets.ModelViewSet):
     filterset_fields = ['proveedor_proyecto', 'estado']
 
 
-class IndicadorKPIViewSet(viewsets.ModelViewSet):
+class IndicadorKPIViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Indicadores KPI."""
     queryset = IndicadorKPI.objects.all()
     serializer_class = IndicadorKPISerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
-    filterset_fields = ['monitoreo', 'categoria', 'is_active']
+    filterset_fields = ['etapa4', 'objetivo', 'frecuencia_medicion', 'tendencia']
     search_fields = ['nombre', 'descripcion']
 
 
-class MedicionKPIViewSet(viewsets.ModelViewSet):
+class MedicionKPIViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Mediciones KPI."""
     queryset = MedicionKPI.objects.all()
     serializer_class = MedicionKPISerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['indicador', 'periodo']
+    filterset_fields = ['indicador']
     ordering = ['-fecha_medicion']
 
 
-class InformeCierreViewSet(viewsets.ModelViewSet):
+class InformeCierreViewSet(AlcanceMixin, viewsets.ModelViewSet):
     """ViewSet para Informes de Cierre."""
     queryset = InformeCierre.objects.all()
     serializer_class = InformeCierreSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['monitoreo', 'estado']
+    filterset_fields = ['etapa4']
+
+
+# =====================
+# Resúmenes Analíticos ViewSets
+# =====================
+
+class ResumenParticipacionViewSet(viewsets.ReadOnlyModelViewSet):
+    """Resúmenes precalculados por participación (solo lectura)."""
+    usar_replica = True
+    serializer_class = ResumenParticipacionSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['empresa_ancla', 'proyecto', 'proveedor', 'etapa_actual', 'estado']
+    ordering_fields = ['tasa_completitud', 'cumplimiento_kpis', 'madurez_promedio', 'actualizado']
+
+    def get_queryset(self):
+        # El resumen replica proyecto y proveedor de la participación: ruta vacía
+        return alcance.obtener(self.request.user).filtrar(
+            ResumenParticipacion.objects.select_related('proveedor', 'proyecto'), ruta=''
+        )
+
+
+class ResumenProyectoViewSet(viewsets.ReadOnlyModelViewSet):
+    """Resúmenes precalculados por proyecto (solo lectura)."""
+    usar_replica = True
+    serializer_class = ResumenProyectoSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['empresa_ancla', 'proyecto']
+    ordering_fields = ['tasa_completitud', 'cumplimiento_kpis', 'madurez_promedio', 'actualizado']
+
+    def get_queryset(self):
+        return alcance.obtener(self.request.user).filtrar_por_proyecto(
+            ResumenProyecto.objects.select_related('proyecto')
+        )
+
+
+class ResumenEmpresaViewSet(viewsets.ReadOnlyModelViewSet):
+    """Resúmenes precalculados por empresa ancla (solo lectura)."""
+    usar_replica = True
+    serializer_class = ResumenEmpresaSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return alcance.obtener(self.request.user).filtrar_por_empresa(
+            ResumenEmpresa.objects.select_related('empresa_ancla')
+        )
+
+
+class ImpactoViewSet(viewsets.ViewSet):
+    """
+    Impacto antes/después de los indicadores del programa.
+
+    Parámetros: ``proyecto``, ``empresa_ancla``, ``anio``, ``agrupacion``
+    (proyecto, empresa, sector, tamano) y ``todas=1`` para incluir
+    participaciones no cerradas.
+    """
+    permission_classes = [IsAuthenticated, ConsultorPermission]
+    usar_replica = True
+
+    def _cargar(self, request):
+        params = request.query_params
+        anio = params.get('anio')
+        if anio:
+            try:
+                anio = int(anio)
+            except ValueError:
+                raise ValidationError({'anio': 'Año no válido.'})
+        return impacto.cargar_indicadores(
+            solo_cerradas=params.get('todas') != '1',
+            proyecto=parametro_uuid(request, 'proyecto'),
+            empresa_ancla=parametro_uuid(request, 'empresa_ancla'),
+            anio=anio,
+        )
+
+    def list(self, request):
+        agrupacion = request.query_params.get('agrupacion', 'proyecto')
+        if agrupacion not in impacto.AGRUPACIONES:
+            return Response({
+                'error': f"Agrupación no válida. Opciones: {', '.join(impacto.AGRUPACIONES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        datos = self._cargar(request)
+        agregado = impacto.resumen_por(datos, agrupacion)
+        return Response({
+            'programa': impacto.resumen_programa(datos),
+            'agrupacion': agrupacion,
+            'agregado': agregado.astype(object).where(agregado.notna(), None).to_dict('records'),
+        })
+
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """Exportar el conjunto de indicadores (``formato=csv|xlsx``)."""
+        formato = request.query_params.get('formato', 'csv')
+        agrupacion = request.query_params.get('agrupacion', 'proyecto')
+        if formato not in ('csv', 'xlsx') or agrupacion not in impacto.AGRUPACIONES:
+            return Response({'error': 'Parámetros de exportación no válidos'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        contenido = impacto.exportar(self._cargar(request), formato=formato, agrupacion=agrupacion)
+        tipos = {
+            'csv': 'text/csv',
+            'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        }
+        response = HttpResponse(contenido, content_type=tipos[formato])
+        response['Content-Disposition'] = f'attachment; filename="impacto_programa.{formato}"'
+        return response
+
+
+# =====================
+# Búsqueda ViewSets
+# =====================
+
+class BusquedaViewSet(viewsets.ViewSet):
+    """
+    Búsqueda global sobre los registros de las etapas.
+
+    Parámetros: ``q`` (término, obligatorio), ``tipo`` (repetible) y ``limite``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        termino = request.query_params.get('q', '').strip()
+        if len(termino) < LONGITUD_MINIMA:
+            return Response({
+                'error': f'El término de búsqueda debe tener al menos {LONGITUD_MINIMA} caracteres'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limite = int(request.query_params.get('limite', LIMITE_RESULTADOS))
+        except ValueError:
+            limite = LIMITE_RESULTADOS
+        limite = max(1, min(limite, LIMITE_RESULTADOS))
+
+        resultados = buscar(
+            request.user, termino,
+            tipos=request.query_params.getlist('tipo') or None,
+            limite=limite
+        )
+        serializer = IndiceBusquedaSerializer(resultados, many=True)
+        return Response({
+            'termino': termino,
+            'total': len(serializer.data),
+            'resultados': serializer.data
+        })
+
+
+class CalendarioViewSet(viewsets.ViewSet):
+    """
+    Agenda unificada de sesiones de taller y de acompañamiento.
+
+    Parámetros comunes: ``desde`` / ``hasta`` (fecha o fecha-hora ISO),
+    ``consultor`` (ID) y ``lugar``.
+    """
+    permission_classes = [ConsultorPermission]
+
+    def _ventana(self, request, dias=30):
+        desde = calendario.interpretar_fecha(request.query_params.get('desde')) or timezone.now()
+        hasta = calendario.interpretar_fecha(request.query_params.get('hasta'), fin=True)
+        return desde, hasta or desde + timedelta(days=dias)
+
+    def list(self, request):
+        try:
+            desde, hasta = self._ventana(request)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        indice = calendario.indice(
+            desde, hasta,
+            consultor=parametro_uuid(request, 'consultor'),
+            lugar=request.query_params.get('lugar'),
+        )
+        return Response({
+            'desde': desde.isoformat(),
+            'hasta': hasta.isoformat(),
+            'total': len(indice),
+            'eventos': [calendario.serializar(e) for e in indice.eventos],
+        })
+
+    @action(detail=False, methods=['get'])
+    def conflictos(self, request):
+        """Eventos que se cruzan con ``inicio``-``fin`` para el consultor o el lugar."""
+        consultor = parametro_uuid(request, 'consultor')
+        lugar = request.query_params.get('lugar')
+        try:
+            inicio = calendario.interpretar_fecha(request.query_params.get('inicio'))
+            fin = calendario.interpretar_fecha(request.query_params.get('fin'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not inicio or not fin or fin <= inicio or not (consultor or lugar):
+            return Response({
+                'error': 'Indique inicio y fin válidos y un consultor o lugar'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        eventos = calendario.conflictos(
+            inicio, fin, consultor=consultor, lugar=lugar,
+            excluir=parametro_uuid(request, 'excluir'),
+        )
+        return Response({
+            'disponible': not eventos,
+            'conflictos': [calendario.serializar(e) for e in eventos],
+        })
+
+    @action(detail=False, methods=['get'])
+    def libres(self, request):
+        """Espacios libres del consultor en la jornada laboral (``duracion`` en horas)."""
+        consultor = parametro_uuid(request, 'consultor') or request.user.pk
+        try:
+            desde, hasta = self._ventana(request, dias=14)
+            duracion = timedelta(hours=float(request.query_params.get('duracion', 1)))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        espacios = calendario.espacios_libres(consultor, desde, hasta, duracion)
+        return Response({
+            'consultor': str(consultor),
+            'espacios': [
+                {'inicio': timezone.localtime(i).isoformat(), 'fin': timezone.localtime(f).isoformat()}
+                for i, f in espacios
+            ],
+        })
+
+    @action(detail=False, methods=['get'])
+    def ical(self, request):
+        """Feed iCal de la agenda (por defecto la del usuario, del último mes al próximo año)."""
+        consultor = parametro_uuid(request, 'consultor') or request.user.pk
+        try:
+            desde = calendario.interpretar_fecha(request.query_params.get('desde')) or (
+                timezone.now() - timedelta(days=30)
+            )
+            hasta = calendario.interpretar_fecha(request.query_params.get('hasta'), fin=True) or (
+                desde + timedelta(days=395)
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        eventos = calendario.cargar_eventos(desde, hasta, consultor=consultor)
+        respuesta = HttpResponse(calendario.ical(eventos), content_type='text/calendar; charset=utf-8')
+        respuesta['Content-Disposition'] = 'inline; filename="agenda.ics"'
+        return respuesta
+
+
+# =====================
+# Instrumentación ViewSets
+# =====================
+
+class InstrumentacionViewSet(viewsets.ViewSet):
+    """
+    Mediciones muestreadas por petición (buffer en memoria de este proceso).
+
+    Parámetros: ``vista`` (nombre de la vista) y ``limite`` (registros).
+    """
+    permission_classes = [AdminPermission]
+
+    def list(self, request):
+        registros = instrumentacion.buffer.registros(request.query_params.get('vista'))
+        try:
+            limite = int(request.query_params.get('limite', 100))
+        except ValueError:
+            limite = 100
+        return Response({
+            'total': len(registros),
+            'resumen': instrumentacion.resumen(registros),
+            'registros': registros[-limite:][::-1],
+        })
+
+    @action(detail=False, methods=['post'])
+    def limpiar(self, request):
+        """Vacía el buffer de mediciones."""
+        instrumentacion.buffer.limpiar()
+        return Response({'success': True})
 
 
 # =====================
@@ -468,10 +880,10 @@ class TallerViewSet(viewsets.ModelViewSet):
     queryset = Taller.objects.all()
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['proyecto', 'tipo', 'modalidad', 'estado']
+    filterset_fields = ['proyecto', 'tipo', 'modalidad', 'is_active']
     search_fields = ['nombre']
-    ordering_fields = ['fecha_inicio', 'nombre']
-    ordering = ['-fecha_inicio']
+    ordering_fields = ['created_at', 'nombre']
+    ordering = ['-created_at']
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -482,7 +894,7 @@ class TallerViewSet(viewsets.ModelViewSet):
     def sesiones(self, request, pk=None):
         """Listar sesiones del taller."""
         taller = self.get_object()
-        sesiones = taller.sesiones.all()
+        sesiones = taller.sesiones.select_related('taller')
         serializer = SesionTallerSerializer(sesiones, many=True)
         return Response(serializer.data)
 
@@ -490,58 +902,146 @@ class TallerViewSet(viewsets.ModelViewSet):
     def inscritos(self, request, pk=None):
         """Listar inscritos al taller."""
         taller = self.get_object()
-        inscripciones = taller.inscripciones.all()
+        inscripciones = InscripcionTaller.objects.filter(sesion__taller=taller).select_related('sesion__taller')
         serializer = InscripcionTallerSerializer(inscripciones, many=True)
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
     def inscribir(self, request, pk=None):
-        """Inscribir usuario al taller."""
+        """Inscribir a una sesión del taller (o a su lista de espera si está llena)."""
         taller = self.get_object()
-        usuario = request.user
+        serializer = SolicitudInscripcionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
 
-        # Verificar cupo
-        inscritos = taller.inscripciones.filter(estado='CONFIRMADA').count()
-        if inscritos >= taller.cupo_maximo:
-            return Response({
-                'error': 'El taller está lleno'
-            }, status=status.HTTP_400_BAD_REQUEST)
+        sesion = get_object_or_404(SesionTaller, pk=datos['sesion'], taller=taller)
+        # La capacidad se lee del taller ya cargado
+        sesion.taller = taller
 
-        # Verificar si ya está inscrito
-        if taller.inscripciones.filter(usuario=usuario).exists():
+        usuario = request.user
+        if usuario.es_admin or usuario.es_consultor:
+            proveedor = Proveedor.objects.filter(pk=datos.get('proveedor')).first()
+        elif usuario.es_proveedor:
+            proveedor = getattr(usuario, 'proveedor', None)
+        else:
+            raise PermissionDenied('Solo consultores y administradores pueden inscribir a otros proveedores.')
+        if proveedor is None:
             return Response({
-                'error': 'Ya está inscrito en este taller'
+                'error': 'Debe indicar el proveedor del participante'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        inscripcion = InscripcionTaller.objects.create(
-            taller=taller,
-            usuario=usuario,
-            estado='CONFIRMADA'
-        )
+        try:
+            inscripcion = inscripciones.inscribir(
+                sesion,
+                proveedor,
+                participante_nombre=datos.get('participante_nombre') or usuario.get_full_name(),
+                participante_email=datos.get('participante_email') or usuario.email,
+                participante_cargo=datos.get('participante_cargo', ''),
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
             'success': True,
+            'en_espera': inscripcion.estado == InscripcionTaller.Estado.EN_ESPERA,
             'inscripcion': InscripcionTallerSerializer(inscripcion).data
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'], permission_classes=[ConsultorPermission])
+    def satisfaccion(self, request, pk=None):
+        """Tarjeta de satisfacción del taller y su tendencia mensual."""
+        taller = self.get_object()
+        return Response({
+            **satisfaccion.satisfaccion_taller(taller),
+            'tendencia': satisfaccion.tendencia('taller', taller.pk),
         })
 
+    @action(detail=False, methods=['get'], url_path='satisfaccion',
+            permission_classes=[ConsultorPermission])
+    def satisfaccion_agrupada(self, request):
+        """
+        Tarjetas de satisfacción por taller, facilitador o proyecto.
+
+        Parámetros: agrupacion (taller|facilitador|proyecto), valor (ID opcional),
+        tendencia (1 para incluir la tendencia mensual del grupo indicado).
+        """
+        agrupacion = request.query_params.get('agrupacion', 'facilitador')
+        if agrupacion not in satisfaccion.AGRUPACIONES:
+            return Response({
+                'error': f"Agrupación no válida. Opciones: {', '.join(satisfaccion.AGRUPACIONES)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        valor = parametro_uuid(request, 'valor')
+
+        data = {'resultados': satisfaccion.satisfaccion_por(agrupacion, valor)}
+        if valor and request.query_params.get('tendencia') == '1':
+            data['tendencia'] = satisfaccion.tendencia(agrupacion, valor)
+        return Response(data)
+
 
 class SesionTallerViewSet(viewsets.ModelViewSet):
     """ViewSet para sesiones de taller."""
-    queryset = SesionTaller.objects.all()
+    queryset = SesionTaller.objects.select_related('taller')
     serializer_class = SesionTallerSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['taller', 'estado']
     ordering = ['fecha']
 
+    @action(detail=True, methods=['post'], permission_classes=[ConsultorPermission])
+    def certificados(self, request, pk=None):
+        """Encolar la generación y envío de los certificados de la sesión."""
+        sesion = self.get_object()
+        enviar = str(request.data.get('enviar', True)).lower() not in ('0', 'false')
+        generar_certificados_sesion.delay(str(sesion.pk), enviar=enviar)
+        return Response({'encolado': True}, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'], url_path='asistencia', permission_classes=[ConsultorPermission])
+    def registrar_asistencia(self, request, pk=None):
+        """Registrar la planilla de asistencia completa en una sola operación."""
+        sesion = self.get_object()
+        serializer = PlanillaAsistenciaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        resultado = asistencia.registrar_planilla(
+            sesion,
+            serializer.validated_data['registros'],
+            finalizar=serializer.validated_data['finalizar'],
+        )
+        return Response(resultado)
 
-class InscripcionTallerViewSet(viewsets.ModelViewSet):
-    """ViewSet para inscripciones a talleres."""
-    queryset = InscripcionTaller.objects.all()
+    @action(detail=True, methods=['post'], permission_classes=[ConsultorPermission])
+    def checkin(self, request, pk=None):
+        """Check-in por QR; acepta lotes acumulados sin conexión y es idempotente."""
+        sesion = self.get_object()
+        serializer = CheckinQRSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(asistencia.registrar_checkins(sesion, serializer.validated_data['lecturas']))
+
+
+class InscripcionTallerViewSet(AlcanceMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet para inscripciones a talleres, acotado a los proveedores del
+    alcance del usuario (un proveedor solo ve y cancela las suyas).
+
+    Solo lectura: las inscripciones se crean con ``talleres/{id}/inscribir/`` y
+    se cancelan con ``cancelar``, que pasan por ``apps.talleres.inscripciones``
+    para mantener el contador de cupos y la lista de espera.
+    """
+    ruta_proveedor = 'proveedor'
+    queryset = InscripcionTaller.objects.select_related('sesion__taller').order_by('fecha_inscripcion')
     serializer_class = InscripcionTallerSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['taller', 'usuario', 'estado']
+    filterset_fields = ['sesion', 'sesion__taller', 'proveedor', 'estado']
+
+    @action(detail=True, methods=['post'])
+    def cancelar(self, request, pk=None):
+        """Cancelar la inscripción y promover la lista de espera."""
+        inscripcion = self.get_object()
+        promovida = inscripciones.cancelar(inscripcion)
+        return Response({
+            'success': True,
+            'promovida': str(promovida.pk) if promovida else None,
+        })
 
 
 class AsistenciaTallerViewSet(viewsets.ModelViewSet):
@@ -550,4 +1050,4 @@ class AsistenciaTallerViewSet(viewsets.ModelViewSet):
     serializer_class = AsistenciaTallerSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['sesion', 'inscripcion', 'presente']
+    filterset_fields = ['inscripcion', 'inscripcion__sesion', 'asistio']
@@ -0,0 +1,180 @@
+"""
+Alcance de acceso por usuario: empresas, proyectos y proveedores visibles.
+
+El alcance se calcula una vez (unas pocas consultas ``values_list``), se
+guarda en caché y se memoriza en el objeto usuario durante la petición, de
+modo que los permisos por objeto son búsquedas en conjuntos y los querysets
+se acotan con ``__in`` sobre identificadores ya conocidos.
+
+Reglas (independientes del rol, salvo administradores que lo ven todo):
+
+- Empresas: aquellas a las que el usuario está vinculado y activo.
+- Proyectos completos: los de esas empresas, los que dirige y aquellos en
+  los que es consultor asignado de alguna participación. Se ven todas sus
+  participaciones.
+- Proveedores propios: el proveedor cuyo usuario es el actual. Solo se ven
+  sus propias participaciones.
+- Proveedores: los propios, los vinculados a las empresas y los que
+  participan en proyectos completos.
+
+La caché se versiona con una clave global que se renueva, al confirmar la
+transacción, cuando cambian vinculaciones de usuarios o proveedores a
+empresas, participaciones o proyectos (ver ``apps.core.signals``).
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from apps.empresas.models import EmpresaAncla, UsuarioEmpresaAncla
+from apps.proveedores.models import Proveedor, ProveedorEmpresaAncla
+from apps.proyectos.models import Proyecto, ProveedorProyecto
+
+CLAVE_VERSION = 'alcance:version'
+CLAVE_ALCANCE = 'alcance:{}:{}'
+TTL_ALCANCE = 60 * 60
+
+
+class Alcance:
+    """Identificadores accesibles por un usuario."""
+
+    __slots__ = ('todo', 'empresas', 'proyectos', 'proyectos_completos', 'proveedores', 'proveedores_propios')
+
+    def __init__(self, todo=False, empresas=(), proyectos_completos=(), proyectos=(),
+                 proveedores_propios=(), proveedores=()):
+        self.todo = todo
+        self.empresas = frozenset(empresas)
+        self.proyectos_completos = frozenset(proyectos_completos)
+        self.proyectos = frozenset(proyectos) | self.proyectos_completos
+        self.proveedores_propios = frozenset(proveedores_propios)
+        self.proveedores = frozenset(proveedores) | self.proveedores_propios
+
+    def puede_empresa(self, empresa_id):
+        return self.todo or empresa_id in self.empresas
+
+    def puede_proyecto(self, proyecto_id):
+        return self.todo or proyecto_id in self.proyectos
+
+    def puede_proveedor(self, proveedor_id):
+        return self.todo or proveedor_id in self.proveedores
+
+    def puede_participacion(self, proyecto_id, proveedor_id):
+        return (
+            self.todo
+            or proyecto_id in self.proyectos_completos
+            or proveedor_id in self.proveedores_propios
+        )
+
+    def filtro_participacion(self, ruta=''):
+        """``Q`` que acota participaciones; ``ruta`` lleva del modelo a ProveedorProyecto."""
+        prefijo = f'{ruta}__' if ruta else ''
+        return (
+            Q(**{f'{prefijo}proyecto_id__in': self.proyectos_completos})
+            | Q(**{f'{prefijo}proveedor_id__in': self.proveedores_propios})
+        )
+
+    def filtrar(self, queryset, ruta=None):
+        """
+        Acota un queryset al alcance.
+
+        Args:
+            queryset: Queryset de EmpresaAncla, Proyecto, Proveedor o
+                ProveedorProyecto, o de un modelo relacionado con una
+                participación
+            ruta: Ruta desde el modelo hasta ProveedorProyecto (p. ej.
+                'etapa3__proveedor_proyecto'); obligatoria para modelos
+                distintos de los anteriores
+        """
+        if self.todo:
+            return queryset
+        modelo = queryset.model
+        if ruta is None:
+            if modelo is EmpresaAncla:
+                return queryset.filter(pk__in=self.empresas)
+            if modelo is Proyecto:
+                return queryset.filter(pk__in=self.proyectos)
+            if modelo is Proveedor:
+                return queryset.filter(pk__in=self.proveedores)
+            if modelo is not ProveedorProyecto:
+                raise ValueError(f'Indique la ruta a ProveedorProyecto para {modelo.__name__}')
+            ruta = ''
+        return queryset.filter(self.filtro_participacion(ruta))
+
+    def filtrar_por_proveedor(self, queryset, ruta='proveedor'):
+        """Acota registros que pertenecen a un proveedor (p. ej. inscripciones a talleres)."""
+        if self.todo:
+            return queryset
+        return queryset.filter(**{f'{ruta}__in': self.proveedores})
+
+    def filtrar_por_proyecto(self, queryset, ruta='proyecto'):
+        """Acota datos agregados de un proyecto a los proyectos completos del alcance."""
+        if self.todo:
+            return queryset
+        return queryset.filter(**{f'{ruta}__in': self.proyectos_completos})
+
+    def filtrar_por_empresa(self, queryset, ruta='empresa_ancla'):
+        """Acota datos agregados de una empresa ancla a las empresas del alcance."""
+        if self.todo:
+            return queryset
+        return queryset.filter(**{f'{ruta}__in': self.empresas})
+
+
+def calcular(usuario):
+    """Calcula el alcance contra la base de datos (sin caché)."""
+    if not usuario.is_authenticated:
+        return Alcance()
+    if usuario.es_admin:
+        return Alcance(todo=True)
+
+    empresas = set(UsuarioEmpresaAncla.objects.filter(
+        usuario=usuario, is_active=True
+    ).values_list('empresa_ancla_id', flat=True))
+    proveedores_propios = set(Proveedor.objects.filter(usuario=usuario).values_list('id', flat=True))
+
+    proyectos_completos = set(Proyecto.objects.filter(
+        Q(empresa_ancla_id__in=empresas) | Q(director_proyecto=usuario) | Q(proveedores__consultor_asignado=usuario)
+    ).values_list('id', flat=True).distinct())
+    proyectos = set(ProveedorProyecto.objects.filter(
+        proveedor_id__in=proveedores_propios
+    ).values_list('proyecto_id', flat=True)) if proveedores_propios else set()
+
+    proveedores = set(ProveedorProyecto.objects.filter(
+        proyecto_id__in=proyectos_completos
+    ).values_list('proveedor_id', flat=True).distinct()) if proyectos_completos else set()
+    if empresas:
+        proveedores.update(ProveedorEmpresaAncla.objects.filter(
+            empresa_ancla_id__in=empresas
+        ).values_list('proveedor_id', flat=True))
+
+    return Alcance(
+        empresas=empresas,
+        proyectos_completos=proyectos_completos,
+        proyectos=proyectos,
+        proveedores_propios=proveedores_propios,
+        proveedores=proveedores,
+    )
+
+
+def obtener(usuario):
+    """Alcance del usuario: memorizado en la petición y guardado en caché."""
+    alcance = getattr(usuario, '_alcance', None)
+    if alcance is not None:
+        return alcance
+
+    if not usuario.is_authenticated or usuario.es_admin:
+        alcance = calcular(usuario)
+    else:
+        version = cache.get_or_set(CLAVE_VERSION, time.time_ns, None)
+        clave = CLAVE_ALCANCE.format(usuario.pk, version)
+        alcance = cache.get(clave)
+        if alcance is None:
+            alcance = calcular(usuario)
+            cache.set(clave, alcance, TTL_ALCANCE)
+    usuario._alcance = alcance
+    return alcance
+
+
+def invalidar():
+    """Renueva la versión del alcance al confirmar la transacción en curso."""
+    transaction.on_commit(lambda: cache.set(CLAVE_VERSION, time.time_ns(), None))
@@ -8,3 +8,8 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import apps.core.signals  # noqa
+        import apps.core.configuracion  # noqa
+        from django.conf import settings
+        if getattr(settings, 'INSTRUMENTACION_ACTIVA', True):
+            from .instrumentacion import instalar_medicion_serializadores
+            instalar_medicion_serializadores()
@@ -0,0 +1,277 @@
+"""
+Calendario de ocupación de consultores y lugares.
+
+Unifica ``SesionTaller`` (fecha + horas) y ``SesionAcompanamiento`` (fecha +
+duración, con fin materializado en ``fecha_fin``) como intervalos
+``[inicio, fin)``. Los eventos de la ventana consultada se cargan con
+consultas de solapamiento por rango sobre columnas indexadas (en PostgreSQL
+además con un índice GiST sobre ``tstzrange``) y se organizan en un índice de
+intervalos en memoria: inicios ordenados más el máximo acumulado de los
+fines, de modo que cada consulta de solapamiento es una búsqueda binaria.
+Sobre el índice se resuelven conflictos, espacios libres y el feed iCal.
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from itertools import accumulate
+from operator import attrgetter
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+logger = logging.getLogger(__name__)
+
+Evento = namedtuple('Evento', 'inicio fin tipo id titulo lugar consultor_id')
+
+TALLER = 'TALLER'
+ACOMPANAMIENTO = 'ACOMPANAMIENTO'
+
+JORNADA = (time(8, 0), time(18, 0))
+
+
+class IndiceIntervalos:
+    """Índice estático de intervalos: inicios ordenados y máximo acumulado de fines."""
+
+    def __init__(self, eventos):
+        self.eventos = sorted(eventos, key=attrgetter('inicio'))
+        self._inicios = [e.inicio for e in self.eventos]
+        self._max_fin = list(accumulate((e.fin for e in self.eventos), max))
+
+    def __len__(self):
+        return len(self.eventos)
+
+    def solapados(self, inicio, fin):
+        """Eventos que se solapan con ``[inicio, fin)``."""
+        # Candidatos: inicio < fin consultado; antes de ``desde`` ningún evento termina después de ``inicio``
+        hasta = bisect_left(self._inicios, fin)
+        desde = bisect_right(self._max_fin, inicio, 0, hasta)
+        return [e for e in self.eventos[desde:hasta] if e.fin > inicio]
+
+    def ocupados(self):
+        """Intervalos ocupados fusionados (sin solapes), en orden."""
+        fusionados = []
+        for evento in self.eventos:
+            if fusionados and evento.inicio <= fusionados[-1][1]:
+                fusionados[-1][1] = max(fusionados[-1][1], evento.fin)
+            else:
+                fusionados.append([evento.inicio, evento.fin])
+        return [tuple(intervalo) for intervalo in fusionados]
+
+
+def _aware(fecha, hora):
+    return timezone.make_aware(datetime.combine(fecha, hora))
+
+
+def interpretar_fecha(valor, fin=False):
+    """
+    Convierte un parámetro ISO (fecha o fecha-hora) a datetime con zona.
+
+    Una fecha sola se interpreta como el inicio del día, o el inicio del día
+    siguiente si ``fin`` es True.
+    """
+    if not valor:
+        return None
+    try:
+        dia = parse_date(valor)
+        momento = None if dia else parse_datetime(valor)
+    except ValueError:
+        dia = momento = None
+    if dia is not None:
+        momento = datetime.combine(dia + timedelta(days=1) if fin else dia, time.min)
+    elif momento is None:
+        raise ValueError(f"Fecha no válida: {valor}")
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+    return momento
+
+
+def cargar_eventos(desde, hasta, consultor=None, lugar=None):
+    """
+    Eventos (sesiones de taller y de acompañamiento) que se solapan con la ventana.
+
+    Args:
+        consultor: Filtrar por consultor / facilitador (instancia o ID)
+        lugar: Filtrar por lugar (solo aplica a sesiones de taller)
+
+    Returns:
+        Lista de ``Evento``
+    """
+    from apps.etapas.models import SesionAcompanamiento
+    from apps.talleres.models import SesionTaller
+
+    eventos = []
+
+    talleres = SesionTaller.objects.filter(
+        fecha__gte=timezone.localdate(desde) - timedelta(days=1),
+        fecha__lte=timezone.localdate(hasta),
+    ).exclude(estado=SesionTaller.Estado.CANCELADA)
+    if consultor:
+        talleres = talleres.filter(taller__facilitador=consultor)
+    if lugar:
+        talleres = talleres.filter(lugar__iexact=lugar.strip())
+
+    for pk, fecha, hora_inicio, hora_fin, sitio, nombre, facilitador_id in talleres.values_list(
+        'id', 'fecha', 'hora_inicio', 'hora_fin', 'lugar', 'taller__nombre', 'taller__facilitador_id'
+    ):
+        inicio = _aware(fecha, hora_inicio)
+        fin = _aware(fecha + timedelta(days=1) if hora_fin <= hora_inicio else fecha, hora_fin)
+        if inicio < hasta and fin > desde:
+            eventos.append(Evento(inicio, fin, TALLER, str(pk), nombre, sitio, facilitador_id))
+
+    if not lugar:
+        acompanamientos = SesionAcompanamiento.objects.filter(fecha__lt=hasta, fecha_fin__gt=desde)
+        if consultor:
+            acompanamientos = acompanamientos.filter(consultor=consultor)
+
+        for pk, inicio, fin, modalidad, consultor_id, proveedor in acompanamientos.values_list(
+            'id', 'fecha', 'fecha_fin', 'modalidad', 'consultor_id',
+            'etapa3__proveedor_proyecto__proveedor__razon_social'
+        ):
+            eventos.append(Evento(
+                inicio, fin, ACOMPANAMIENTO, str(pk), f"Acompañamiento - {proveedor}",
+                SesionAcompanamiento.Modalidad(modalidad).label, consultor_id
+            ))
+
+    return eventos
+
+
+def indice(desde, hasta, consultor=None, lugar=None):
+    """Índice de intervalos de la ventana."""
+    return IndiceIntervalos(cargar_eventos(desde, hasta, consultor, lugar))
+
+
+def conflictos(inicio, fin, consultor=None, lugar=None, excluir=None):
+    """
+    Eventos del consultor o del lugar que se solapan con ``[inicio, fin)``.
+
+    Args:
+        excluir: ID del evento que se está reprogramando
+
+    Returns:
+        Lista de ``Evento``
+    """
+    resultado = {}
+    if consultor:
+        for evento in indice(inicio, fin, consultor=consultor).solapados(inicio, fin):
+            resultado[evento.id] = evento
+    if lugar:
+        for evento in indice(inicio, fin, lugar=lugar).solapados(inicio, fin):
+            resultado[evento.id] = evento
+    resultado.pop(str(excluir), None)
+    return sorted(resultado.values(), key=attrgetter('inicio'))
+
+
+def espacios_libres(consultor, desde, hasta, duracion, jornada=JORNADA, solo_habiles=True):
+    """
+    Espacios libres del consultor dentro de la jornada laboral.
+
+    Args:
+        duracion: ``timedelta`` mínimo del espacio
+        jornada: Tupla (hora de inicio, hora de fin) de la jornada
+        solo_habiles: Excluir sábados y domingos
+
+    Returns:
+        Lista de tuplas (inicio, fin)
+    """
+    ocupados = indice(desde, hasta, consultor=consultor).ocupados()
+    libres = []
+    i = 0
+    dia = timezone.localdate(desde)
+    while dia <= timezone.localdate(hasta):
+        if solo_habiles and dia.weekday() >= 5:
+            dia += timedelta(days=1)
+            continue
+
+        cursor = max(_aware(dia, jornada[0]), desde)
+        cierre = min(_aware(dia, jornada[1]), hasta)
+        # Los intervalos ocupados están ordenados: se avanza sin retroceder
+        while i < len(ocupados) and ocupados[i][1] <= cursor:
+            i += 1
+        j = i
+        while cursor < cierre:
+            if j < len(ocupados) and ocupados[j][0] < cierre:
+                inicio_ocupado, fin_ocupado = ocupados[j]
+                if inicio_ocupado - cursor >= duracion:
+                    libres.append((cursor, inicio_ocupado))
+                cursor = max(cursor, fin_ocupado)
+                j += 1
+            else:
+                if cierre - cursor >= duracion:
+                    libres.append((cursor, cierre))
+                break
+        dia += timedelta(days=1)
+
+    return libres
+
+
+def _escapar(texto):
+    return (
+        str(texto or '').replace('\\', '\\\\').replace(';', '\\;')
+        .replace(',', '\\,').replace('\n', '\\n')
+    )
+
+
+def _plegar(linea):
+    """Pliega líneas de más de 75 octetos (RFC 5545)."""
+    datos = linea.encode('utf-8')
+    if len(datos) <= 75:
+        return linea
+    partes, actual = [], b''
+    for caracter in linea:
+        codificado = caracter.encode('utf-8')
+        if len(actual) + len(codificado) > (75 if not partes else 74):
+            partes.append(actual.decode('utf-8'))
+            actual = b''
+        actual += codificado
+    partes.append(actual.decode('utf-8'))
+    return '\r\n '.join(partes)
+
+
+def _utc(momento):
+    return momento.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ical(eventos, nombre='Agenda'):
+    """
+    Feed iCalendar (RFC 5545) con los eventos dados.
+
+    Returns:
+        Texto ``text/calendar``
+    """
+    sello = _utc(timezone.now())
+    lineas = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Sistema de Fortalecimiento de Proveedores//Agenda//ES',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escapar(nombre)}',
+    ]
+    for evento in sorted(eventos, key=attrgetter('inicio')):
+        lineas += [
+            'BEGIN:VEVENT',
+            f'UID:{evento.tipo.lower()}-{evento.id}@sfp',
+            f'DTSTAMP:{sello}',
+            f'DTSTART:{_utc(evento.inicio)}',
+            f'DTEND:{_utc(evento.fin)}',
+            f'SUMMARY:{_escapar(evento.titulo)}',
+            f'LOCATION:{_escapar(evento.lugar)}',
+            f'CATEGORIES:{evento.tipo}',
+            'END:VEVENT',
+        ]
+    lineas.append('END:VCALENDAR')
+    return '\r\n'.join(_plegar(linea) for linea in lineas) + '\r\n'
+
+
+def serializar(evento):
+    """Evento como diccionario JSON-serializable."""
+    return {
+        'tipo': evento.tipo,
+        'id': evento.id,
+        'titulo': evento.titulo,
+        'inicio': timezone.localtime(evento.inicio).isoformat(),
+        'fin': timezone.localtime(evento.fin).isoformat(),
+        'lugar': evento.lugar,
+        'consultor': str(evento.consultor_id) if evento.consultor_id else None,
+    }
@@ -0,0 +1,59 @@
+"""
+Configuración del sistema (``ConfiguracionSistema``) en memoria del proceso.
+
+Todas las claves activas se leen en una sola consulta y se convierten según
+su ``tipo`` al cargarlas; el resultado se sirve desde la caché de datos de
+referencia (``apps.core.referencia``), que lo invalida por versión al
+guardar o eliminar cualquier fila. ``valor(clave)`` es una búsqueda en un
+diccionario, apta para banderas y límites en rutas calientes.
+
+Los valores JSON se comparten entre llamadas: no deben modificarse.
+"""
+import json
+import logging
+
+from .referencia import DatosReferencia
+
+logger = logging.getLogger(__name__)
+
+
+def convertir(tipo, valor):
+    """Convierte el texto almacenado según el tipo de la configuración."""
+    if tipo == 'INTEGER':
+        return int(valor)
+    elif tipo == 'FLOAT':
+        return float(valor)
+    elif tipo == 'BOOLEAN':
+        return valor.lower() in ('true', '1', 'yes')
+    elif tipo == 'JSON':
+        return json.loads(valor)
+    return valor
+
+
+def _cargar():
+    from .models import ConfiguracionSistema
+
+    valores = {}
+    filas = ConfiguracionSistema.objects.filter(is_active=True).values_list('clave', 'tipo', 'valor')
+    for clave, tipo, valor in filas:
+        try:
+            valores[clave] = convertir(tipo, valor)
+        except ValueError as e:
+            # Una fila mal escrita no debe dejar sin configuración al resto
+            logger.warning(f"Configuración '{clave}' ignorada, valor no válido para {tipo}: {e}")
+    return valores
+
+
+configuracion_sistema = DatosReferencia(
+    'core.configuracion', _cargar, modelos=['core.ConfiguracionSistema']
+)
+
+
+def valor(clave, default=None):
+    """Valor convertido de la clave, o ``default`` si no existe o no es válido."""
+    return configuracion_sistema.obtener().get(clave, default)
+
+
+def todas():
+    """Diccionario clave -> valor de todas las configuraciones activas."""
+    return configuracion_sistema.obtener()
@@ -0,0 +1,57 @@
+"""
+Recorrido por lotes de querysets grandes, compatible con pgbouncer.
+
+``QuerySet.iterator()`` usa en PostgreSQL un cursor del lado del servidor,
+que vive dentro de una transacción y no sobrevive a pgbouncer en modo
+transacción. Con ``DISABLE_SERVER_SIDE_CURSORS`` (``DB_PGBOUNCER``) Django
+sigue aceptando ``iterator()``, pero trae todas las filas a memoria de una
+vez. ``iterar`` usa ``iterator()`` cuando hay cursores del servidor y, si
+no, pagina por clave primaria (``pk > último`` ordenado, ``LIMIT lote``),
+que es seguro entre transacciones y con memoria acotada.
+"""
+from django.db import connections
+
+LOTE = 2000
+
+
+def cursores_servidor(alias):
+    """Indica si la conexión admite lecturas por lotes con cursor del servidor."""
+    conexion = connections[alias]
+    return (
+        conexion.features.can_use_chunked_reads
+        and not conexion.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS')
+    )
+
+
+def lotes_de_claves(queryset, lote=LOTE):
+    """
+    Genera listas de claves primarias del queryset, en orden y por lotes
+    (paginación por clave, sin OFFSET).
+    """
+    claves = queryset.order_by('pk').values_list('pk', flat=True)
+    ultima = None
+    while True:
+        pagina = claves if ultima is None else claves.filter(pk__gt=ultima)
+        ids = list(pagina[:lote])
+        if not ids:
+            return
+        yield ids
+        if len(ids) < lote:
+            return
+        ultima = ids[-1]
+
+
+def iterar(queryset, lote=LOTE):
+    """
+    Recorre un queryset (instancias, ``values`` o ``values_list``) por lotes.
+
+    Sin cursores del servidor, el recorrido sigue la clave primaria y el
+    orden del queryset solo se conserva dentro de cada lote; quien necesite
+    un orden global debe agrupar con ``lotes_de_claves`` sobre el modelo que
+    lo define.
+    """
+    if cursores_servidor(queryset.db):
+        yield from queryset.iterator(chunk_size=lote)
+        return
+    for ids in lotes_de_claves(queryset, lote):
+        yield from queryset.filter(pk__in=ids)
@@ -8,4 +8,5 @@ def global_settings(request):
         'APP_SHORT_NAME': getattr(settings, 'APP_SHORT_NAME', 'SFP'),
         'APP_VERSION': getattr(settings, 'APP_VERSION', '1.0.0'),
         'ETAPAS': getattr(settings, 'ETAPAS', {}),
+        'NOTIFICACIONES_STREAM_ACTIVO': getattr(settings, 'NOTIFICACIONES_STREAM_ACTIVO', False),
     }
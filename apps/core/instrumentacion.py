@@ -0,0 +1,199 @@
+"""
+Instrumentación por petición: consultas SQL, tiempo de BD, serialización y latencia.
+
+``InstrumentacionMiddleware`` envuelve cada petición con
+``connection.execute_wrapper`` en todas las conexiones, de modo que cada
+consulta suma su duración a la medición de la petición en curso (guardada en
+una ``ContextVar``). El tiempo de serialización de DRF se mide envolviendo
+``BaseSerializer.data``, el punto por el que pasa toda serialización de
+salida. Las mediciones se muestrean (siempre se conservan las peticiones
+lentas) en un buffer circular en memoria por proceso, expuesto en
+``/api/instrumentacion/``, y se emiten como líneas de log JSON.
+"""
+import json
+import logging
+import random
+import threading
+from collections import deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_medicion_actual = ContextVar('medicion_actual', default=None)
+
+
+class Medicion:
+    """Acumuladores de una petición."""
+
+    __slots__ = ('consultas', 'tiempo_bd', 'tiempo_serializacion', '_serializando')
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_bd = 0.0
+        self.tiempo_serializacion = 0.0
+        self._serializando = False
+
+    def __call__(self, execute, sql, params, many, context):
+        """``execute_wrapper``: cuenta y cronometra cada consulta."""
+        inicio = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo_bd += perf_counter() - inicio
+            self.consultas += 1
+
+
+class BufferMediciones:
+    """Buffer circular de registros, seguro entre hilos."""
+
+    def __init__(self, capacidad):
+        self._registros = deque(maxlen=capacidad)
+        self._lock = threading.Lock()
+
+    def agregar(self, registro):
+        with self._lock:
+            self._registros.append(registro)
+
+    def registros(self, vista=None):
+        with self._lock:
+            registros = list(self._registros)
+        if vista:
+            registros = [r for r in registros if r['vista'] == vista]
+        return registros
+
+    def limpiar(self):
+        with self._lock:
+            self._registros.clear()
+
+
+buffer = BufferMediciones(getattr(settings, 'INSTRUMENTACION_CAPACIDAD', 500))
+
+
+def medicion_actual():
+    return _medicion_actual.get()
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p), len(ordenados) - 1)]
+
+
+def resumen(registros):
+    """
+    Agregados por vista de los registros del buffer.
+
+    Returns:
+        Lista de {vista, peticiones, latencia p50/p95/max, consultas y tiempo de
+        BD promedio, serialización promedio} ordenada por latencia p95
+    """
+    por_vista = {}
+    for registro in registros:
+        por_vista.setdefault(registro['vista'], []).append(registro)
+
+    resultado = []
+    for vista, grupo in por_vista.items():
+        latencias = [r['total_ms'] for r in grupo]
+        n = len(grupo)
+        resultado.append({
+            'vista': vista,
+            'peticiones': n,
+            'latencia_p50_ms': _percentil(latencias, 0.5),
+            'latencia_p95_ms': _percentil(latencias, 0.95),
+            'latencia_max_ms': max(latencias),
+            'consultas_promedio': round(sum(r['consultas'] for r in grupo) / n, 1),
+            'consultas_max': max(r['consultas'] for r in grupo),
+            'bd_promedio_ms': round(sum(r['bd_ms'] for r in grupo) / n, 2),
+            'serializacion_promedio_ms': round(sum(r['serializacion_ms'] for r in grupo) / n, 2),
+        })
+    resultado.sort(key=lambda r: r['latencia_p95_ms'], reverse=True)
+    return resultado
+
+
+def instalar_medicion_serializadores():
+    """Cronometra ``BaseSerializer.data`` de DRF (solo la serialización más externa)."""
+    from rest_framework.serializers import BaseSerializer
+
+    propiedad = BaseSerializer.data
+    if getattr(propiedad.fget, '_instrumentado', False):
+        return
+
+    @wraps(propiedad.fget)
+    def data(serializer):
+        medicion = _medicion_actual.get()
+        if medicion is None or medicion._serializando:
+            return propiedad.fget(serializer)
+        medicion._serializando = True
+        inicio = perf_counter()
+        try:
+            return propiedad.fget(serializer)
+        finally:
+            medicion.tiempo_serializacion += perf_counter() - inicio
+            medicion._serializando = False
+
+    data._instrumentado = True
+    BaseSerializer.data = property(data)
+
+
+class InstrumentacionMiddleware:
+    """
+    Mide consultas, tiempo de BD, serialización y latencia total por vista.
+
+    Configuración (settings): ``INSTRUMENTACION_ACTIVA``,
+    ``INSTRUMENTACION_MUESTREO`` (fracción de peticiones registradas),
+    ``INSTRUMENTACION_UMBRAL_LENTO_MS`` (las más lentas se registran siempre),
+    ``INSTRUMENTACION_CAPACIDAD`` y ``INSTRUMENTACION_EXCLUIR`` (prefijos).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.activa = getattr(settings, 'INSTRUMENTACION_ACTIVA', True)
+        self.muestreo = getattr(settings, 'INSTRUMENTACION_MUESTREO', 0.1)
+        self.umbral_lento = getattr(settings, 'INSTRUMENTACION_UMBRAL_LENTO_MS', 1000)
+        self.excluir = tuple(getattr(settings, 'INSTRUMENTACION_EXCLUIR', ()))
+
+    def __call__(self, request):
+        if not self.activa or request.path.startswith(self.excluir):
+            return self.get_response(request)
+
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        inicio = perf_counter()
+        try:
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(medicion))
+                response = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        total_ms = (perf_counter() - inicio) * 1000
+
+        if total_ms >= self.umbral_lento or random.random() < self.muestreo:
+            self._registrar(request, response, medicion, total_ms)
+        return response
+
+    def _registrar(self, request, response, medicion, total_ms):
+        coincidencia = getattr(request, 'resolver_match', None)
+        usuario = getattr(request, 'user', None)
+        registro = {
+            'fecha': timezone.now().isoformat(),
+            'vista': coincidencia.view_name if coincidencia else request.path,
+            'metodo': request.method,
+            'ruta': request.path,
+            'estado': response.status_code,
+            'consultas': medicion.consultas,
+            'bd_ms': round(medicion.tiempo_bd * 1000, 2),
+            'serializacion_ms': round(medicion.tiempo_serializacion * 1000, 2),
+            'total_ms': round(total_ms, 2),
+            'usuario': str(usuario.pk) if usuario is not None and usuario.is_authenticated else None,
+            'lenta': total_ms >= self.umbral_lento,
+        }
+        buffer.agregar(registro)
+        nivel = logging.WARNING if registro['lenta'] else logging.INFO
+        logger.log(nivel, json.dumps({'evento': 'peticion', **registro}))
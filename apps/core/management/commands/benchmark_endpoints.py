@@ -0,0 +1,215 @@
+import json
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.instrumentacion import Medicion
+from apps.core.models import LogActividad, Usuario
+from apps.etapas.models import SesionAcompanamiento, TareaImplementacion
+from apps.notificaciones.models import Notificacion
+from apps.proveedores.models import Proveedor
+from apps.proyectos.models import ProveedorProyecto, Proyecto
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide latencia y número de consultas de los endpoints clave (dashboards, listados de la API, '
+        'kanban, procesamiento de la cola) y genera un reporte JSON comparable entre commits.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5, help='Mediciones por endpoint')
+        parser.add_argument('--usuario', help='Email del usuario con el que se ejecutan las peticiones (por defecto un admin)')
+        parser.add_argument('--salida', help='Ruta del reporte JSON (por defecto se imprime)')
+        parser.add_argument('--comparar', help='Reporte JSON anterior contra el que comparar')
+        parser.add_argument('--sin-cache', action='store_true', help='Vaciar la caché antes de cada medición')
+        parser.add_argument('--solo', action='append', default=[], help='Medir solo este endpoint (repetible)')
+        parser.add_argument(
+            '--conn-max-age', type=int,
+            help='CONN_MAX_AGE para la medición (0 = conexión nueva por petición); por defecto el de settings'
+        )
+
+    def handle(self, *args, **options):
+        if options['conn_max_age'] is not None:
+            for conexion in connections.all():
+                conexion.close()
+                conexion.settings_dict['CONN_MAX_AGE'] = options['conn_max_age']
+        usuario = self._usuario(options['usuario'])
+        casos = self._casos()
+        if options['solo']:
+            casos = {nombre: caso for nombre, caso in casos.items() if nombre in options['solo']}
+
+        cliente = Client(raise_request_exception=False)
+        cliente.force_login(usuario)
+        resultados = {}
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(ALLOWED_HOSTS=hosts, INSTRUMENTACION_ACTIVA=False):
+            for nombre, caso in casos.items():
+                resultados[nombre] = self._medir(cliente, caso, options['repeticiones'], options['sin_cache'])
+                r = resultados[nombre]
+                self.stderr.write(
+                    f"{nombre:<32} {r.get('mediana_ms', '-'):>9} ms  {r.get('consultas', '-'):>5} consultas"
+                    + (f"  ERROR {r['error']}" if 'error' in r else '')
+                )
+
+        reporte = {
+            'fecha': timezone.now().isoformat(),
+            'commit': self._commit(),
+            'base_datos': connection.vendor,
+            'usuario': usuario.email,
+            'repeticiones': options['repeticiones'],
+            'sin_cache': options['sin_cache'],
+            'volumen': self._volumen(),
+            'conexiones': {
+                'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+                'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+                'pgbouncer': bool(connection.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS')),
+            },
+            'resultados': resultados,
+        }
+        salida = json.dumps(reporte, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(salida)
+            self.stdout.write(self.style.SUCCESS(f"Reporte escrito en {options['salida']}"))
+        else:
+            self.stdout.write(salida)
+
+        if options['comparar']:
+            self._comparar(options['comparar'], resultados)
+
+    def _usuario(self, email):
+        if email:
+            usuario = Usuario.objects.filter(email=email).first()
+        else:
+            usuario = Usuario.objects.filter(rol=Usuario.Rol.ADMIN, is_active=True).first()
+        if usuario is None:
+            raise CommandError('No se encontró el usuario para ejecutar las peticiones')
+        return usuario
+
+    def _casos(self):
+        """Endpoints a medir: nombre -> URL (GET) o función sin argumentos."""
+        proyecto = Proyecto.objects.annotate(n=Count('proveedores')).order_by('-n').first()
+        participacion = ProveedorProyecto.objects.filter(etapa3__isnull=False).annotate(
+            n=Count('etapa3__tareas')
+        ).order_by('-n').first()
+        if proyecto is None or participacion is None:
+            raise CommandError('No hay datos suficientes; ejecute sembrar_datos_rendimiento')
+
+        return {
+            'web.dashboard': reverse('core:dashboard'),
+            'web.proyectos': reverse('proyectos:lista'),
+            'web.kanban': reverse('etapas:kanban_data', args=[participacion.pk]),
+            'web.notificaciones_no_leidas': reverse('notificaciones:no_leidas'),
+            'api.proyectos': '/api/proyectos/',
+            'api.proveedores_proyecto': '/api/proveedores-proyecto/',
+            'api.tareas': '/api/etapa3/tareas/',
+            'api.sesiones': '/api/etapa3/sesiones/',
+            'api.kpis': '/api/etapa4/kpis/',
+            'api.proyecto_dashboard': f'/api/proyectos/{proyecto.pk}/dashboard/',
+            'api.proyecto_burndown': f'/api/proyectos/{proyecto.pk}/burndown/?serie=0',
+            'api.tareas_vencidas_resumen': '/api/etapa3/tareas/vencidas/resumen/',
+            'api.resumenes_empresas': '/api/resumenes/empresas/',
+            'api.calendario': '/api/calendario/',
+            'api.busqueda': '/api/busqueda/?q=calidad',
+            'cola.procesar_notificaciones': self._procesar_cola,
+        }
+
+    def _procesar_cola(self):
+        """Procesa un lote de la cola dentro de una transacción revertida (medición repetible)."""
+        from apps.notificaciones.services import NotificacionService
+
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            with transaction.atomic():
+                NotificacionService.procesar_cola(limite=100)
+                transaction.set_rollback(True)
+
+    def _ejecutar(self, cliente, caso):
+        if callable(caso):
+            caso()
+            return None
+        # El cliente de pruebas no cierra conexiones entre peticiones; se emula
+        # el ciclo del servidor WSGI para que cuente el costo de conectar
+        close_old_connections()
+        respuesta = cliente.get(caso)
+        close_old_connections()
+        if respuesta.status_code >= 400:
+            raise RuntimeError(f'HTTP {respuesta.status_code}')
+        return respuesta
+
+    def _medir(self, cliente, caso, repeticiones, sin_cache):
+        try:
+            self._ejecutar(cliente, caso)  # calentamiento
+        except Exception as e:
+            return {'error': str(e)[:200]}
+
+        tiempos, consultas, tiempos_bd = [], [], []
+        for _ in range(repeticiones):
+            if sin_cache:
+                cache.clear()
+            medicion = Medicion()
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(medicion))
+                inicio = time.perf_counter()
+                self._ejecutar(cliente, caso)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(medicion.consultas)
+            tiempos_bd.append(medicion.tiempo_bd * 1000)
+
+        tiempos.sort()
+        return {
+            'mediana_ms': round(statistics.median(tiempos), 2),
+            'min_ms': round(tiempos[0], 2),
+            'p95_ms': round(tiempos[min(int(len(tiempos) * 0.95), len(tiempos) - 1)], 2),
+            'consultas': int(statistics.median(consultas)),
+            'bd_ms': round(statistics.median(tiempos_bd), 2),
+        }
+
+    def _volumen(self):
+        modelos = [
+            Proveedor, Proyecto, ProveedorProyecto, TareaImplementacion,
+            SesionAcompanamiento, Notificacion, LogActividad,
+        ]
+        return {modelo.__name__: modelo.objects.count() for modelo in modelos}
+
+    def _commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=5,
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    def _comparar(self, ruta, resultados):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                anterior = json.load(archivo)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'No se pudo leer el reporte anterior: {e}')
+
+        self.stdout.write(f"\nComparación contra {anterior.get('commit') or ruta}:")
+        for nombre, actual in resultados.items():
+            previo = anterior.get('resultados', {}).get(nombre)
+            if not previo or 'mediana_ms' not in previo or 'mediana_ms' not in actual:
+                continue
+            cambio = (actual['mediana_ms'] - previo['mediana_ms']) / previo['mediana_ms'] * 100 if previo['mediana_ms'] else 0
+            linea = (
+                f"{nombre:<32} {previo['mediana_ms']:>9} -> {actual['mediana_ms']:>9} ms ({cambio:+.1f}%)  "
+                f"consultas {previo['consultas']} -> {actual['consultas']}"
+            )
+            if cambio > 20 or actual['consultas'] > previo['consultas']:
+                self.stdout.write(self.style.WARNING(linea))
+            else:
+                self.stdout.write(linea)
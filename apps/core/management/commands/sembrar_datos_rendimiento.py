@@ -0,0 +1,331 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.models import LogActividad, Usuario
+from apps.empresas.models import EmpresaAncla
+from apps.etapas.models import (
+    AccionMejora, CronogramaImplementacion, DiagnosticoCompetitividad, Etapa1Diagnostico,
+    Etapa2Plan, Etapa3Implementacion, Etapa4Monitoreo, HallazgoProblema, IndicadorKPI,
+    MedicionKPI, ObjetivoFortalecimiento, SesionAcompanamiento, TareaImplementacion, VozCliente,
+)
+from apps.notificaciones.models import ColaNotificacion, Notificacion
+from apps.proveedores.models import Proveedor
+from apps.proyectos.models import ProveedorProyecto, Proyecto
+
+PREFIJO = 'BENCH'
+DOMINIO = 'benchmark.local'
+LOTE = 2000
+
+CIUDADES = [
+    ('Bogotá', 'Cundinamarca'), ('Medellín', 'Antioquia'), ('Cali', 'Valle del Cauca'),
+    ('Barranquilla', 'Atlántico'), ('Bucaramanga', 'Santander'), ('Pereira', 'Risaralda'),
+]
+TEMAS = [
+    'Planeación estratégica', 'Costeo de productos', 'Gestión de inventarios',
+    'Indicadores comerciales', 'Seguridad y salud en el trabajo', 'Control de calidad',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera un volumen realista de datos de prueba (empresas, proveedores, participaciones '
+        'con etapas 1-4 completas, tareas, sesiones, KPIs, notificaciones y logs) con bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empresas', type=int, default=20, help='Empresas ancla')
+        parser.add_argument('--proveedores', type=int, default=10000, help='Proveedores')
+        parser.add_argument('--proyectos', type=int, default=3, help='Proyectos por empresa')
+        parser.add_argument('--participaciones', type=int, default=3000, help='Participaciones (ProveedorProyecto)')
+        parser.add_argument('--consultores', type=int, default=50, help='Consultores')
+        parser.add_argument('--semilla', type=int, default=42, help='Semilla aleatoria')
+        parser.add_argument('--limpiar', action='store_true', help='Eliminar los datos generados y salir')
+
+    def handle(self, *args, **options):
+        if options['limpiar']:
+            self._limpiar()
+            return
+        if EmpresaAncla.objects.filter(nit__startswith=f'{PREFIJO}-').exists():
+            raise CommandError('Ya existen datos de rendimiento; use --limpiar primero')
+        if options['participaciones'] > options['proveedores'] * options['empresas'] * options['proyectos']:
+            raise CommandError('Demasiadas participaciones para los proveedores y proyectos dados')
+
+        self.rng = random.Random(options['semilla'])
+        self.hoy = timezone.localdate()
+        self.conteos = {}
+        inicio = time.perf_counter()
+
+        with transaction.atomic():
+            consultores = self._usuarios(options['consultores'])
+            empresas = self._empresas(options['empresas'])
+            proyectos = self._proyectos(empresas, options['proyectos'], consultores)
+            proveedores = self._proveedores(options['proveedores'])
+            participaciones = self._participaciones(proyectos, proveedores, consultores, options['participaciones'])
+            self._etapa1(participaciones)
+            self._etapa2(participaciones)
+            self._etapa3(participaciones, consultores)
+            self._etapa4(participaciones)
+            self._notificaciones(consultores)
+            self._logs(participaciones, consultores)
+        generacion = time.perf_counter() - inicio
+
+        for modelo, total in self.conteos.items():
+            self.stdout.write(f'  {modelo}: {total}')
+        self.stdout.write(f'Datos generados en {generacion:.1f}s; reconstruyendo datos derivados...')
+
+        self._derivados()
+        self.stdout.write(self.style.SUCCESS(f'Listo en {time.perf_counter() - inicio:.1f}s'))
+
+    def _crear(self, modelo, objetos):
+        modelo.objects.bulk_create(objetos, batch_size=LOTE)
+        self.conteos[modelo.__name__] = self.conteos.get(modelo.__name__, 0) + len(objetos)
+        return objetos
+
+    def _usuarios(self, n):
+        clave = make_password(None)
+        return self._crear(Usuario, [
+            Usuario(
+                email=f'consultor{i:04d}@{DOMINIO}', password=clave,
+                nombre=f'Consultor {i}', apellido=PREFIJO, rol=Usuario.Rol.CONSULTOR,
+            )
+            for i in range(n)
+        ])
+
+    def _empresas(self, n):
+        sectores = [valor for valor, _ in EmpresaAncla.SectorEconomico.choices]
+        return self._crear(EmpresaAncla, [
+            EmpresaAncla(
+                nombre=f'Empresa Ancla {i:03d}', nit=f'{PREFIJO}-E{i:05d}',
+                sector_economico=self.rng.choice(sectores),
+            )
+            for i in range(n)
+        ])
+
+    def _proyectos(self, empresas, por_empresa, consultores):
+        proyectos = []
+        for empresa in empresas:
+            for j in range(por_empresa):
+                inicio = self.hoy - timedelta(days=self.rng.randint(30, 300))
+                proyectos.append(Proyecto(
+                    codigo=f'{PREFIJO}-{len(proyectos):05d}',
+                    nombre=f'Fortalecimiento {empresa.nombre} {j + 1}',
+                    empresa_ancla=empresa,
+                    fecha_inicio=inicio,
+                    fecha_fin_planeada=inicio + timedelta(days=self.rng.randint(120, 400)),
+                    estado=self.rng.choice([Proyecto.EstadoProyecto.EN_CURSO] * 4 + [Proyecto.EstadoProyecto.FINALIZADO]),
+                    director_proyecto=self.rng.choice(consultores),
+                    presupuesto=Decimal(self.rng.randint(50, 500) * 1000000),
+                ))
+        return self._crear(Proyecto, proyectos)
+
+    def _proveedores(self, n):
+        sectores = [valor for valor, _ in Proveedor.SectorEconomico.choices]
+        tamanos = [valor for valor, _ in Proveedor.TamanoEmpresa.choices]
+        proveedores = []
+        for i in range(n):
+            ciudad, departamento = self.rng.choice(CIUDADES)
+            proveedores.append(Proveedor(
+                razon_social=f'Proveedor {i:05d} S.A.S.', nit=f'{PREFIJO}-P{i:06d}',
+                representante_legal=f'Representante {i}', email=f'proveedor{i:05d}@{DOMINIO}',
+                telefono=f'60{i:08d}', direccion=f'Calle {i % 200} # {i % 90}-{i % 50}',
+                ciudad=ciudad, departamento=departamento,
+                sector_economico=self.rng.choice(sectores), tamano_empresa=self.rng.choice(tamanos),
+                numero_empleados=self.rng.randint(1, 400),
+            ))
+        return self._crear(Proveedor, proveedores)
+
+    def _participaciones(self, proyectos, proveedores, consultores, n):
+        parejas = set()
+        while len(parejas) < n:
+            parejas.add((self.rng.randrange(len(proyectos)), self.rng.randrange(len(proveedores))))
+
+        participaciones = []
+        for p, q in sorted(parejas):
+            proyecto = proyectos[p]
+            etapa = self.rng.choices([1, 2, 3, 4], weights=[2, 2, 4, 2])[0]
+            participaciones.append(ProveedorProyecto(
+                proveedor=proveedores[q], proyecto=proyecto,
+                consultor_asignado=self.rng.choice(consultores),
+                etapa_actual=etapa,
+                estado=ProveedorProyecto.EstadoParticipacion.EN_PROCESO,
+                fecha_inicio=proyecto.fecha_inicio,
+                fecha_fin_planeada=proyecto.fecha_fin_planeada,
+                porcentaje_avance=Decimal((etapa - 1) * 25 + self.rng.randint(0, 24)),
+            ))
+        return self._crear(ProveedorProyecto, participaciones)
+
+    def _etapa1(self, participaciones):
+        etapas = self._crear(Etapa1Diagnostico, [
+            Etapa1Diagnostico(proveedor_proyecto=pp, estado=Etapa1Diagnostico.Estado.COMPLETADO)
+            for pp in participaciones
+        ])
+        areas = [valor for valor, _ in DiagnosticoCompetitividad.AreaEvaluada.choices]
+        voces, diagnosticos, objetivos = [], [], []
+        for etapa in etapas:
+            for i in range(2):
+                voces.append(VozCliente(
+                    etapa1=etapa, empresa_ancla_contacto=f'Contacto {i}',
+                    fecha_entrevista=self.hoy - timedelta(days=self.rng.randint(60, 300)),
+                    necesidades_identificadas=f'{self.rng.choice(TEMAS)}: requiere mejorar tiempos de entrega',
+                    expectativas='Cumplimiento de estándares de calidad y entregas a tiempo',
+                ))
+            for area in areas:
+                nivel = self.rng.randint(1, 5)
+                diagnosticos.append(DiagnosticoCompetitividad(
+                    etapa1=etapa, area_evaluada=area, nivel_madurez=nivel,
+                    puntaje=Decimal(nivel * 20 - self.rng.randint(0, 10)),
+                ))
+            for i in range(2):
+                objetivos.append(ObjetivoFortalecimiento(
+                    etapa1=etapa, objetivo=f'Mejorar {self.rng.choice(TEMAS).lower()}',
+                    medible='Porcentaje de cumplimiento', valor_inicial=Decimal(self.rng.randint(10, 50)),
+                    valor_meta=Decimal(self.rng.randint(60, 100)), prioridad=i + 1,
+                ))
+        self._crear(VozCliente, voces)
+        self._crear(DiagnosticoCompetitividad, diagnosticos)
+        self._crear(ObjetivoFortalecimiento, objetivos)
+
+    def _etapa2(self, participaciones):
+        planes = self._crear(Etapa2Plan, [
+            Etapa2Plan(proveedor_proyecto=pp, estado=Etapa2Plan.Estado.APROBADO)
+            for pp in participaciones if pp.etapa_actual >= 2
+        ])
+        hallazgos = self._crear(HallazgoProblema, [
+            HallazgoProblema(
+                etapa2=plan, codigo=f'H-{i + 1}', orden=i + 1,
+                hallazgo=f'Debilidad en {self.rng.choice(TEMAS).lower()}',
+                problema_identificado='Procesos no documentados', causa_raiz='Falta de estandarización',
+                prioridad=self.rng.choice([valor for valor, _ in HallazgoProblema.Prioridad.choices]),
+            )
+            for plan in planes for i in range(3)
+        ])
+        acciones = self._crear(AccionMejora, [
+            AccionMejora(
+                hallazgo=hallazgo, descripcion='Documentar y estandarizar el proceso',
+                seleccionada=True, impacto_esperado=self.rng.randint(1, 5),
+                esfuerzo_requerido=self.rng.randint(1, 5),
+            )
+            for hallazgo in hallazgos
+        ])
+        self._crear(CronogramaImplementacion, [
+            CronogramaImplementacion(
+                etapa2=accion.hallazgo.etapa2, accion_mejora=accion, actividad='Implementar acción',
+                fecha_inicio_planeada=self.hoy - timedelta(days=30),
+                fecha_fin_planeada=self.hoy + timedelta(days=self.rng.randint(-20, 60)),
+                responsable='Gerente del proveedor',
+            )
+            for accion in acciones
+        ])
+
+    def _etapa3(self, participaciones, consultores):
+        etapas = self._crear(Etapa3Implementacion, [
+            Etapa3Implementacion(proveedor_proyecto=pp, estado=Etapa3Implementacion.Estado.EN_PROCESO)
+            for pp in participaciones if pp.etapa_actual >= 3
+        ])
+        estados = [valor for valor, _ in TareaImplementacion.Estado.choices]
+        prioridades = [valor for valor, _ in TareaImplementacion.Prioridad.choices]
+        modalidades = [valor for valor, _ in SesionAcompanamiento.Modalidad.choices]
+        ahora = timezone.now()
+        tareas, sesiones = [], []
+        for etapa in etapas:
+            consultor = etapa.proveedor_proyecto.consultor_asignado
+            for i in range(8):
+                tareas.append(TareaImplementacion(
+                    etapa3=etapa, titulo=f'Tarea {i + 1}: {self.rng.choice(TEMAS)}', orden=i + 1,
+                    estado=self.rng.choice(estados), prioridad=self.rng.choice(prioridades),
+                    fecha_inicio_planeada=self.hoy - timedelta(days=self.rng.randint(10, 90)),
+                    fecha_fin_planeada=self.hoy + timedelta(days=self.rng.randint(-30, 60)),
+                    responsable=consultor, porcentaje_avance=self.rng.choice([0, 25, 50, 75, 100]),
+                ))
+            for i in range(6):
+                fecha = ahora - timedelta(days=self.rng.randint(0, 120), hours=self.rng.randint(0, 8))
+                duracion = Decimal(self.rng.choice([1, 1.5, 2, 3]))
+                sesiones.append(SesionAcompanamiento(
+                    etapa3=etapa, fecha=fecha, duracion_horas=duracion,
+                    fecha_fin=fecha + timedelta(hours=float(duracion)),
+                    modalidad=self.rng.choice(modalidades), consultor=consultor,
+                    temas_tratados=self.rng.choice(TEMAS),
+                ))
+        self._crear(TareaImplementacion, tareas)
+        self._crear(SesionAcompanamiento, sesiones)
+
+    def _etapa4(self, participaciones):
+        etapas = self._crear(Etapa4Monitoreo, [
+            Etapa4Monitoreo(proveedor_proyecto=pp, estado=Etapa4Monitoreo.Estado.EN_PROCESO)
+            for pp in participaciones if pp.etapa_actual >= 4
+        ])
+        indicadores = self._crear(IndicadorKPI, [
+            IndicadorKPI(
+                etapa4=etapa, nombre=f'KPI {i + 1}', unidad_medida='%',
+                valor_inicial=Decimal(self.rng.randint(10, 40)), valor_meta=Decimal(self.rng.randint(60, 100)),
+            )
+            for etapa in etapas for i in range(3)
+        ])
+        mediciones = []
+        for indicador in indicadores:
+            valor = float(indicador.valor_inicial)
+            for semana in range(8, 0, -1):
+                valor = max(0.0, valor + self.rng.uniform(-3, 8))
+                mediciones.append(MedicionKPI(
+                    indicador=indicador, fecha_medicion=self.hoy - timedelta(weeks=semana),
+                    valor=Decimal(f'{valor:.2f}'),
+                ))
+            indicador.valor_actual = mediciones[-1].valor
+        self._crear(MedicionKPI, mediciones)
+        IndicadorKPI.objects.bulk_update(indicadores, ['valor_actual'], batch_size=LOTE)
+
+    def _notificaciones(self, consultores):
+        estados = [valor for valor, _ in Notificacion.Estado.choices]
+        notificaciones = self._crear(Notificacion, [
+            Notificacion(
+                usuario=consultor, tipo='SISTEMA', titulo=f'Notificación {i + 1}',
+                mensaje='Tiene tareas pendientes por revisar', estado=self.rng.choice(estados),
+            )
+            for consultor in consultores for i in range(40)
+        ])
+        self._crear(ColaNotificacion, [
+            ColaNotificacion(notificacion=n, prioridad=self.rng.randint(1, 4))
+            for n in notificaciones if n.estado == Notificacion.Estado.PENDIENTE
+        ])
+
+    def _logs(self, participaciones, consultores):
+        acciones = [valor for valor, _ in LogActividad.Accion.choices]
+        self._crear(LogActividad, [
+            LogActividad(
+                usuario=self.rng.choice(consultores), accion=self.rng.choice(acciones),
+                modelo='ProveedorProyecto', objeto_id=str(pp.pk),
+                descripcion=f'Actividad sobre {pp.proveedor.razon_social}',
+            )
+            for pp in participaciones for _ in range(5)
+        ])
+
+    def _derivados(self):
+        """Datos que normalmente mantienen señales y save(), que bulk_create omite."""
+        from apps.etapas.horas import verificar_horas
+        from apps.etapas.tendencias import recalcular_masivo
+        from apps.reportes.burndown import reconstruir_consumos
+        from apps.reportes.services import refrescar_resumenes
+
+        proyectos = Proyecto.objects.filter(codigo__startswith=f'{PREFIJO}-')
+        verificar_horas(reparar=True)
+        reconstruir_consumos(proyectos)
+        recalcular_masivo(IndicadorKPI.objects.filter(etapa4__proveedor_proyecto__proyecto__in=proyectos))
+        refrescar_resumenes(completo=True)
+        call_command('reindexar_busqueda', stdout=self.stdout)
+
+    def _limpiar(self):
+        with transaction.atomic():
+            LogActividad.objects.filter(usuario__email__endswith=f'@{DOMINIO}').delete()
+            Proyecto.objects.filter(codigo__startswith=f'{PREFIJO}-').delete()
+            Proveedor.objects.filter(nit__startswith=f'{PREFIJO}-').delete()
+            EmpresaAncla.objects.filter(nit__startswith=f'{PREFIJO}-').delete()
+            Usuario.objects.filter(email__endswith=f'@{DOMINIO}').delete()
+        self.stdout.write(self.style.SUCCESS('Datos de rendimiento eliminados'))
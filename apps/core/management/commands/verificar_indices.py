@@ -0,0 +1,110 @@
+import json
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from apps.core import alcance
+from apps.core.models import LogActividad
+from apps.etapas.models import MedicionKPI, TareaImplementacion
+from apps.notificaciones.models import ColaNotificacion, Notificacion
+from apps.proyectos.models import ProveedorProyecto
+
+# SQLite: "SCAN tabla" sin índice es un recorrido completo de la tabla
+_SCAN_SQLITE = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?:\s+AS\s+\w+)?(?!.*\bUSING\b)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Ejecuta EXPLAIN sobre las consultas más frecuentes y falla si alguna recorre '
+        'secuencialmente una tabla con más filas que el umbral.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--umbral', type=int, default=1000, help='Filas a partir de las cuales un recorrido secuencial es un fallo')
+        parser.add_argument('--analizar', action='store_true', help='Actualizar estadísticas (ANALYZE) antes de verificar')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f'Motor no soportado: {connection.vendor}')
+        if options['analizar']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        fallos = []
+        for nombre, queryset in self._consultas().items():
+            plan, recorridos = self._explicar(queryset)
+            grandes = {tabla: filas for tabla, filas in recorridos.items() if filas > options['umbral']}
+            if grandes:
+                fallos.append(nombre)
+                detalle = ', '.join(f'{tabla} ({filas} filas)' for tabla, filas in grandes.items())
+                self.stdout.write(self.style.ERROR(f'{nombre:<32} recorrido secuencial: {detalle}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{nombre:<32} OK'))
+            if options['verbosity'] >= 2:
+                self.stdout.write(plan + '\n')
+
+        if fallos:
+            raise CommandError(f"{len(fallos)} consulta(s) sin índice adecuado: {', '.join(fallos)}")
+
+    def _consultas(self):
+        """Consultas calientes: nombre -> queryset (con parámetros tomados de los datos)."""
+        participacion = ProveedorProyecto.objects.filter(
+            etapa3__isnull=False, consultor_asignado__isnull=False
+        ).select_related('etapa3', 'consultor_asignado').first()
+        notificacion = Notificacion.objects.only('usuario_id').first()
+        medicion = MedicionKPI.objects.only('indicador_id').first()
+        if participacion is None or notificacion is None or medicion is None:
+            raise CommandError('No hay datos suficientes; ejecute sembrar_datos_rendimiento')
+
+        return {
+            'notificaciones.no_leidas': Notificacion.objects.filter(
+                usuario_id=notificacion.usuario_id, tipo='SISTEMA', estado__in=['PENDIENTE', 'ENVIADA']
+            ).order_by('-created_at')[:10],
+            'notificaciones.cola_pendiente': ColaNotificacion.objects.filter(
+                procesado=False
+            ).order_by('-prioridad', 'created_at')[:100],
+            'proyectos.embudo_etapas': ProveedorProyecto.objects.filter(
+                proyecto_id=participacion.proyecto_id, etapa_actual=3, estado='EN_PROCESO'
+            ).order_by().values('id'),
+            'etapas.kanban': TareaImplementacion.objects.filter(
+                etapa3=participacion.etapa3, estado='PENDIENTE'
+            ).order_by('orden'),
+            'etapas.tareas_alcance_consultor': alcance.calcular(participacion.consultor_asignado).filtrar(
+                TareaImplementacion.objects.all(), 'etapa3__proveedor_proyecto'
+            ),
+            'etapas.tareas_vencidas': TareaImplementacion.objects.exclude(
+                estado='COMPLETADA'
+            ).filter(fecha_fin_planeada__lt=timezone.localdate()),
+            'etapas.serie_kpi': MedicionKPI.objects.filter(
+                indicador_id=medicion.indicador_id
+            ).order_by('fecha_medicion'),
+            'core.actividad_reciente': LogActividad.objects.order_by('-created_at')[:10],
+        }
+
+    def _explicar(self, queryset):
+        """
+        Returns:
+            Tupla (plan en texto, {tabla: filas} de las tablas recorridas secuencialmente)
+        """
+        if connection.vendor == 'postgresql':
+            plan = queryset.explain(format='json')
+            tablas = self._scans_postgresql(json.loads(plan)[0]['Plan'])
+        else:
+            plan = queryset.explain()
+            tablas = set(_SCAN_SQLITE.findall(plan))
+        return plan, {tabla: self._filas(tabla) for tabla in tablas}
+
+    def _scans_postgresql(self, nodo):
+        tablas = set()
+        if nodo.get('Node Type') in ('Seq Scan', 'Parallel Seq Scan'):
+            tablas.add(nodo['Relation Name'])
+        for hijo in nodo.get('Plans', []):
+            tablas |= self._scans_postgresql(hijo)
+        return tablas
+
+    def _filas(self, tabla):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(tabla)}')
+            return cursor.fetchone()[0]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="logactividad",
+            index=models.Index(fields=["-created_at"], name="core_log_fecha_idx"),
+        ),
+    ]
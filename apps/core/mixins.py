@@ -60,27 +60,14 @@ class AuditMixin:
 
 
 class EmpresaAnclaMixin:
-    """Mixin para filtrar objetos por empresa ancla del usuario."""
+    """
+    Mixin para filtrar objetos según el alcance de acceso del usuario.
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        user = self.request.user
+    ``ruta_participacion`` indica la ruta hasta ProveedorProyecto para
+    modelos distintos de EmpresaAncla, Proyecto, Proveedor y ProveedorProyecto.
+    """
+    ruta_participacion = None
 
-        if user.es_admin:
-            return queryset
-
-        if user.es_empresa_ancla:
-            empresas_ids = user.empresas_ancla.values_list('empresa_ancla_id', flat=True)
-            return queryset.filter(empresa_ancla_id__in=empresas_ids)
-
-        if user.es_consultor:
-            # Consultores ven los proyectos asignados
-            from apps.proyectos.models import ProveedorProyecto
-            proyectos_ids = ProveedorProyecto.objects.filter(
-                consultor_asignado=user
-            ).values_list('proyecto_id', flat=True)
-            if hasattr(queryset.model, 'proyecto'):
-                return queryset.filter(proyecto_id__in=proyectos_ids)
-            return queryset
-
-        return queryset.none()
+    def get_queryset(self):
+        from .alcance import obtener
+        return obtener(self.request.user).filtrar(super().get_queryset(), self.ruta_participacion)
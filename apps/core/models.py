@@ -165,21 +165,9 @@ class ConfiguracionSistema(models.Model):
 
     @classmethod
     def get_valor(cls, clave, default=None):
-        """Obtener valor de configuración por clave."""
-        try:
-            config = cls.objects.get(clave=clave, is_active=True)
-            if config.tipo == 'INTEGER':
-                return int(config.valor)
-            elif config.tipo == 'FLOAT':
-                return float(config.valor)
-            elif config.tipo == 'BOOLEAN':
-                return config.valor.lower() in ('true', '1', 'yes')
-            elif config.tipo == 'JSON':
-                import json
-                return json.loads(config.valor)
-            return config.valor
-        except cls.DoesNotExist:
-            return default
+        """Obtener valor de configuración por clave (ver apps.core.configuracion)."""
+        from .configuracion import valor
+        return valor(clave, default)
 
 
 class LogActividad(models.Model):
@@ -216,6 +204,9 @@ class LogActividad(models.Model):
         verbose_name = 'Log de Actividad'
         verbose_name_plural = 'Logs de Actividad'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='core_log_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.usuario} - {self.accion} - {self.created_at}"
@@ -0,0 +1,221 @@
+"""
+Caché de datos de referencia en dos niveles.
+
+Para datos que se leen en rutas calientes y cambian rara vez (plantillas y
+configuraciones de envío, configuración del sistema). Cada conjunto se
+declara con ``DatosReferencia(nombre, cargar, modelos)``:
+
+1. Memoria del proceso: LRU acotado (``REFERENCIA_CAPACIDAD_LOCAL``). Una
+   entrada se usa sin consultar nada durante ``REFERENCIA_TTL_LOCAL``
+   segundos, o ``REFERENCIA_TTL_LOCAL_SUSCRITO`` si el proceso está
+   suscrito a las invalidaciones por Redis.
+2. Caché compartida (``CACHES['default']``, Redis en producción) con clave
+   versionada ``referencia:<nombre>:<versión>``; pasado el TTL local solo se
+   compara la versión.
+3. Base de datos, protegida contra estampidas: un único hilo por proceso y
+   un único proceso (bloqueo ``cache.add``) recargan; el resto espera el
+   valor publicado en la caché compartida.
+
+Los ``post_save``/``post_delete`` de los modelos declarados renuevan la
+versión al confirmar la transacción y la difunden por el canal Redis
+``referencia:invalidar``; cada proceso descarta su copia local al recibirla.
+Sin Redis, las copias locales caducan por TTL corto.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+CANAL = 'referencia:invalidar'
+CLAVE_VERSION = 'referencia:{}:version'
+CLAVE_VALOR = 'referencia:{}:{}'
+CLAVE_BLOQUEO = 'referencia:{}:{}:bloqueo'
+TTL_COMPARTIDO = 60 * 60 * 24
+TTL_BLOQUEO = 30
+ESPERA_MAXIMA = 2.0
+PAUSA_ESPERA = 0.05
+
+_registro = {}
+
+
+class _Local:
+    """LRU del proceso: nombre -> (versión, valor, verificado_en)."""
+
+    def __init__(self):
+        self.entradas = OrderedDict()
+        self.candado = threading.Lock()
+        self.pid = os.getpid()
+
+    def obtener(self, nombre):
+        with self.candado:
+            entrada = self.entradas.get(nombre)
+            if entrada is not None:
+                self.entradas.move_to_end(nombre)
+            return entrada
+
+    def guardar(self, nombre, version, valor):
+        with self.candado:
+            self.entradas[nombre] = (version, valor, time.monotonic())
+            self.entradas.move_to_end(nombre)
+            while len(self.entradas) > settings.REFERENCIA_CAPACIDAD_LOCAL:
+                self.entradas.popitem(last=False)
+
+    def descartar(self, nombre):
+        with self.candado:
+            self.entradas.pop(nombre, None)
+
+    def vaciar(self):
+        with self.candado:
+            self.entradas.clear()
+
+
+_local = _Local()
+_suscriptor = {'hilo': None, 'activo': False}
+
+
+def _memoria():
+    """LRU del proceso actual (se reinicia tras un fork)."""
+    global _local
+    if _local.pid != os.getpid():
+        _local = _Local()
+        _suscriptor.update(hilo=None, activo=False)
+    return _local
+
+
+# Invalidación por Redis pub/sub
+
+def _escuchar():
+    import redis
+
+    espera = 1
+    while True:
+        try:
+            cliente = redis.Redis.from_url(settings.REFERENCIA_REDIS_URL, socket_connect_timeout=2)
+            pubsub = cliente.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CANAL)
+            # Lo invalidado mientras no había suscripción se descarta
+            _memoria().vaciar()
+            _suscriptor['activo'] = True
+            espera = 1
+            for mensaje in pubsub.listen():
+                _memoria().descartar(mensaje['data'].decode())
+        except Exception as e:
+            if _suscriptor['activo'] or espera == 1:
+                logger.warning(f"Sin suscripción a invalidaciones de referencia, se usa TTL local corto: {e}")
+            _suscriptor['activo'] = False
+            time.sleep(espera)
+            espera = min(espera * 2, 60)
+
+
+def _asegurar_suscripcion():
+    if _suscriptor['hilo'] is None:
+        _suscriptor['hilo'] = threading.Thread(target=_escuchar, name='referencia-invalidaciones', daemon=True)
+        _suscriptor['hilo'].start()
+
+
+def _difundir(nombre):
+    try:
+        import redis
+
+        redis.Redis.from_url(
+            settings.REFERENCIA_REDIS_URL, socket_connect_timeout=2, socket_timeout=2
+        ).publish(CANAL, nombre)
+    except Exception as e:
+        logger.warning(f"No se pudo difundir la invalidación de {nombre}: {e}")
+
+
+class DatosReferencia:
+    """
+    Conjunto de datos de referencia cacheado en dos niveles.
+
+    Args:
+        nombre: Identificador único del conjunto
+        cargar: Función sin argumentos que lo lee de la base de datos; el
+            resultado debe ser serializable con pickle
+        modelos: Modelos ('app.Modelo') cuyos cambios lo invalidan
+    """
+
+    def __init__(self, nombre, cargar, modelos=()):
+        if nombre in _registro:
+            raise ValueError(f'Conjunto de referencia duplicado: {nombre}')
+        self.nombre = nombre
+        self.cargar = cargar
+        self._candado = threading.Lock()
+        _registro[nombre] = self
+        for modelo in modelos:
+            for evento, senal in (('save', post_save), ('delete', post_delete)):
+                senal.connect(
+                    self._al_cambiar, sender=modelo, weak=False,
+                    dispatch_uid=f'referencia_{nombre}_{evento}_{modelo}'
+                )
+
+    def __repr__(self):
+        return f'<DatosReferencia {self.nombre}>'
+
+    def obtener(self):
+        """Valor vigente del conjunto."""
+        memoria = _memoria()
+        _asegurar_suscripcion()
+        entrada = memoria.obtener(self.nombre)
+        ttl = settings.REFERENCIA_TTL_LOCAL_SUSCRITO if _suscriptor['activo'] else settings.REFERENCIA_TTL_LOCAL
+        if entrada is not None and time.monotonic() - entrada[2] < ttl:
+            return entrada[1]
+
+        with self._candado:
+            # Otro hilo pudo recargarlo mientras se esperaba el candado
+            entrada = memoria.obtener(self.nombre)
+            if entrada is not None and time.monotonic() - entrada[2] < ttl:
+                return entrada[1]
+            version = cache.get_or_set(CLAVE_VERSION.format(self.nombre), time.time_ns, None)
+            if entrada is not None and entrada[0] == version:
+                memoria.guardar(self.nombre, version, entrada[1])
+                return entrada[1]
+            valor = self._compartido(version)
+            memoria.guardar(self.nombre, version, valor)
+            return valor
+
+    def _compartido(self, version):
+        """Valor de la caché compartida, recargándolo con un único proceso."""
+        clave = CLAVE_VALOR.format(self.nombre, version)
+        guardado = cache.get(clave)
+        if guardado is not None:
+            return guardado[0]
+
+        bloqueo = CLAVE_BLOQUEO.format(self.nombre, version)
+        propio = cache.add(bloqueo, 1, TTL_BLOQUEO)
+        if not propio:
+            limite = time.monotonic() + ESPERA_MAXIMA
+            while time.monotonic() < limite:
+                time.sleep(PAUSA_ESPERA)
+                guardado = cache.get(clave)
+                if guardado is not None:
+                    return guardado[0]
+        try:
+            valor = self.cargar()
+            # Tupla para distinguir un valor None de una clave ausente
+            cache.set(clave, (valor,), TTL_COMPARTIDO)
+        finally:
+            if propio:
+                cache.delete(bloqueo)
+        return valor
+
+    def invalidar(self):
+        """Renueva la versión y difunde la invalidación al confirmar la transacción."""
+        def aplicar():
+            cache.set(CLAVE_VERSION.format(self.nombre), time.time_ns(), None)
+            _memoria().descartar(self.nombre)
+            _difundir(self.nombre)
+
+        transaction.on_commit(aplicar)
+
+    def _al_cambiar(self, sender, raw=False, **kwargs):
+        if not raw:
+            self.invalidar()
@@ -0,0 +1,157 @@
+"""
+Enrutamiento de lecturas pesadas a una réplica de la base de datos.
+
+Las lecturas van a la réplica solo dentro de un contexto marcado:
+
+- Peticiones GET/HEAD/OPTIONS a vistas con ``usar_replica = True`` (vistas
+  de clase, viewsets de DRF o funciones decoradas con ``lectura_replica``),
+  activadas por ``ReplicaMiddleware``.
+- Tareas de Celery y funciones decoradas con ``lectura_replica`` o código
+  dentro de ``with en_replica():``.
+
+Fuera de esos contextos, dentro de una transacción y después de la primera
+escritura del contexto, todo se lee del primario. Tras una petición que
+escribe, el middleware deja la cookie ``replica_fijar`` durante
+``REPLICA_FIJACION_SEGUNDOS`` (mayor que el retraso de replicación
+esperado), de modo que el usuario lee sus propios cambios del primario.
+
+Si ``REPLICA_ALIAS`` no está en ``DATABASES`` el enrutador no cambia nada.
+Para probarlo localmente basta un segundo alias SQLite o PostgreSQL (ver
+``config/settings/development.py``).
+"""
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+COOKIE_FIJACION = 'replica_fijar'
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS')
+# Tablas que deben leerse siempre del primario (la sesión recién creada al
+# iniciar sesión aún puede no estar en la réplica)
+APPS_PRIMARIO = {'sessions'}
+
+
+class _Contexto:
+    __slots__ = ('replica', 'escritura')
+
+    def __init__(self, replica=False):
+        self.replica = replica
+        self.escritura = False
+
+
+_contexto = contextvars.ContextVar('replica_contexto', default=None)
+
+
+def alias():
+    """Alias de la réplica, o None si no está configurada."""
+    nombre = settings.REPLICA_ALIAS
+    return nombre if nombre in settings.DATABASES else None
+
+
+def leyendo_de_replica():
+    """Indica si las lecturas del contexto actual van a la réplica."""
+    contexto = _contexto.get()
+    return bool(contexto and contexto.replica and not contexto.escritura and alias())
+
+
+@contextmanager
+def en_replica():
+    """Envía a la réplica las lecturas del bloque (hasta su primera escritura)."""
+    token = _contexto.set(_Contexto(replica=True))
+    try:
+        yield
+    finally:
+        _contexto.reset(token)
+
+
+def lectura_replica(funcion):
+    """
+    Decorador para tareas de Celery y vistas de función de solo lectura.
+
+    En vistas solo marca la función; el middleware decide según el método y
+    la fijación del usuario.
+    """
+    @wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if _contexto.get() is not None:
+            return funcion(*args, **kwargs)
+        with en_replica():
+            return funcion(*args, **kwargs)
+
+    envoltura.usar_replica = True
+    return envoltura
+
+
+class RouterReplica:
+    """Router de base de datos: escrituras al primario, lecturas según el contexto."""
+
+    def db_for_read(self, model, **hints):
+        contexto = _contexto.get()
+        if (
+            contexto is None or not contexto.replica or contexto.escritura
+            or model._meta.app_label in APPS_PRIMARIO
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return alias() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        contexto = _contexto.get()
+        if contexto is not None:
+            contexto.escritura = True
+        # Explícito: una instancia leída de la réplica se guarda en el primario
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bases = {DEFAULT_DB_ALIAS, settings.REPLICA_ALIAS}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == settings.REPLICA_ALIAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Activa la réplica para peticiones seguras a vistas marcadas y fija al
+    primario a quien acaba de escribir.
+
+    Debe ir después de ``AuthenticationMiddleware``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        contexto = _Contexto()
+        token = _contexto.set(contexto)
+        try:
+            response = self.get_response(request)
+        finally:
+            _contexto.reset(token)
+        if contexto.escritura and alias():
+            response.set_cookie(
+                COOKIE_FIJACION, '1', max_age=settings.REPLICA_FIJACION_SEGUNDOS,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in METODOS_SEGUROS or request.COOKIES.get(COOKIE_FIJACION):
+            return None
+        clase = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+        if not (getattr(view_func, 'usar_replica', False) or getattr(clase, 'usar_replica', False)):
+            return None
+        if alias() is None:
+            return None
+        usuario = getattr(request, 'user', None)
+        if usuario is not None:
+            # Resolver la sesión y el usuario contra el primario antes de activar la réplica
+            usuario.is_authenticated
+        _contexto.get().replica = True
+        return None
@@ -1,8 +1,12 @@
 from django.contrib.auth.signals import user_logged_in, user_logged_out
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 
-from .models import Usuario, LogActividad
+from . import alcance
+from .models import LogActividad
+
+# Campos de participaciones y proyectos que determinan quién los ve
+CAMPOS_ALCANCE = {'proyecto', 'proveedor', 'consultor_asignado', 'director_proyecto', 'empresa_ancla'}
 
 
 @receiver(user_logged_in)
@@ -30,6 +34,74 @@ def log_user_logout(sender, request, user, **kwargs):
         )
 
 
+@receiver([post_save, post_delete], sender='empresas.UsuarioEmpresaAncla')
+@receiver([post_save, post_delete], sender='proveedores.ProveedorEmpresaAncla')
+def invalidar_alcance_vinculacion(sender, **kwargs):
+    """Las vinculaciones a empresas cambian el alcance de sus usuarios."""
+    alcance.invalidar()
+
+
+def _campos_alcance(modelo):
+    return [campo.attname for campo in modelo._meta.concrete_fields if campo.name in CAMPOS_ALCANCE]
+
+
+@receiver(pre_save, sender='proyectos.ProveedorProyecto')
+@receiver(pre_save, sender='proyectos.Proyecto')
+def recordar_alcance_proyecto(sender, instance, update_fields=None, **kwargs):
+    """Guarda los valores previos de los campos de alcance para detectar reasignaciones."""
+    if instance._state.adding or (update_fields and CAMPOS_ALCANCE.isdisjoint(update_fields)):
+        instance._alcance_previo = None
+        return
+    instance._alcance_previo = sender.objects.filter(pk=instance.pk).values_list(
+        *_campos_alcance(sender)
+    ).first()
+
+
+@receiver(post_save, sender='proyectos.ProveedorProyecto')
+@receiver(post_save, sender='proyectos.Proyecto')
+def invalidar_alcance_proyecto(sender, instance, created, update_fields=None, **kwargs):
+    """Participaciones y proyectos nuevos o reasignados (no cualquier guardado)."""
+    if not created:
+        if update_fields and CAMPOS_ALCANCE.isdisjoint(update_fields):
+            return
+        actual = tuple(getattr(instance, campo) for campo in _campos_alcance(sender))
+        if getattr(instance, '_alcance_previo', None) == actual:
+            return
+    alcance.invalidar()
+
+
+@receiver(post_delete, sender='proyectos.ProveedorProyecto')
+@receiver(post_delete, sender='proyectos.Proyecto')
+def invalidar_alcance_proyecto_eliminado(sender, **kwargs):
+    """Participaciones y proyectos eliminados."""
+    alcance.invalidar()
+
+
+@receiver(pre_save, sender='proveedores.Proveedor')
+def recordar_usuario_proveedor(sender, instance, **kwargs):
+    """Guarda el usuario previo del proveedor para detectar reasignaciones."""
+    instance._usuario_previo = None if instance._state.adding else (
+        sender.objects.filter(pk=instance.pk).values_list('usuario_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender='proveedores.Proveedor')
+def invalidar_alcance_proveedor(sender, instance, created, update_fields=None, **kwargs):
+    """El usuario vinculado a un proveedor ve sus participaciones."""
+    if update_fields and 'usuario' not in update_fields:
+        return
+    previo = None if created else getattr(instance, '_usuario_previo', None)
+    if previo != instance.usuario_id:
+        alcance.invalidar()
+
+
+@receiver(post_delete, sender='proveedores.Proveedor')
+def invalidar_alcance_proveedor_eliminado(sender, instance, **kwargs):
+    """Un proveedor eliminado deja de pertenecer a su usuario."""
+    if instance.usuario_id:
+        alcance.invalidar()
+
+
 def get_client_ip(request):
     """Obtener IP del cliente."""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
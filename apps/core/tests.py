@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.empresas.models import EmpresaAncla
+from apps.proveedores.models import Proveedor
+from apps.proyectos.models import Proyecto, ProveedorProyecto
+from . import alcance
+from .models import Usuario
+
+
+class AlcanceCacheTests(TestCase):
+    """Invalidación de la caché de alcance."""
+
+    def setUp(self):
+        cache.clear()
+        self.consultor = Usuario.objects.create_user(
+            'consultor@example.com', 'x', nombre='Ana', apellido='Ruiz', rol='CONSULTOR'
+        )
+        self.otro_consultor = Usuario.objects.create_user(
+            'otro@example.com', 'x', nombre='Beto', apellido='Gil', rol='CONSULTOR'
+        )
+        empresa = EmpresaAncla.objects.create(nombre='Empresa', nit='900000020')
+        proveedor = Proveedor.objects.create(
+            razon_social='Proveedor SAS', nit='800000020', representante_legal='Luis',
+            email='proveedor@example.com', telefono='1', direccion='Calle 1',
+            ciudad='Bogotá', departamento='Cundinamarca',
+        )
+        self.proyecto = Proyecto.objects.create(
+            nombre='Proyecto', empresa_ancla=empresa, fecha_inicio=timezone.localdate(),
+            fecha_fin_planeada=timezone.localdate() + timedelta(days=90),
+        )
+        self.participacion = ProveedorProyecto.objects.create(
+            proyecto=self.proyecto, proveedor=proveedor, consultor_asignado=self.consultor
+        )
+
+    def _alcance(self, usuario):
+        # Sin la memoria por petición del objeto usuario
+        return alcance.obtener(Usuario.objects.get(pk=usuario.pk))
+
+    def test_reasignar_consultor_invalida_alcance(self):
+        self.assertFalse(self._alcance(self.otro_consultor).puede_proyecto(self.proyecto.pk))
+
+        self.participacion.consultor_asignado = self.otro_consultor
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participacion.save()
+
+        self.assertTrue(self._alcance(self.otro_consultor).puede_proyecto(self.proyecto.pk))
+        self.assertFalse(self._alcance(self.consultor).puede_proyecto(self.proyecto.pk))
+
+    def test_guardado_sin_cambios_de_alcance_conserva_version(self):
+        version = cache.get_or_set(alcance.CLAVE_VERSION, 1, None)
+
+        self.participacion.notas = 'Seguimiento'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participacion.save()
+            self.proyecto.save()
+
+        self.assertEqual(cache.get(alcance.CLAVE_VERSION), version)
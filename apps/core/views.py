@@ -47,6 +47,7 @@ class CustomLogoutView(LogoutView):
 class DashboardView(LoginRequiredMixin, TemplateView):
     """Dashboard principal del sistema."""
     template_name = 'core/dashboard.html'
+    usar_replica = True
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -3,7 +3,8 @@ from .models import (
     Etapa1Diagnostico, VozCliente, DiagnosticoCompetitividad, ObjetivoFortalecimiento, DocumentoEtapa1,
     Etapa2Plan, HallazgoProblema, AccionMejora, CronogramaImplementacion,
     Etapa3Implementacion, TareaImplementacion, EvidenciaImplementacion, SesionAcompanamiento,
-    Etapa4Monitoreo, IndicadorKPI, MedicionKPI, ReporteSemanal, EvaluacionDirectiva, InformeCierre
+    Etapa4Monitoreo, IndicadorKPI, MedicionKPI, ReporteSemanal, EvaluacionDirectiva, InformeCierre,
+    IndiceBusqueda
 )
 
 
@@ -132,11 +133,24 @@ class Etapa4MonitoreoAdmin(admin.ModelAdmin):
 
 @admin.register(IndicadorKPI)
 class IndicadorKPIAdmin(admin.ModelAdmin):
-    list_display = ('nombre', 'etapa4', 'valor_inicial', 'valor_actual', 'valor_meta', 'tendencia')
-    list_filter = ('tendencia', 'frecuencia_medicion')
+    list_display = ('nombre', 'etapa4', 'valor_inicial', 'valor_actual', 'valor_meta', 'direccion', 'tendencia')
+    list_filter = ('tendencia', 'direccion', 'frecuencia_medicion')
 
 
 @admin.register(InformeCierre)
 class InformeCierreAdmin(admin.ModelAdmin):
     list_display = ('etapa4', 'fecha_generacion', 'firmado_por', 'fecha_firma')
     readonly_fields = ['fecha_generacion']
+
+
+# ============================================================================
+# BÚSQUEDA
+# ============================================================================
+
+@admin.register(IndiceBusqueda)
+class IndiceBusquedaAdmin(admin.ModelAdmin):
+    list_display = ('titulo', 'tipo', 'proveedor_proyecto', 'actualizado')
+    list_filter = ('tipo',)
+    search_fields = ('contenido',)
+    raw_id_fields = ('proveedor_proyecto',)
+    readonly_fields = ['actualizado']
@@ -5,3 +5,6 @@ class EtapasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.etapas'
     verbose_name = 'Etapas del Fortalecimiento'
+
+    def ready(self):
+        import apps.etapas.signals  # noqa
@@ -0,0 +1,207 @@
+"""
+Índice unificado de búsqueda sobre las etapas del fortalecimiento.
+
+Cada registro indexable mantiene una fila en ``IndiceBusqueda`` con su texto
+normalizado (minúsculas y sin tildes). Las filas se actualizan en cada
+``post_save``/``post_delete`` (ver ``signals.py``) y las consultas se
+resuelven sobre una sola tabla; en PostgreSQL la columna ``contenido``
+tiene un índice GIN de trigramas que acelera los ``LIKE '%termino%'``.
+"""
+import logging
+import unicodedata
+
+from django.db.models import F
+
+from apps.core import alcance
+from apps.core.consultas import iterar
+from .models import (
+    VozCliente, DiagnosticoCompetitividad, ObjetivoFortalecimiento, DocumentoEtapa1,
+    HallazgoProblema, AccionMejora, CronogramaImplementacion,
+    TareaImplementacion, EvidenciaImplementacion, SesionAcompanamiento,
+    IndicadorKPI, ReporteSemanal, EvaluacionDirectiva, InformeCierre,
+    IndiceBusqueda, RUTAS_PROVEEDOR_PROYECTO, obtener_proveedor_proyecto_id
+)
+
+logger = logging.getLogger(__name__)
+
+Tipo = IndiceBusqueda.TipoResultado
+
+# Modelo -> (tipo, atributo o función para el título, campos de texto indexados)
+INDEXABLES = {
+    VozCliente: (
+        Tipo.VOZ_CLIENTE, 'empresa_ancla_contacto',
+        ['necesidades_identificadas', 'expectativas', 'requerimientos_especificos',
+         'fortalezas_proveedor', 'areas_mejora']
+    ),
+    DiagnosticoCompetitividad: (
+        Tipo.DIAGNOSTICO, lambda obj: obj.get_area_evaluada_display(),
+        ['fortalezas', 'debilidades', 'oportunidades', 'amenazas', 'observaciones']
+    ),
+    ObjetivoFortalecimiento: (
+        Tipo.OBJETIVO, 'medible',
+        ['objetivo', 'especifico', 'alcanzable', 'relevante']
+    ),
+    DocumentoEtapa1: (Tipo.DOCUMENTO, 'nombre', ['nombre', 'descripcion']),
+    HallazgoProblema: (
+        Tipo.HALLAZGO, 'codigo',
+        ['hallazgo', 'problema_identificado', 'causa_raiz', 'area_impactada']
+    ),
+    AccionMejora: (
+        Tipo.ACCION_MEJORA, lambda obj: obj.get_tipo_accion_display(),
+        ['descripcion', 'recursos_necesarios', 'responsable_sugerido']
+    ),
+    CronogramaImplementacion: (
+        Tipo.CRONOGRAMA, 'actividad', ['actividad', 'responsable', 'entregable', 'recursos']
+    ),
+    TareaImplementacion: (Tipo.TAREA, 'titulo', ['titulo', 'descripcion', 'notas']),
+    EvidenciaImplementacion: (Tipo.EVIDENCIA, 'nombre', ['nombre', 'descripcion']),
+    SesionAcompanamiento: (
+        Tipo.SESION, lambda obj: f"Sesión {obj.fecha.strftime('%Y-%m-%d')}",
+        ['temas_tratados', 'compromisos', 'participantes']
+    ),
+    IndicadorKPI: (Tipo.INDICADOR, 'nombre', ['nombre', 'descripcion']),
+    ReporteSemanal: (
+        Tipo.REPORTE_SEMANAL, lambda obj: f"Semana {obj.semana_numero}",
+        ['resumen_avance', 'logros', 'dificultades', 'proximas_acciones']
+    ),
+    EvaluacionDirectiva: (
+        Tipo.EVALUACION, lambda obj: f"Evaluación {obj.fecha}",
+        ['objetivos_cumplidos', 'objetivos_pendientes', 'ajustes_requeridos', 'decisiones_tomadas']
+    ),
+    InformeCierre: (
+        Tipo.INFORME_CIERRE, lambda obj: 'Informe de cierre',
+        ['resumen_ejecutivo', 'objetivos_logrados', 'mejoras_implementadas',
+         'lecciones_aprendidas', 'recomendaciones']
+    ),
+}
+
+# Etapa a la que pertenece cada tipo de resultado (para construir enlaces)
+ETAPA_POR_TIPO = {
+    Tipo.VOZ_CLIENTE: 1, Tipo.DIAGNOSTICO: 1, Tipo.OBJETIVO: 1, Tipo.DOCUMENTO: 1,
+    Tipo.HALLAZGO: 2, Tipo.ACCION_MEJORA: 2, Tipo.CRONOGRAMA: 2,
+    Tipo.TAREA: 3, Tipo.EVIDENCIA: 3, Tipo.SESION: 3,
+    Tipo.INDICADOR: 4, Tipo.REPORTE_SEMANAL: 4, Tipo.EVALUACION: 4, Tipo.INFORME_CIERRE: 4,
+}
+
+LONGITUD_MINIMA = 3
+LIMITE_RESULTADOS = 50
+
+
+def normalizar_texto(texto):
+    """Pasa el texto a minúsculas, sin tildes y con espacios simples."""
+    if not texto:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def _construir_fila(instance, proveedor_proyecto_id=None):
+    """Construye (sin guardar) la fila del índice para un registro."""
+    tipo, titulo, campos = INDEXABLES[type(instance)]
+    titulo = titulo(instance) if callable(titulo) else getattr(instance, titulo)
+    textos = [str(getattr(instance, campo) or '') for campo in campos]
+    resumen = next((t for t in textos if t), '')
+
+    return IndiceBusqueda(
+        tipo=tipo,
+        objeto_id=instance.pk,
+        proveedor_proyecto_id=proveedor_proyecto_id or obtener_proveedor_proyecto_id(instance),
+        titulo=str(titulo or '')[:255],
+        resumen=' '.join(resumen.split())[:300],
+        contenido=normalizar_texto(' '.join([str(titulo or '')] + textos)),
+    )
+
+
+def indexar(instance):
+    """Crea o actualiza la fila del índice de un registro."""
+    fila = _construir_fila(instance)
+    IndiceBusqueda.objects.update_or_create(
+        tipo=fila.tipo,
+        objeto_id=fila.objeto_id,
+        defaults={
+            'proveedor_proyecto_id': fila.proveedor_proyecto_id,
+            'titulo': fila.titulo,
+            'resumen': fila.resumen,
+            'contenido': fila.contenido,
+        }
+    )
+
+
+def desindexar(instance):
+    """Elimina la fila del índice de un registro."""
+    tipo = INDEXABLES[type(instance)][0]
+    IndiceBusqueda.objects.filter(tipo=tipo, objeto_id=instance.pk).delete()
+
+
+def reindexar(modelos=None, lote=500):
+    """
+    Reconstruye el índice de forma masiva.
+
+    Args:
+        modelos: Modelos a reindexar (por defecto todos los indexables)
+        lote: Tamaño de lote para lectura e inserción
+
+    Returns:
+        Diccionario con el número de filas indexadas por tipo
+    """
+    stats = {}
+    for modelo in modelos or INDEXABLES:
+        tipo = INDEXABLES[modelo][0]
+        ruta = RUTAS_PROVEEDOR_PROYECTO[modelo]
+        IndiceBusqueda.objects.filter(tipo=tipo).delete()
+
+        queryset = modelo.objects.annotate(pp_indice_id=F(ruta))
+
+        filas = []
+        total = 0
+        for instance in iterar(queryset, lote):
+            filas.append(_construir_fila(instance, instance.pp_indice_id))
+            if len(filas) >= lote:
+                IndiceBusqueda.objects.bulk_create(filas)
+                total += len(filas)
+                filas = []
+        if filas:
+            IndiceBusqueda.objects.bulk_create(filas)
+            total += len(filas)
+
+        stats[tipo] = total
+        logger.info(f"Índice de búsqueda reconstruido para {tipo}: {total} registros")
+    return stats
+
+
+def buscar(usuario, termino, tipos=None, limite=LIMITE_RESULTADOS):
+    """
+    Busca un término en el índice unificado.
+
+    Args:
+        usuario: Usuario que consulta (define el alcance de los resultados)
+        termino: Texto a buscar; todas las palabras deben aparecer
+        tipos: Lista opcional de tipos de resultado
+        limite: Número máximo de resultados
+
+    Returns:
+        QuerySet de IndiceBusqueda ordenado por fecha de actualización
+    """
+    palabras = [p for p in normalizar_texto(termino).split() if len(p) >= LONGITUD_MINIMA]
+    if not palabras:
+        return IndiceBusqueda.objects.none()
+
+    queryset = IndiceBusqueda.objects.all()
+    for palabra in palabras:
+        queryset = queryset.filter(contenido__contains=palabra)
+    if tipos:
+        queryset = queryset.filter(tipo__in=tipos)
+
+    # Solo las participaciones del alcance del usuario (apps.core.alcance)
+    queryset = alcance.obtener(usuario).filtrar(queryset, 'proveedor_proyecto')
+    return queryset.select_related(
+        'proveedor_proyecto__proveedor', 'proveedor_proyecto__proyecto'
+    ).only(
+        'tipo', 'objeto_id', 'titulo', 'resumen', 'actualizado',
+        'proveedor_proyecto__id',
+        'proveedor_proyecto__proveedor__razon_social',
+        'proveedor_proyecto__proveedor__nombre_comercial',
+        'proveedor_proyecto__proyecto__codigo',
+        'proveedor_proyecto__proyecto__nombre',
+    ).order_by('-actualizado')[:limite]
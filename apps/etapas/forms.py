@@ -236,7 +236,7 @@ class IndicadorForm(forms.ModelForm):
         model = IndicadorKPI
         fields = [
             'objetivo', 'nombre', 'descripcion',
-            'valor_inicial', 'valor_meta', 'unidad_medida', 'frecuencia_medicion'
+            'valor_inicial', 'valor_meta', 'unidad_medida', 'frecuencia_medicion', 'direccion'
         ]
         widgets = {
             'descripcion': forms.Textarea(attrs={'rows': 2}),
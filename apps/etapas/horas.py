@@ -0,0 +1,132 @@
+"""
+Contabilidad incremental de horas de acompañamiento.
+
+Cada alta, cambio o baja de una ``SesionAcompanamiento`` aplica la diferencia
+de horas con ``F()`` sobre ``Etapa3Implementacion.horas_acompanamiento``,
+``ProveedorProyecto.horas_consumidas`` y el consumo diario del burn-down
+(``reportes.ConsumoHorasDiario``), sin leer ni re-agregar las sesiones.
+``verificar_horas`` recalcula los totales con una consulta agrupada para
+detectar y reparar descuadres, p. ej. tras cargas masivas que no pasan por
+``save()``.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.core.consultas import iterar
+from apps.proyectos.models import ProveedorProyecto
+
+logger = logging.getLogger(__name__)
+
+
+def aplicar_delta(etapa3_id, delta, fecha=None):
+    """
+    Suma ``delta`` horas a la etapa 3, a su participación y, si se indica la
+    fecha de la sesión, al consumo diario del burn-down.
+    """
+    from apps.reportes.burndown import registrar_consumo
+    from .models import Etapa3Implementacion
+
+    delta = Decimal(str(delta))
+    if not delta:
+        return
+    participacion = Etapa3Implementacion.objects.filter(pk=etapa3_id).values_list(
+        'proveedor_proyecto_id', 'proveedor_proyecto__proyecto_id'
+    ).first()
+    if participacion is None:
+        return
+    pp_id, proyecto_id = participacion
+
+    ahora = timezone.now()
+    Etapa3Implementacion.objects.filter(pk=etapa3_id).update(
+        horas_acompanamiento=F('horas_acompanamiento') + delta, updated_at=ahora
+    )
+    ProveedorProyecto.objects.filter(pk=pp_id).update(
+        horas_consumidas=F('horas_consumidas') + delta, updated_at=ahora
+    )
+    if fecha is not None:
+        registrar_consumo(pp_id, proyecto_id, fecha, delta)
+
+
+def registrar_cambio_sesion(sesion, anterior=None):
+    """
+    Aplica las horas de una sesión guardada.
+
+    Args:
+        sesion: ``SesionAcompanamiento`` recién guardada
+        anterior: Tupla (etapa3_id, duracion_horas, fecha) previa al
+            guardado, o None si la sesión es nueva
+    """
+    if anterior is None:
+        aplicar_delta(sesion.etapa3_id, sesion.duracion_horas, sesion.fecha)
+        return
+
+    etapa3_anterior, duracion_anterior, fecha_anterior = anterior
+    duracion = Decimal(str(sesion.duracion_horas))
+    mismo_dia = timezone.localdate(fecha_anterior) == timezone.localdate(sesion.fecha)
+    if etapa3_anterior == sesion.etapa3_id and mismo_dia:
+        aplicar_delta(sesion.etapa3_id, duracion - duracion_anterior, sesion.fecha)
+    else:
+        aplicar_delta(etapa3_anterior, -duracion_anterior, fecha_anterior)
+        aplicar_delta(sesion.etapa3_id, duracion, sesion.fecha)
+
+
+def registrar_eliminacion_sesion(sesion):
+    aplicar_delta(sesion.etapa3_id, -Decimal(str(sesion.duracion_horas)), sesion.fecha)
+
+
+def verificar_horas(reparar=False, lote=500):
+    """
+    Compara los totales almacenados con la suma real de las sesiones.
+
+    Args:
+        reparar: Corregir los descuadres encontrados con ``bulk_update``
+
+    Returns:
+        Lista de descuadres {etapa3, participacion, esperado,
+        horas_acompanamiento, horas_consumidas}
+    """
+    from .models import Etapa3Implementacion, SesionAcompanamiento
+
+    esperadas = dict(
+        SesionAcompanamiento.objects.values('etapa3_id').annotate(
+            total=Sum('duracion_horas')
+        ).order_by().values_list('etapa3_id', 'total')
+    )
+
+    descuadres = []
+    etapas, participaciones = [], []
+    ahora = timezone.now()
+    for etapa3_id, pp_id, horas_etapa, horas_pp in iterar(Etapa3Implementacion.objects.values_list(
+        'id', 'proveedor_proyecto_id', 'horas_acompanamiento', 'proveedor_proyecto__horas_consumidas'
+    )):
+        esperado = esperadas.get(etapa3_id) or Decimal('0')
+        if horas_etapa == esperado and horas_pp == esperado:
+            continue
+        descuadres.append({
+            'etapa3': etapa3_id,
+            'participacion': pp_id,
+            'esperado': esperado,
+            'horas_acompanamiento': horas_etapa,
+            'horas_consumidas': horas_pp,
+        })
+        if horas_etapa != esperado:
+            etapas.append(Etapa3Implementacion(pk=etapa3_id, horas_acompanamiento=esperado, updated_at=ahora))
+        if horas_pp != esperado:
+            participaciones.append(ProveedorProyecto(pk=pp_id, horas_consumidas=esperado, updated_at=ahora))
+
+    if reparar and descuadres:
+        with transaction.atomic():
+            Etapa3Implementacion.objects.bulk_update(
+                etapas, ['horas_acompanamiento', 'updated_at'], batch_size=lote
+            )
+            ProveedorProyecto.objects.bulk_update(
+                participaciones, ['horas_consumidas', 'updated_at'], batch_size=lote
+            )
+        logger.info(
+            f"Horas reparadas: {len(etapas)} etapas 3, {len(participaciones)} participaciones"
+        )
+    return descuadres
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.etapas.models import IndicadorKPI
+from apps.etapas.tendencias import recalcular_masivo
+
+
+class Command(BaseCommand):
+    help = 'Recalcula la ventana de tendencia de los indicadores KPI (p. ej. tras importar históricos).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proyecto', help='Limitar a los indicadores de un proyecto')
+        parser.add_argument('--lote', type=int, default=500, help='Tamaño de lote de escritura.')
+
+    def handle(self, *args, **options):
+        indicadores = IndicadorKPI.objects.all()
+        if options['proyecto']:
+            indicadores = indicadores.filter(etapa4__proveedor_proyecto__proyecto=options['proyecto'])
+
+        total = recalcular_masivo(indicadores, lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'Indicadores recalculados: {total}'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.etapas.busqueda import INDEXABLES, reindexar
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice unificado de búsqueda de las etapas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modelo', action='append', dest='modelos', default=[],
+            help='Nombre del modelo a reindexar (repetible). Por defecto todos.'
+        )
+        parser.add_argument('--lote', type=int, default=500, help='Tamaño de lote.')
+
+    def handle(self, *args, **options):
+        por_nombre = {modelo.__name__: modelo for modelo in INDEXABLES}
+        modelos = []
+        for nombre in options['modelos']:
+            if nombre not in por_nombre:
+                raise CommandError(
+                    f"Modelo '{nombre}' no indexable. Opciones: {', '.join(sorted(por_nombre))}"
+                )
+            modelos.append(por_nombre[nombre])
+
+        stats = reindexar(modelos or None, lote=options['lote'])
+        for tipo, total in stats.items():
+            self.stdout.write(f'{tipo}: {total}')
+        self.stdout.write(self.style.SUCCESS(f'Registros indexados: {sum(stats.values())}'))
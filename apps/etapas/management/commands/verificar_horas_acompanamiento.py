@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from apps.etapas.horas import verificar_horas
+from apps.reportes.burndown import reconstruir_consumos
+from apps.proyectos.models import ProveedorProyecto
+
+
+class Command(BaseCommand):
+    help = (
+        'Verifica horas_acompanamiento (etapa 3) y horas_consumidas (participación) '
+        'contra la suma de las sesiones de acompañamiento y opcionalmente las repara.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reparar', action='store_true', help='Corregir los descuadres encontrados')
+        parser.add_argument('--lote', type=int, default=500, help='Tamaño de lote para bulk_update')
+        parser.add_argument('--detalle', action='store_true', help='Listar cada descuadre')
+        parser.add_argument(
+            '--consumos', action='store_true',
+            help='Reconstruir también los consumos diarios del burn-down desde las sesiones'
+        )
+
+    def handle(self, *args, **options):
+        descuadres = verificar_horas(reparar=options['reparar'], lote=options['lote'])
+
+        if options['detalle']:
+            for d in descuadres:
+                self.stdout.write(
+                    f"Etapa3 {d['etapa3']} / participación {d['participacion']}: "
+                    f"esperado {d['esperado']}, etapa {d['horas_acompanamiento']}, "
+                    f"participación {d['horas_consumidas']}"
+                )
+
+        if not descuadres:
+            self.stdout.write(self.style.SUCCESS('Totales de horas consistentes'))
+        elif options['reparar']:
+            self.stdout.write(self.style.SUCCESS(f'Descuadres reparados: {len(descuadres)}'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'Descuadres encontrados: {len(descuadres)} (use --reparar para corregirlos)'
+            ))
+
+        if options['consumos']:
+            filas = reconstruir_consumos()
+            self.stdout.write(self.style.SUCCESS(f'Consumos diarios reconstruidos: {filas}'))
+
+        excedidas = ProveedorProyecto.objects.filter(horas_consumidas__gt=F('horas_planeadas')).count()
+        self.stdout.write(f'Participaciones sobre el presupuesto de horas: {excedidas}')
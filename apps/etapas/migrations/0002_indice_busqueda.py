@@ -0,0 +1,105 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def crear_indice_trigramas(apps, schema_editor):
+    """Índice GIN de trigramas sobre el contenido (solo PostgreSQL)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS etapas_indice_contenido_trgm '
+        'ON etapas_indicebusqueda USING gin (contenido gin_trgm_ops)'
+    )
+
+
+def eliminar_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS etapas_indice_contenido_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("proyectos", "0001_initial"),
+        ("etapas", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndiceBusqueda",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("VOZ_CLIENTE", "Voz del Cliente"),
+                            ("DIAGNOSTICO", "Diagnóstico de Competitividad"),
+                            ("OBJETIVO", "Objetivo de Fortalecimiento"),
+                            ("DOCUMENTO", "Documento Etapa 1"),
+                            ("HALLAZGO", "Hallazgo/Problema"),
+                            ("ACCION_MEJORA", "Acción de Mejora"),
+                            ("CRONOGRAMA", "Item de Cronograma"),
+                            ("TAREA", "Tarea de Implementación"),
+                            ("EVIDENCIA", "Evidencia"),
+                            ("SESION", "Sesión de Acompañamiento"),
+                            ("INDICADOR", "Indicador KPI"),
+                            ("REPORTE_SEMANAL", "Reporte Semanal"),
+                            ("EVALUACION", "Evaluación Directiva"),
+                            ("INFORME_CIERRE", "Informe de Cierre"),
+                        ],
+                        max_length=20,
+                        verbose_name="Tipo",
+                    ),
+                ),
+                ("objeto_id", models.UUIDField(verbose_name="ID del objeto")),
+                ("titulo", models.CharField(max_length=255, verbose_name="Título")),
+                (
+                    "resumen",
+                    models.CharField(
+                        blank=True, max_length=300, verbose_name="Resumen"
+                    ),
+                ),
+                ("contenido", models.TextField(verbose_name="Contenido normalizado")),
+                (
+                    "actualizado",
+                    models.DateTimeField(auto_now=True, verbose_name="Actualizado"),
+                ),
+                (
+                    "proveedor_proyecto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="indice_busqueda",
+                        to="proyectos.proveedorproyecto",
+                        verbose_name="Proveedor en Proyecto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Índice de Búsqueda",
+                "verbose_name_plural": "Índice de Búsqueda",
+                "ordering": ["-actualizado"],
+                "indexes": [
+                    models.Index(
+                        fields=["proveedor_proyecto", "tipo"],
+                        name="etapas_indice_pp_tipo_idx",
+                    )
+                ],
+                "unique_together": {("tipo", "objeto_id")},
+            },
+        ),
+        migrations.RunPython(crear_indice_trigramas, eliminar_indice_trigramas),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etapas", "0002_indice_busqueda"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="indicadorkpi",
+            name="direccion",
+            field=models.CharField(
+                choices=[
+                    ("MAYOR_MEJOR", "Mayor es mejor"),
+                    ("MENOR_MEJOR", "Menor es mejor"),
+                ],
+                default="MAYOR_MEJOR",
+                max_length=15,
+                verbose_name="Dirección",
+            ),
+        ),
+        migrations.AddField(
+            model_name="indicadorkpi",
+            name="pendiente",
+            field=models.FloatField(
+                blank=True, null=True, verbose_name="Pendiente (por día)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="indicadorkpi",
+            name="ventana_tendencia",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Últimas mediciones y sumas de mínimos cuadrados (ver etapas.tendencias)",
+                verbose_name="Ventana de tendencia",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:34
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def calcular_fecha_fin(apps, schema_editor):
+    SesionAcompanamiento = apps.get_model('etapas', 'SesionAcompanamiento')
+    sesiones = list(SesionAcompanamiento.objects.only('id', 'fecha', 'duracion_horas'))
+    for sesion in sesiones:
+        sesion.fecha_fin = sesion.fecha + timedelta(hours=float(sesion.duracion_horas))
+    SesionAcompanamiento.objects.bulk_update(sesiones, ['fecha_fin'], batch_size=500)
+
+
+def crear_indice_rangos(apps, schema_editor):
+    """Índice GiST sobre el rango de la sesión (solo PostgreSQL)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS etapas_sesion_rango_gist '
+        'ON etapas_sesionacompanamiento USING gist (tstzrange(fecha, fecha_fin))'
+    )
+
+
+def eliminar_indice_rangos(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS etapas_sesion_rango_gist')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etapas", "0003_tendencia_kpi"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sesionacompanamiento",
+            name="fecha_fin",
+            field=models.DateTimeField(editable=False, null=True, verbose_name="Fin"),
+        ),
+        migrations.AddIndex(
+            model_name="sesionacompanamiento",
+            index=models.Index(
+                fields=["consultor", "fecha", "fecha_fin"],
+                name="etapas_sesion_agenda_idx",
+            ),
+        ),
+        migrations.RunPython(calcular_fecha_fin, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice_rangos, eliminar_indice_rangos),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etapas", "0004_agenda_sesiones"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tareaimplementacion",
+            index=models.Index(
+                condition=models.Q(("estado", "COMPLETADA"), _negated=True),
+                fields=["fecha_fin_planeada"],
+                name="etapas_tarea_abierta_idx",
+            ),
+        ),
+    ]
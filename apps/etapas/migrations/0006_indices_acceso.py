@@ -0,0 +1,25 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etapas", "0005_tareas_abiertas"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="medicionkpi",
+            index=models.Index(
+                fields=["indicador", "fecha_medicion"], name="etapas_medicion_serie_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tareaimplementacion",
+            index=models.Index(
+                fields=["etapa3", "estado", "orden"], name="etapas_tarea_kanban_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def crear_etapa1_faltantes(apps, schema_editor):
+    """
+    Las vistas de consulta ya no crean la Etapa 1; las participaciones
+    iniciadas que aún no la tienen la reciben aquí.
+    """
+    ProveedorProyecto = apps.get_model('proyectos', 'ProveedorProyecto')
+    Etapa1Diagnostico = apps.get_model('etapas', 'Etapa1Diagnostico')
+    pendientes = ProveedorProyecto.objects.exclude(estado='PENDIENTE').filter(
+        etapa1__isnull=True
+    ).values_list('id', flat=True)
+    Etapa1Diagnostico.objects.bulk_create(
+        [Etapa1Diagnostico(proveedor_proyecto_id=pp_id) for pp_id in pendientes.iterator()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etapas", "0006_indices_acceso"),
+        ("proyectos", "0002_indices_acceso"),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_etapa1_faltantes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,102 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.utils import timezone
+
+LOTE = 500
+
+# Copia congelada de apps.etapas.tendencias al momento de la migración
+TAMANO_VENTANA = 6
+UMBRAL_ESTABLE = 0.01
+
+
+def _ventana(puntos):
+    """Ventana de tendencia (sumas de mínimos cuadrados) de las últimas mediciones."""
+    puntos = puntos[-TAMANO_VENTANA:]
+    ventana = {'origen': None, 'n': 0, 'sx': 0.0, 'sy': 0.0, 'sxy': 0.0, 'sxx': 0.0, 'puntos': []}
+    if not puntos:
+        return ventana
+    origen = puntos[0][0]
+    ventana['origen'] = origen.isoformat()
+    for fecha, valor in puntos:
+        x, y = float((fecha - origen).days), float(valor)
+        ventana['puntos'].append([x, y])
+        ventana['n'] += 1
+        ventana['sx'] += x
+        ventana['sy'] += y
+        ventana['sxy'] += x * y
+        ventana['sxx'] += x * x
+    ventana['ultima_fecha'] = puntos[-1][0].isoformat()
+    return ventana
+
+
+def _campos_tendencia(ventana, direccion):
+    n = ventana['n']
+    pendiente = None
+    if n >= 2:
+        denominador = n * ventana['sxx'] - ventana['sx'] ** 2
+        pendiente = 0.0 if abs(denominador) < 1e-9 else (
+            (n * ventana['sxy'] - ventana['sx'] * ventana['sy']) / denominador
+        )
+
+    tendencia = 'ESTABLE'
+    if pendiente is not None:
+        puntos = ventana['puntos']
+        variacion = pendiente * (puntos[-1][0] - puntos[0][0])
+        escala = max(abs(ventana['sy'] / n), 1e-9)
+        if abs(variacion) > UMBRAL_ESTABLE * escala:
+            if direccion == 'MENOR_MEJOR':
+                variacion = -variacion
+            tendencia = 'MEJORANDO' if variacion > 0 else 'EMPEORANDO'
+
+    return {'ventana_tendencia': ventana, 'pendiente': pendiente, 'tendencia': tendencia}
+
+
+def recalcular_tendencias(apps, schema_editor):
+    """
+    Construye ``ventana_tendencia``, ``pendiente`` y ``tendencia`` de los
+    indicadores existentes a partir de sus mediciones, por lotes de
+    indicadores (equivalente a ``recalcular_tendencias_kpi``).
+    """
+    IndicadorKPI = apps.get_model('etapas', 'IndicadorKPI')
+    MedicionKPI = apps.get_model('etapas', 'MedicionKPI')
+    indicadores = IndicadorKPI.objects.order_by('pk').values_list('pk', 'direccion')
+    ahora = timezone.now()
+    ultimo = None
+    while True:
+        pagina = indicadores if ultimo is None else indicadores.filter(pk__gt=ultimo)
+        direcciones = dict(pagina[:LOTE])
+        if not direcciones:
+            return
+        ultimo = max(direcciones)
+
+        puntos = defaultdict(list)
+        for indicador_id, fecha, valor in MedicionKPI.objects.filter(
+            indicador_id__in=list(direcciones)
+        ).order_by('indicador_id', 'fecha_medicion', 'created_at').values_list(
+            'indicador_id', 'fecha_medicion', 'valor'
+        ):
+            puntos[indicador_id].append((fecha, valor))
+
+        IndicadorKPI.objects.bulk_update(
+            [
+                IndicadorKPI(
+                    pk=indicador_id, updated_at=ahora,
+                    **_campos_tendencia(_ventana(puntos[indicador_id]), direccion)
+                )
+                for indicador_id, direccion in direcciones.items()
+            ],
+            ['ventana_tendencia', 'pendiente', 'tendencia', 'updated_at'],
+            batch_size=LOTE,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etapas", "0007_etapa1_participaciones_iniciadas"),
+    ]
+
+    operations = [
+        migrations.RunPython(recalcular_tendencias, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 import uuid
-from django.db import models
+from datetime import timedelta
+from django.db import models, transaction
 from django.utils import timezone
 from apps.core.models import Usuario
 from apps.proyectos.models import ProveedorProyecto
@@ -552,6 +553,19 @@ class TareaImplementacion(models.Model):
         verbose_name = 'Tarea de Implementación'
         verbose_name_plural = 'Tareas de Implementación'
         ordering = ['orden', '-prioridad', 'fecha_fin_planeada']
+        indexes = [
+            # Solo tareas abiertas: el monitor de SLA no recorre las completadas
+            models.Index(
+                fields=['fecha_fin_planeada'],
+                condition=~models.Q(estado='COMPLETADA'),
+                name='etapas_tarea_abierta_idx',
+            ),
+            # Columnas del kanban: tareas de una etapa por estado, en orden
+            models.Index(
+                fields=['etapa3', 'estado', 'orden'],
+                name='etapas_tarea_kanban_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.titulo
@@ -611,6 +625,7 @@ class SesionAcompanamiento(models.Model):
     )
     fecha = models.DateTimeField('Fecha y hora')
     duracion_horas = models.DecimalField('Duración (horas)', max_digits=4, decimal_places=2)
+    fecha_fin = models.DateTimeField('Fin', null=True, editable=False)
     modalidad = models.CharField(
         'Modalidad',
         max_length=15,
@@ -634,18 +649,32 @@ class SesionAcompanamiento(models.Model):
         verbose_name = 'Sesión de Acompañamiento'
         verbose_name_plural = 'Sesiones de Acompañamiento'
         ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['consultor', 'fecha', 'fecha_fin'], name='etapas_sesion_agenda_idx'),
+        ]
 
     def __str__(self):
         return f"Sesión {self.fecha.strftime('%Y-%m-%d')}"
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Actualizar horas de acompañamiento
-        total = self.etapa3.sesiones.aggregate(
-            total=models.Sum('duracion_horas')
-        )['total'] or 0
-        self.etapa3.horas_acompanamiento = total
-        self.etapa3.save(update_fields=['horas_acompanamiento'])
+        # Fin materializado para consultas de solapamiento por rango
+        self.fecha_fin = self.fecha + timedelta(hours=float(self.duracion_horas))
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'fecha_fin'}
+
+        from .horas import registrar_cambio_sesion
+
+        with transaction.atomic():
+            # Valores previos con la fila bloqueada: dos ediciones simultáneas
+            # calculan su delta en serie y no cuentan dos veces las mismas horas
+            anterior = None
+            if not self._state.adding:
+                anterior = SesionAcompanamiento.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'etapa3_id', 'duracion_horas', 'fecha'
+                ).first()
+            super().save(*args, **kwargs)
+            # Actualizar horas de acompañamiento (delta sobre etapa 3 y participación)
+            registrar_cambio_sesion(self, anterior)
 
 
 # ============================================================================
@@ -710,6 +739,10 @@ class IndicadorKPI(models.Model):
         QUINCENAL = 'QUINCENAL', 'Quincenal'
         MENSUAL = 'MENSUAL', 'Mensual'
 
+    class Direccion(models.TextChoices):
+        MAYOR_MEJOR = 'MAYOR_MEJOR', 'Mayor es mejor'
+        MENOR_MEJOR = 'MENOR_MEJOR', 'Menor es mejor'
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     etapa4 = models.ForeignKey(
         Etapa4Monitoreo,
@@ -737,12 +770,23 @@ class IndicadorKPI(models.Model):
         choices=FrecuenciaMedicion.choices,
         default=FrecuenciaMedicion.SEMANAL
     )
+    direccion = models.CharField(
+        'Dirección',
+        max_length=15,
+        choices=Direccion.choices,
+        default=Direccion.MAYOR_MEJOR
+    )
     tendencia = models.CharField(
         'Tendencia',
         max_length=15,
         choices=Tendencia.choices,
         default=Tendencia.ESTABLE
     )
+    pendiente = models.FloatField('Pendiente (por día)', null=True, blank=True)
+    ventana_tendencia = models.JSONField(
+        'Ventana de tendencia', default=dict, blank=True, editable=False,
+        help_text='Últimas mediciones y sumas de mínimos cuadrados (ver etapas.tendencias)'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -760,19 +804,10 @@ class IndicadorKPI(models.Model):
         return min((self.valor_actual / self.valor_meta) * 100, 100)
 
     def actualizar_tendencia(self):
-        """Actualiza la tendencia basada en las últimas mediciones."""
-        mediciones = self.mediciones.order_by('-fecha_medicion')[:3]
-        if len(mediciones) < 2:
-            return
-
-        valores = [m.valor for m in mediciones]
-        if valores[0] > valores[-1]:
-            self.tendencia = self.Tendencia.MEJORANDO
-        elif valores[0] < valores[-1]:
-            self.tendencia = self.Tendencia.EMPEORANDO
-        else:
-            self.tendencia = self.Tendencia.ESTABLE
-        self.save(update_fields=['tendencia'])
+        """Recalcula la tendencia desde las mediciones (ver ``etapas.tendencias``)."""
+        from .tendencias import recalcular_indicador
+        recalcular_indicador(self)
+        self.refresh_from_db(fields=['valor_actual', 'tendencia', 'pendiente', 'ventana_tendencia'])
 
 
 class MedicionKPI(models.Model):
@@ -800,16 +835,32 @@ class MedicionKPI(models.Model):
         verbose_name = 'Medición de KPI'
         verbose_name_plural = 'Mediciones de KPI'
         ordering = ['-fecha_medicion']
+        indexes = [
+            # Serie de un indicador por fecha (gráficas y ventana de tendencia)
+            models.Index(
+                fields=['indicador', 'fecha_medicion'],
+                name='etapas_medicion_serie_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.indicador.nombre}: {self.valor} ({self.fecha_medicion})"
 
     def save(self, *args, **kwargs):
+        from .tendencias import registrar_medicion, recalcular_indicador
+        creando = self._state.adding
+        indicador_previo = None if creando else MedicionKPI.objects.filter(
+            pk=self.pk
+        ).values_list('indicador_id', flat=True).first()
         super().save(*args, **kwargs)
-        # Actualizar valor actual del indicador
-        self.indicador.valor_actual = self.valor
-        self.indicador.save(update_fields=['valor_actual'])
-        self.indicador.actualizar_tendencia()
+        # Actualizar valor actual y tendencia del indicador
+        if creando:
+            registrar_medicion(self)
+        else:
+            recalcular_indicador(self.indicador)
+            # Si la medición cambió de indicador, el anterior también queda desactualizado
+            if indicador_previo and indicador_previo != self.indicador_id:
+                recalcular_indicador(IndicadorKPI.objects.get(pk=indicador_previo))
 
 
 class ReporteSemanal(models.Model):
@@ -906,3 +957,86 @@ class InformeCierre(models.Model):
 
     def __str__(self):
         return f"Informe cierre: {self.etapa4.proveedor_proyecto}"
+
+
+# ============================================================================
+# BÚSQUEDA
+# ============================================================================
+
+class IndiceBusqueda(models.Model):
+    """Índice unificado de búsqueda sobre los registros de las etapas."""
+
+    class TipoResultado(models.TextChoices):
+        VOZ_CLIENTE = 'VOZ_CLIENTE', 'Voz del Cliente'
+        DIAGNOSTICO = 'DIAGNOSTICO', 'Diagnóstico de Competitividad'
+        OBJETIVO = 'OBJETIVO', 'Objetivo de Fortalecimiento'
+        DOCUMENTO = 'DOCUMENTO', 'Documento Etapa 1'
+        HALLAZGO = 'HALLAZGO', 'Hallazgo/Problema'
+        ACCION_MEJORA = 'ACCION_MEJORA', 'Acción de Mejora'
+        CRONOGRAMA = 'CRONOGRAMA', 'Item de Cronograma'
+        TAREA = 'TAREA', 'Tarea de Implementación'
+        EVIDENCIA = 'EVIDENCIA', 'Evidencia'
+        SESION = 'SESION', 'Sesión de Acompañamiento'
+        INDICADOR = 'INDICADOR', 'Indicador KPI'
+        REPORTE_SEMANAL = 'REPORTE_SEMANAL', 'Reporte Semanal'
+        EVALUACION = 'EVALUACION', 'Evaluación Directiva'
+        INFORME_CIERRE = 'INFORME_CIERRE', 'Informe de Cierre'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField('Tipo', max_length=20, choices=TipoResultado.choices)
+    objeto_id = models.UUIDField('ID del objeto')
+    proveedor_proyecto = models.ForeignKey(
+        ProveedorProyecto,
+        on_delete=models.CASCADE,
+        related_name='indice_busqueda',
+        verbose_name='Proveedor en Proyecto'
+    )
+    titulo = models.CharField('Título', max_length=255)
+    resumen = models.CharField('Resumen', max_length=300, blank=True)
+    contenido = models.TextField('Contenido normalizado')
+    actualizado = models.DateTimeField('Actualizado', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Índice de Búsqueda'
+        verbose_name_plural = 'Índice de Búsqueda'
+        ordering = ['-actualizado']
+        unique_together = ['tipo', 'objeto_id']
+        indexes = [
+            models.Index(fields=['proveedor_proyecto', 'tipo'], name='etapas_indice_pp_tipo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()}: {self.titulo}"
+
+
+# Ruta ORM desde cada modelo de etapas hasta su ProveedorProyecto
+RUTAS_PROVEEDOR_PROYECTO = {
+    Etapa1Diagnostico: 'proveedor_proyecto',
+    VozCliente: 'etapa1__proveedor_proyecto',
+    DiagnosticoCompetitividad: 'etapa1__proveedor_proyecto',
+    ObjetivoFortalecimiento: 'etapa1__proveedor_proyecto',
+    DocumentoEtapa1: 'etapa1__proveedor_proyecto',
+    Etapa2Plan: 'proveedor_proyecto',
+    HallazgoProblema: 'etapa2__proveedor_proyecto',
+    AccionMejora: 'hallazgo__etapa2__proveedor_proyecto',
+    CronogramaImplementacion: 'etapa2__proveedor_proyecto',
+    Etapa3Implementacion: 'proveedor_proyecto',
+    TareaImplementacion: 'etapa3__proveedor_proyecto',
+    EvidenciaImplementacion: 'tarea__etapa3__proveedor_proyecto',
+    SesionAcompanamiento: 'etapa3__proveedor_proyecto',
+    Etapa4Monitoreo: 'proveedor_proyecto',
+    IndicadorKPI: 'etapa4__proveedor_proyecto',
+    MedicionKPI: 'indicador__etapa4__proveedor_proyecto',
+    ReporteSemanal: 'etapa4__proveedor_proyecto',
+    EvaluacionDirectiva: 'etapa4__proveedor_proyecto',
+    InformeCierre: 'etapa4__proveedor_proyecto',
+}
+
+
+def obtener_proveedor_proyecto_id(instance):
+    """Resuelve el ID del ProveedorProyecto de un registro de etapas."""
+    ruta = RUTAS_PROVEEDOR_PROYECTO[type(instance)].split('__')
+    objeto = instance
+    for campo in ruta[:-1]:
+        objeto = getattr(objeto, campo)
+    return getattr(objeto, f'{ruta[-1]}_id')
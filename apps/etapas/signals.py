@@ -0,0 +1,95 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+
+from .busqueda import INDEXABLES, indexar, desindexar
+from .horas import registrar_eliminacion_sesion
+from .models import (
+    IndicadorKPI, MedicionKPI, SesionAcompanamiento,
+    RUTAS_PROVEEDOR_PROYECTO, obtener_proveedor_proyecto_id
+)
+from .tendencias import recalcular_indicador
+
+
+def actualizar_indice_busqueda(sender, instance, raw=False, **kwargs):
+    """Mantener el índice de búsqueda al guardar un registro."""
+    if raw:
+        return
+    indexar(instance)
+
+
+def eliminar_de_indice_busqueda(sender, instance, **kwargs):
+    """Quitar del índice de búsqueda un registro eliminado."""
+    desindexar(instance)
+
+
+for modelo in INDEXABLES:
+    post_save.connect(
+        actualizar_indice_busqueda, sender=modelo,
+        dispatch_uid=f'indice_busqueda_save_{modelo.__name__}'
+    )
+    post_delete.connect(
+        eliminar_de_indice_busqueda, sender=modelo,
+        dispatch_uid=f'indice_busqueda_delete_{modelo.__name__}'
+    )
+
+
+def recalcular_tendencia_medicion_eliminada(sender, instance, **kwargs):
+    """Una medición eliminada sale de la ventana de tendencia del indicador."""
+    indicador = IndicadorKPI.objects.filter(pk=instance.indicador_id).only('id', 'direccion').first()
+    if indicador:
+        recalcular_indicador(indicador)
+
+
+post_delete.connect(
+    recalcular_tendencia_medicion_eliminada, sender=MedicionKPI,
+    dispatch_uid='tendencia_medicion_delete'
+)
+
+
+def descontar_horas_sesion_eliminada(sender, instance, origin=None, **kwargs):
+    """Las horas de una sesión eliminada se descuentan de la etapa 3 y la participación."""
+    # Las sesiones solo se eliminan en cascada con su etapa 3 (o algo que la
+    # contiene): los totales y el consumo diario desaparecen con ella
+    if isinstance(origin, models.QuerySet):
+        origin = origin.model
+    elif origin is not None:
+        origin = type(origin)
+    if origin not in (None, SesionAcompanamiento):
+        return
+    registrar_eliminacion_sesion(instance)
+
+
+post_delete.connect(
+    descontar_horas_sesion_eliminada, sender=SesionAcompanamiento,
+    dispatch_uid='horas_sesion_delete'
+)
+
+
+def marcar_participacion_modificada(sender, instance, raw=False, **kwargs):
+    """
+    Avanza el ``updated_at`` de la participación al cambiar cualquiera de sus
+    registros de etapas; es la marca de agua del snapshot del proveedor.
+    """
+    if raw:
+        return
+    try:
+        proveedor_proyecto_id = obtener_proveedor_proyecto_id(instance)
+    except ObjectDoesNotExist:
+        # Borrado en cascada: la participación también se está eliminando
+        return
+    from apps.proyectos.models import ProveedorProyecto
+
+    ProveedorProyecto.objects.filter(pk=proveedor_proyecto_id).update(updated_at=timezone.now())
+
+
+for modelo in RUTAS_PROVEEDOR_PROYECTO:
+    post_save.connect(
+        marcar_participacion_modificada, sender=modelo,
+        dispatch_uid=f'participacion_modificada_save_{modelo.__name__}'
+    )
+    post_delete.connect(
+        marcar_participacion_modificada, sender=modelo,
+        dispatch_uid=f'participacion_modificada_delete_{modelo.__name__}'
+    )
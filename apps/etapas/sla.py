@@ -0,0 +1,173 @@
+"""
+Monitor de SLA de las tareas de implementación.
+
+Una tarea está abierta mientras no esté COMPLETADA y su participación siga
+en curso (no COMPLETADO, SUSPENDIDO ni RETIRADO); vence cuando su
+``fecha_fin_planeada`` queda en el pasado. Las consultas de vencidas y en
+riesgo filtran ``estado <> COMPLETADA`` y un rango de ``fecha_fin_planeada``,
+que es exactamente el predicado del índice parcial
+``etapas_tarea_abierta_idx``: el índice solo contiene tareas abiertas, por lo
+que no crece con el histórico de tareas completadas. El monitor obtiene
+vencidas y en riesgo con una sola consulta por ejecución y notifica en bloque.
+"""
+import logging
+from datetime import timedelta
+
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from apps.core.models import Usuario
+from apps.proyectos.models import Proyecto, ProveedorProyecto
+from .models import TareaImplementacion
+
+logger = logging.getLogger(__name__)
+
+DIAS_RIESGO = 2
+# Las tareas vencidas se recuerdan el primer día y luego cada semana
+FRECUENCIA_RECORDATORIO = 7
+
+RUTA_PARTICIPACION = 'etapa3__proveedor_proyecto'
+
+# Participaciones cerradas o detenidas: sus tareas no cuentan para el SLA
+ESTADOS_SIN_SLA = [
+    ProveedorProyecto.EstadoParticipacion.COMPLETADO,
+    ProveedorProyecto.EstadoParticipacion.SUSPENDIDO,
+    ProveedorProyecto.EstadoParticipacion.RETIRADO,
+]
+
+# Agrupación -> (campo de la tarea, modelo del grupo)
+AGRUPACIONES = {
+    'consultor': (f'{RUTA_PARTICIPACION}__consultor_asignado', Usuario),
+    'responsable': ('responsable', Usuario),
+    'proyecto': (f'{RUTA_PARTICIPACION}__proyecto', Proyecto),
+}
+
+
+def tareas_abiertas(tareas=None):
+    tareas = tareas if tareas is not None else TareaImplementacion.objects.all()
+    return tareas.exclude(estado=TareaImplementacion.Estado.COMPLETADA).exclude(
+        **{f'{RUTA_PARTICIPACION}__estado__in': ESTADOS_SIN_SLA}
+    )
+
+
+def tareas_vencidas(hoy=None, tareas=None):
+    """Tareas abiertas con fecha fin planeada anterior a hoy."""
+    return tareas_abiertas(tareas).filter(fecha_fin_planeada__lt=hoy or timezone.localdate())
+
+
+def tareas_en_riesgo(hoy=None, dias=DIAS_RIESGO):
+    """Tareas abiertas que vencen entre hoy y los próximos ``dias`` días."""
+    hoy = hoy or timezone.localdate()
+    return tareas_abiertas().filter(
+        fecha_fin_planeada__gte=hoy, fecha_fin_planeada__lte=hoy + timedelta(days=dias)
+    )
+
+
+def contar_vencidas(agrupacion, hoy=None, tareas=None):
+    """
+    Contador de tareas vencidas por consultor, responsable o proyecto.
+
+    Args:
+        tareas: Queryset de tareas ya acotado (p. ej. por proyecto)
+
+    Returns:
+        Lista de {agrupacion, id, nombre, vencidas, vencimiento_mas_antiguo,
+        dias_max_vencida} ordenada por vencidas descendente
+    """
+    if agrupacion not in AGRUPACIONES:
+        raise ValueError(f"Agrupación no válida: {agrupacion}")
+
+    campo, modelo = AGRUPACIONES[agrupacion]
+    hoy = hoy or timezone.localdate()
+    filas = list(tareas_vencidas(hoy, tareas).values(campo).annotate(
+        vencidas=Count('id'), mas_antigua=Min('fecha_fin_planeada')
+    ).order_by('-vencidas'))
+    grupos = modelo.objects.in_bulk([fila[campo] for fila in filas if fila[campo]])
+
+    return [
+        {
+            'agrupacion': agrupacion,
+            'id': str(fila[campo]) if fila[campo] else None,
+            'nombre': str(grupos[fila[campo]]) if fila[campo] in grupos else 'Sin asignar',
+            'vencidas': fila['vencidas'],
+            'vencimiento_mas_antiguo': fila['mas_antigua'].isoformat(),
+            'dias_max_vencida': (hoy - fila['mas_antigua']).days,
+        }
+        for fila in filas
+    ]
+
+
+def _debe_notificar(tarea, hoy, limite):
+    dias_vencida = (hoy - tarea.fecha_fin_planeada).days
+    if dias_vencida > 0:
+        return (dias_vencida - 1) % FRECUENCIA_RECORDATORIO == 0
+    # En riesgo: se avisa al entrar en la ventana
+    return tarea.fecha_fin_planeada == limite
+
+
+def _envios(tareas, hoy):
+    envios = []
+    for tarea in tareas:
+        participacion = tarea.etapa3.proveedor_proyecto
+        datos = {
+            'tarea': tarea.titulo,
+            'proveedor': participacion.proveedor.razon_social,
+            'proyecto': participacion.proyecto.nombre,
+            'fecha_limite': tarea.fecha_fin_planeada.strftime('%d/%m/%Y'),
+            'dias_vencida': max((hoy - tarea.fecha_fin_planeada).days, 0),
+        }
+        destinatarios = {tarea.responsable, participacion.consultor_asignado} - {None}
+        envios.extend({'usuario': usuario, 'datos': datos} for usuario in destinatarios)
+    return envios
+
+
+def monitorear(hoy=None, dias_riesgo=DIAS_RIESGO, notificar=True):
+    """
+    Detecta tareas vencidas y en riesgo y notifica a responsables y consultores.
+
+    Para no repetir avisos en cada ejecución diaria, una tarea vencida se
+    notifica el día siguiente a su vencimiento y luego cada
+    ``FRECUENCIA_RECORDATORIO`` días, y una tarea en riesgo el día en que
+    entra en la ventana de ``dias_riesgo``.
+
+    Returns:
+        Diccionario con vencidas, en_riesgo y notificaciones
+    """
+    from apps.notificaciones.models import ColaNotificacion
+    from apps.notificaciones.services import NotificacionService
+
+    hoy = hoy or timezone.localdate()
+    limite = hoy + timedelta(days=dias_riesgo)
+    tareas = list(
+        tareas_abiertas().filter(fecha_fin_planeada__lte=limite).select_related(
+            'responsable',
+            f'{RUTA_PARTICIPACION}__proveedor',
+            f'{RUTA_PARTICIPACION}__proyecto',
+            f'{RUTA_PARTICIPACION}__consultor_asignado',
+        )
+    )
+    vencidas = [t for t in tareas if t.fecha_fin_planeada < hoy]
+    en_riesgo = [t for t in tareas if t.fecha_fin_planeada >= hoy]
+
+    notificaciones = 0
+    if notificar:
+        for grupo, prioridad in (
+            (vencidas, ColaNotificacion.Prioridad.URGENTE),
+            (en_riesgo, ColaNotificacion.Prioridad.ALTA),
+        ):
+            notificaciones += NotificacionService.crear_notificaciones_masivas(
+                evento='TAREA_VENCIDA',
+                envios=_envios([t for t in grupo if _debe_notificar(t, hoy, limite)], hoy),
+                prioridad=prioridad,
+                preferencia='notificar_tareas',
+            )
+
+    logger.info(
+        f"SLA tareas: {len(vencidas)} vencidas, {len(en_riesgo)} en riesgo, "
+        f"{notificaciones} notificaciones"
+    )
+    return {
+        'vencidas': len(vencidas),
+        'en_riesgo': len(en_riesgo),
+        'notificaciones': notificaciones,
+    }
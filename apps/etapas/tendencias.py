@@ -0,0 +1,220 @@
+"""
+Motor de tendencias de los indicadores KPI.
+
+Cada ``IndicadorKPI`` guarda en ``ventana_tendencia`` una ventana móvil de las
+últimas ``TAMANO_VENTANA`` mediciones junto con sus sumas de mínimos cuadrados
+(n, Σx, Σy, Σxy, Σx²), donde x son los días desde ``origen``. Registrar una
+medición nueva solo suma el punto entrante y resta el saliente (O(1)); la
+pendiente y la tendencia se derivan de las sumas sin volver a consultar las
+mediciones. Las mediciones retroactivas, ediciones y borrados recalculan la
+ventana del indicador desde la base de datos.
+"""
+import logging
+from collections import defaultdict, deque
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.consultas import cursores_servidor, lotes_de_claves
+
+logger = logging.getLogger(__name__)
+
+TAMANO_VENTANA = 6
+
+# Variación proyectada (sobre la ventana) por debajo de la cual se considera estable,
+# relativa a la magnitud media del indicador
+UMBRAL_ESTABLE = 0.01
+
+
+def ventana_vacia():
+    return {'origen': None, 'n': 0, 'sx': 0.0, 'sy': 0.0, 'sxy': 0.0, 'sxx': 0.0, 'puntos': []}
+
+
+def agregar_punto(ventana, fecha, valor, tamano=TAMANO_VENTANA):
+    """
+    Agrega una medición a la ventana actualizando las sumas en O(1).
+
+    Args:
+        ventana: Diccionario de ``ventana_tendencia`` (se modifica en sitio)
+        fecha: Fecha de la medición (debe ser >= la última de la ventana)
+        valor: Valor medido
+
+    Returns:
+        La ventana actualizada
+    """
+    if ventana.get('origen') is None:
+        ventana.update(ventana_vacia())
+        ventana['origen'] = fecha.isoformat()
+
+    x = float((fecha - date.fromisoformat(ventana['origen'])).days)
+    y = float(valor)
+    ventana['puntos'].append([x, y])
+    ventana['n'] += 1
+    ventana['sx'] += x
+    ventana['sy'] += y
+    ventana['sxy'] += x * y
+    ventana['sxx'] += x * x
+
+    if ventana['n'] > tamano:
+        x0, y0 = ventana['puntos'].pop(0)
+        ventana['n'] -= 1
+        ventana['sx'] -= x0
+        ventana['sy'] -= y0
+        ventana['sxy'] -= x0 * y0
+        ventana['sxx'] -= x0 * x0
+    return ventana
+
+
+def calcular_pendiente(ventana):
+    """Pendiente (unidades por día) de la recta de mínimos cuadrados de la ventana."""
+    n = ventana.get('n', 0)
+    if n < 2:
+        return None
+    denominador = n * ventana['sxx'] - ventana['sx'] ** 2
+    if abs(denominador) < 1e-9:
+        # Todas las mediciones en la misma fecha
+        return 0.0
+    return (n * ventana['sxy'] - ventana['sx'] * ventana['sy']) / denominador
+
+
+def clasificar(ventana, pendiente, direccion):
+    """
+    Tendencia según la pendiente y la dirección del indicador.
+
+    Returns:
+        Valor de ``IndicadorKPI.Tendencia``
+    """
+    from .models import IndicadorKPI
+
+    if pendiente is None:
+        return IndicadorKPI.Tendencia.ESTABLE
+
+    puntos = ventana['puntos']
+    variacion = pendiente * (puntos[-1][0] - puntos[0][0])
+    escala = max(abs(ventana['sy'] / ventana['n']), 1e-9)
+    if abs(variacion) <= UMBRAL_ESTABLE * escala:
+        return IndicadorKPI.Tendencia.ESTABLE
+
+    if direccion == IndicadorKPI.Direccion.MENOR_MEJOR:
+        variacion = -variacion
+    return IndicadorKPI.Tendencia.MEJORANDO if variacion > 0 else IndicadorKPI.Tendencia.EMPEORANDO
+
+
+def _campos_tendencia(ventana, direccion):
+    pendiente = calcular_pendiente(ventana)
+    return {
+        'ventana_tendencia': ventana,
+        'pendiente': pendiente,
+        'tendencia': clasificar(ventana, pendiente, direccion),
+    }
+
+
+def registrar_medicion(medicion):
+    """
+    Aplica una medición recién creada al indicador con un único UPDATE.
+
+    Si la medición es anterior a la última de la ventana (carga retroactiva)
+    se recalcula la ventana del indicador completa.
+    """
+    from .models import IndicadorKPI
+
+    with transaction.atomic():
+        indicador = IndicadorKPI.objects.select_for_update().only(
+            'id', 'direccion', 'ventana_tendencia', 'valor_actual'
+        ).get(pk=medicion.indicador_id)
+        ventana = indicador.ventana_tendencia or ventana_vacia()
+        ultima = ventana.get('ultima_fecha')
+
+        if ultima and medicion.fecha_medicion < date.fromisoformat(ultima):
+            recalcular_indicador(indicador)
+            return
+
+        agregar_punto(ventana, medicion.fecha_medicion, medicion.valor)
+        ventana['ultima_fecha'] = medicion.fecha_medicion.isoformat()
+        IndicadorKPI.objects.filter(pk=indicador.pk).update(
+            valor_actual=medicion.valor,
+            updated_at=timezone.now(),
+            **_campos_tendencia(ventana, indicador.direccion)
+        )
+
+
+def _ventana_desde(puntos):
+    """Construye la ventana a partir de (fecha, valor) ordenados por fecha."""
+    ventana = ventana_vacia()
+    for fecha, valor in puntos:
+        agregar_punto(ventana, fecha, valor)
+    if puntos:
+        ventana['ultima_fecha'] = puntos[-1][0].isoformat()
+    return ventana
+
+
+def recalcular_indicador(indicador):
+    """Reconstruye la ventana y el valor actual de un indicador desde sus mediciones."""
+    from .models import IndicadorKPI
+
+    puntos = list(
+        indicador.mediciones.order_by('-fecha_medicion', '-created_at')
+        .values_list('fecha_medicion', 'valor')[:TAMANO_VENTANA]
+    )[::-1]
+    campos = _campos_tendencia(_ventana_desde(puntos), indicador.direccion)
+    if puntos:
+        campos['valor_actual'] = puntos[-1][1]
+    IndicadorKPI.objects.filter(pk=indicador.pk).update(updated_at=timezone.now(), **campos)
+
+
+def recalcular_masivo(queryset=None, lote=500):
+    """
+    Recalcula la tendencia de muchos indicadores (p. ej. tras importar históricos).
+
+    Las mediciones se leen en un único recorrido ordenado y solo se conservan
+    las últimas ``TAMANO_VENTANA`` por indicador; los indicadores se escriben
+    con ``bulk_update`` por lotes.
+
+    Returns:
+        Número de indicadores actualizados
+    """
+    from .models import IndicadorKPI, MedicionKPI
+
+    indicadores = queryset if queryset is not None else IndicadorKPI.objects.all()
+    direcciones = dict(indicadores.values_list('id', 'direccion'))
+    if not direcciones:
+        return 0
+
+    ultimas = defaultdict(lambda: deque(maxlen=TAMANO_VENTANA))
+    mediciones = MedicionKPI.objects.order_by('indicador_id', 'fecha_medicion', 'created_at').values_list(
+        'indicador_id', 'fecha_medicion', 'valor'
+    )
+    if cursores_servidor(mediciones.db):
+        filas = mediciones.filter(indicador__in=indicadores.values('id')).iterator(chunk_size=2000)
+    else:
+        # Sin cursores del servidor: lotes de indicadores, cada uno en orden
+        filas = (
+            fila for ids in lotes_de_claves(indicadores, 500)
+            for fila in mediciones.filter(indicador_id__in=ids)
+        )
+    for indicador_id, fecha, valor in filas:
+        ultimas[indicador_id].append((fecha, valor))
+
+    ahora = timezone.now()
+    campos = ['ventana_tendencia', 'pendiente', 'tendencia', 'updated_at']
+    con_mediciones, sin_mediciones = [], []
+    for indicador_id, direccion in direcciones.items():
+        puntos = list(ultimas.get(indicador_id, ()))
+        indicador = IndicadorKPI(
+            pk=indicador_id, updated_at=ahora,
+            **_campos_tendencia(_ventana_desde(puntos), direccion)
+        )
+        if puntos:
+            indicador.valor_actual = puntos[-1][1]
+            con_mediciones.append(indicador)
+        else:
+            sin_mediciones.append(indicador)
+
+    with transaction.atomic():
+        IndicadorKPI.objects.bulk_update(con_mediciones, campos + ['valor_actual'], batch_size=lote)
+        IndicadorKPI.objects.bulk_update(sin_mediciones, campos, batch_size=lote)
+
+    total = len(con_mediciones) + len(sin_mediciones)
+    logger.info(f"Tendencias recalculadas para {total} indicadores")
+    return total
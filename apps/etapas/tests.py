@@ -0,0 +1,164 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.core.models import Usuario
+from apps.empresas.models import EmpresaAncla
+from apps.proveedores.models import Proveedor
+from apps.proyectos.models import Proyecto, ProveedorProyecto
+from apps.reportes.models import ConsumoHorasDiario
+from .models import (
+    Etapa1Diagnostico, Etapa3Implementacion, Etapa4Monitoreo, IndicadorKPI, MedicionKPI,
+    SesionAcompanamiento,
+)
+
+
+class HorasAcompanamientoTests(TestCase):
+    """Contabilidad incremental de horas al editar y eliminar sesiones y participaciones."""
+
+    def setUp(self):
+        self.consultor = Usuario.objects.create_user(
+            'consultor@example.com', 'x', nombre='Ana', apellido='Ruiz', rol='CONSULTOR'
+        )
+        empresa = EmpresaAncla.objects.create(nombre='Empresa', nit='900000001')
+        proveedor = Proveedor.objects.create(
+            razon_social='Proveedor SAS', nit='800000001', representante_legal='Luis',
+            email='proveedor@example.com', telefono='1', direccion='Calle 1',
+            ciudad='Bogotá', departamento='Cundinamarca',
+        )
+        proyecto = Proyecto.objects.create(
+            nombre='Proyecto', empresa_ancla=empresa, fecha_inicio=timezone.localdate(),
+            fecha_fin_planeada=timezone.localdate() + timedelta(days=90),
+        )
+        self.participacion = ProveedorProyecto.objects.create(proyecto=proyecto, proveedor=proveedor)
+        self.etapa3 = Etapa3Implementacion.objects.create(proveedor_proyecto=self.participacion)
+
+    def _sesion(self, horas, dias=0):
+        return SesionAcompanamiento.objects.create(
+            etapa3=self.etapa3, fecha=timezone.now() - timedelta(days=dias),
+            duracion_horas=horas, temas_tratados='Seguimiento', consultor=self.consultor,
+        )
+
+    def test_eliminar_sesion_descuenta_horas(self):
+        self._sesion(2)
+        sesion = self._sesion(Decimal('1.5'), dias=1)
+
+        sesion.delete()
+
+        self.participacion.refresh_from_db()
+        self.assertEqual(self.participacion.horas_consumidas, Decimal('2'))
+        self.assertEqual(
+            ConsumoHorasDiario.objects.get(fecha=timezone.localdate(sesion.fecha)).horas, Decimal('0')
+        )
+
+    def _horas(self):
+        self.participacion.refresh_from_db()
+        self.etapa3.refresh_from_db()
+        self.assertEqual(self.etapa3.horas_acompanamiento, self.participacion.horas_consumidas)
+        return self.participacion.horas_consumidas
+
+    def test_editar_duracion_aplica_diferencia(self):
+        self._sesion(2)
+        sesion = self._sesion(3)
+
+        sesion.duracion_horas = Decimal('1.5')
+        sesion.save()
+
+        self.assertEqual(self._horas(), Decimal('3.5'))
+        self.assertEqual(
+            ConsumoHorasDiario.objects.get(fecha=timezone.localdate(sesion.fecha)).horas, Decimal('3.5')
+        )
+
+    def test_mover_sesion_de_dia(self):
+        sesion = self._sesion(2)
+        dia_original = timezone.localdate(sesion.fecha)
+
+        sesion.fecha = sesion.fecha - timedelta(days=3)
+        sesion.save()
+
+        self.assertEqual(self._horas(), Decimal('2'))
+        self.assertEqual(ConsumoHorasDiario.objects.get(fecha=dia_original).horas, Decimal('0'))
+        self.assertEqual(
+            ConsumoHorasDiario.objects.get(fecha=timezone.localdate(sesion.fecha)).horas, Decimal('2')
+        )
+
+    def test_eliminar_participacion_con_sesiones(self):
+        self._sesion(2)
+        self._sesion(3, dias=2)
+
+        self.participacion.delete()
+
+        self.assertFalse(ProveedorProyecto.objects.filter(pk=self.participacion.pk).exists())
+        self.assertFalse(SesionAcompanamiento.objects.exists())
+        self.assertFalse(ConsumoHorasDiario.objects.exists())
+
+
+class InicioParticipacionTests(TestCase):
+    """La Etapa 1 existe para toda participación en proceso."""
+
+    def setUp(self):
+        empresa = EmpresaAncla.objects.create(nombre='Empresa', nit='900000002')
+        self.proveedor = Proveedor.objects.create(
+            razon_social='Proveedor SAS', nit='800000002', representante_legal='Luis',
+            email='proveedor@example.com', telefono='1', direccion='Calle 1',
+            ciudad='Bogotá', departamento='Cundinamarca',
+        )
+        self.proyecto = Proyecto.objects.create(
+            nombre='Proyecto', empresa_ancla=empresa, fecha_inicio=timezone.localdate(),
+            fecha_fin_planeada=timezone.localdate() + timedelta(days=90),
+        )
+
+    def test_creada_en_proceso(self):
+        participacion = ProveedorProyecto.objects.create(
+            proyecto=self.proyecto, proveedor=self.proveedor,
+            estado=ProveedorProyecto.EstadoParticipacion.EN_PROCESO,
+        )
+        self.assertTrue(Etapa1Diagnostico.objects.filter(proveedor_proyecto=participacion).exists())
+
+    def test_cambio_de_estado_a_en_proceso(self):
+        participacion = ProveedorProyecto.objects.create(proyecto=self.proyecto, proveedor=self.proveedor)
+        self.assertFalse(Etapa1Diagnostico.objects.filter(proveedor_proyecto=participacion).exists())
+
+        participacion.estado = ProveedorProyecto.EstadoParticipacion.EN_PROCESO
+        participacion.save()
+
+        self.assertTrue(Etapa1Diagnostico.objects.filter(proveedor_proyecto=participacion).exists())
+
+
+class TendenciaIndicadorTests(TestCase):
+    """Ventana de tendencia de los indicadores al editar mediciones."""
+
+    def setUp(self):
+        empresa = EmpresaAncla.objects.create(nombre='Empresa', nit='900000003')
+        proveedor = Proveedor.objects.create(
+            razon_social='Proveedor SAS', nit='800000003', representante_legal='Luis',
+            email='proveedor@example.com', telefono='1', direccion='Calle 1',
+            ciudad='Bogotá', departamento='Cundinamarca',
+        )
+        proyecto = Proyecto.objects.create(
+            nombre='Proyecto', empresa_ancla=empresa, fecha_inicio=timezone.localdate(),
+            fecha_fin_planeada=timezone.localdate() + timedelta(days=90),
+        )
+        participacion = ProveedorProyecto.objects.create(proyecto=proyecto, proveedor=proveedor)
+        etapa4 = Etapa4Monitoreo.objects.create(proveedor_proyecto=participacion)
+        self.origen = IndicadorKPI.objects.create(etapa4=etapa4, nombre='Ventas')
+        self.destino = IndicadorKPI.objects.create(etapa4=etapa4, nombre='Costos')
+
+    def test_mover_medicion_recalcula_indicador_anterior(self):
+        MedicionKPI.objects.create(indicador=self.origen, fecha_medicion=date(2024, 1, 1), valor=10)
+        medicion = MedicionKPI.objects.create(
+            indicador=self.origen, fecha_medicion=date(2024, 2, 1), valor=20
+        )
+
+        medicion.indicador = self.destino
+        medicion.save()
+
+        self.origen.refresh_from_db()
+        self.destino.refresh_from_db()
+        self.assertEqual(self.origen.ventana_tendencia['n'], 1)
+        self.assertEqual(self.origen.valor_actual, Decimal('10'))
+        self.assertIsNone(self.origen.pendiente)
+        self.assertEqual(self.destino.ventana_tendencia['n'], 1)
+        self.assertEqual(self.destino.valor_actual, Decimal('20'))
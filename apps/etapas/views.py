@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.contrib import messages
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect
@@ -5,8 +7,10 @@ from django.urls import reverse_lazy
 from django.utils import timezone
 from django.views.generic import DetailView, CreateView, UpdateView, TemplateView
 
+from apps.core import calendario
 from apps.core.mixins import ConsultorRequiredMixin
 from apps.proyectos.models import ProveedorProyecto
+from apps.reportes.impacto import resultados_kpis
 from .models import (
     Etapa1Diagnostico, VozCliente, DiagnosticoCompetitividad, ObjetivoFortalecimiento, DocumentoEtapa1,
     Etapa2Plan, HallazgoProblema, AccionMejora, CronogramaImplementacion,
@@ -31,8 +35,11 @@ class ProveedorProyectoEtapasView(ConsultorRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         pp = self.object
 
-        # Obtener o crear etapas
-        context['etapa1'], _ = Etapa1Diagnostico.objects.get_or_create(proveedor_proyecto=pp)
+        # Solo lectura: las etapas se crean en las transiciones (iniciar, completar)
+        try:
+            context['etapa1'] = pp.etapa1
+        except Etapa1Diagnostico.DoesNotExist:
+            context['etapa1'] = None
 
         try:
             context['etapa2'] = pp.etapa2
@@ -64,17 +71,36 @@ class Etapa1DetailView(ConsultorRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        etapa1, _ = Etapa1Diagnostico.objects.get_or_create(proveedor_proyecto=self.object)
+        try:
+            etapa1 = self.object.etapa1
+        except Etapa1Diagnostico.DoesNotExist:
+            etapa1 = None
         context['etapa1'] = etapa1
-        context['voces_cliente'] = etapa1.voces_cliente.all()
-        context['diagnosticos'] = etapa1.diagnosticos.all()
-        context['objetivos'] = etapa1.objetivos.all()
-        context['documentos'] = etapa1.documentos.all()
+        if etapa1:
+            context['voces_cliente'] = etapa1.voces_cliente.all()
+            context['diagnosticos'] = etapa1.diagnosticos.all()
+            context['objetivos'] = etapa1.objetivos.all()
+            context['documentos'] = etapa1.documentos.all()
         context['areas_evaluadas'] = DiagnosticoCompetitividad.AreaEvaluada.choices
         return context
 
 
-class VozClienteCreateView(ConsultorRequiredMixin, CreateView):
+class Etapa1RegistroMixin:
+    """
+    Formularios de la Etapa 1: exigen que el proceso del proveedor esté
+    iniciado (``ProveedorProyecto.iniciar``) en lugar de crear la etapa.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        self.etapa1 = Etapa1Diagnostico.objects.filter(proveedor_proyecto_id=kwargs['pk']).first()
+        if self.etapa1 is None:
+            get_object_or_404(ProveedorProyecto, pk=kwargs['pk'])
+            messages.warning(request, 'Inicie el proceso del proveedor antes de registrar información de la Etapa 1.')
+            return redirect('etapas:etapa1_detalle', pk=kwargs['pk'])
+        return super().dispatch(request, *args, **kwargs)
+
+
+class VozClienteCreateView(ConsultorRequiredMixin, Etapa1RegistroMixin, CreateView):
     """Crear registro de voz del cliente."""
     model = VozCliente
     form_class = VozClienteForm
@@ -84,16 +110,14 @@ class VozClienteCreateView(ConsultorRequiredMixin, CreateView):
         return reverse_lazy('etapas:etapa1_detalle', kwargs={'pk': self.kwargs['pk']})
 
     def form_valid(self, form):
-        pp = get_object_or_404(ProveedorProyecto, pk=self.kwargs['pk'])
-        etapa1, _ = Etapa1Diagnostico.objects.get_or_create(proveedor_proyecto=pp)
-        if etapa1.estado == 'PENDIENTE':
-            etapa1.iniciar()
-        form.instance.etapa1 = etapa1
+        if self.etapa1.estado == 'PENDIENTE':
+            self.etapa1.iniciar()
+        form.instance.etapa1 = self.etapa1
         messages.success(self.request, 'Voz del cliente registrada correctamente.')
         return super().form_valid(form)
 
 
-class DiagnosticoCreateView(ConsultorRequiredMixin, CreateView):
+class DiagnosticoCreateView(ConsultorRequiredMixin, Etapa1RegistroMixin, CreateView):
     """Crear diagnóstico de competitividad."""
     model = DiagnosticoCompetitividad
     form_class = DiagnosticoForm
@@ -103,14 +127,12 @@ class DiagnosticoCreateView(ConsultorRequiredMixin, CreateView):
         return reverse_lazy('etapas:etapa1_detalle', kwargs={'pk': self.kwargs['pk']})
 
     def form_valid(self, form):
-        pp = get_object_or_404(ProveedorProyecto, pk=self.kwargs['pk'])
-        etapa1, _ = Etapa1Diagnostico.objects.get_or_create(proveedor_proyecto=pp)
-        form.instance.etapa1 = etapa1
+        form.instance.etapa1 = self.etapa1
         messages.success(self.request, 'Diagnóstico registrado correctamente.')
         return super().form_valid(form)
 
 
-class ObjetivoCreateView(ConsultorRequiredMixin, CreateView):
+class ObjetivoCreateView(ConsultorRequiredMixin, Etapa1RegistroMixin, CreateView):
     """Crear objetivo de fortalecimiento."""
     model = ObjetivoFortalecimiento
     form_class = ObjetivoForm
@@ -120,14 +142,12 @@ class ObjetivoCreateView(ConsultorRequiredMixin, CreateView):
         return reverse_lazy('etapas:etapa1_detalle', kwargs={'pk': self.kwargs['pk']})
 
     def form_valid(self, form):
-        pp = get_object_or_404(ProveedorProyecto, pk=self.kwargs['pk'])
-        etapa1, _ = Etapa1Diagnostico.objects.get_or_create(proveedor_proyecto=pp)
-        form.instance.etapa1 = etapa1
+        form.instance.etapa1 = self.etapa1
         messages.success(self.request, 'Objetivo registrado correctamente.')
         return super().form_valid(form)
 
 
-class DocumentoEtapa1CreateView(ConsultorRequiredMixin, CreateView):
+class DocumentoEtapa1CreateView(ConsultorRequiredMixin, Etapa1RegistroMixin, CreateView):
     """Subir documento de Etapa 1."""
     model = DocumentoEtapa1
     form_class = DocumentoEtapa1Form
@@ -137,9 +157,7 @@ class DocumentoEtapa1CreateView(ConsultorRequiredMixin, CreateView):
         return reverse_lazy('etapas:etapa1_detalle', kwargs={'pk': self.kwargs['pk']})
 
     def form_valid(self, form):
-        pp = get_object_or_404(ProveedorProyecto, pk=self.kwargs['pk'])
-        etapa1, _ = Etapa1Diagnostico.objects.get_or_create(proveedor_proyecto=pp)
-        form.instance.etapa1 = etapa1
+        form.instance.etapa1 = self.etapa1
         form.instance.uploaded_by = self.request.user
         messages.success(self.request, 'Documento subido correctamente.')
         return super().form_valid(form)
@@ -386,6 +404,15 @@ class SesionCreateView(ConsultorRequiredMixin, CreateView):
         pp = get_object_or_404(ProveedorProyecto, pk=self.kwargs['pk'])
         form.instance.etapa3 = pp.etapa3
         form.instance.consultor = self.request.user
+
+        inicio = form.cleaned_data['fecha']
+        fin = inicio + timedelta(hours=float(form.cleaned_data['duracion_horas']))
+        cruces = calendario.conflictos(inicio, fin, consultor=self.request.user.pk)
+        if cruces:
+            messages.warning(
+                self.request,
+                'La sesión se cruza con: ' + ', '.join(evento.titulo for evento in cruces)
+            )
         messages.success(self.request, 'Sesión registrada correctamente.')
         return super().form_valid(form)
 
@@ -520,14 +547,7 @@ def generar_informe_cierre(request, pk):
     etapa4 = get_object_or_404(Etapa4Monitoreo, proveedor_proyecto=pp)
 
     # Recopilar datos para el informe
-    kpis_data = {}
-    for ind in etapa4.indicadores.all():
-        kpis_data[ind.nombre] = {
-            'inicial': float(ind.valor_inicial),
-            'final': float(ind.valor_actual),
-            'meta': float(ind.valor_meta),
-            'cumplimiento': ind.porcentaje_cumplimiento
-        }
+    kpis_data = resultados_kpis(etapa4)
 
     informe, created = InformeCierre.objects.get_or_create(
         etapa4=etapa4,
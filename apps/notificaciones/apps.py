@@ -5,3 +5,8 @@ class NotificacionesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.notificaciones'
     verbose_name = 'Notificaciones'
+
+    def ready(self):
+        # Conecta la invalidación de los datos de referencia
+        import apps.notificaciones.referencia  # noqa
+        import apps.notificaciones.signals  # noqa
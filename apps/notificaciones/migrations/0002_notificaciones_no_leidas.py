@@ -0,0 +1,20 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notificaciones", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notificacion",
+            index=models.Index(
+                fields=["usuario", "tipo", "estado", "-created_at"],
+                name="notif_usuario_estado_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notificaciones", "0002_notificaciones_no_leidas"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="colanotificacion",
+            index=models.Index(
+                condition=models.Q(("procesado", False)),
+                fields=["-prioridad", "created_at"],
+                name="notif_cola_pendiente_idx",
+            ),
+        ),
+    ]
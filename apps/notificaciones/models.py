@@ -86,6 +86,13 @@ class Notificacion(models.Model):
         verbose_name = 'Notificación'
         verbose_name_plural = 'Notificaciones'
         ordering = ['-created_at']
+        indexes = [
+            # No leídas del usuario (contador y desplegable de la barra superior)
+            models.Index(
+                fields=['usuario', 'tipo', 'estado', '-created_at'],
+                name='notif_usuario_estado_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.titulo} - {self.usuario.email}"
@@ -97,6 +104,9 @@ class Notificacion(models.Model):
             self.estado = self.Estado.LEIDA
             self.fecha_lectura = timezone.now()
             self.save(update_fields=['estado', 'fecha_lectura'])
+            if self.tipo == PlantillaNotificacion.TipoNotificacion.SISTEMA:
+                from .tiempo_real import notificaciones_leidas
+                notificaciones_leidas(self.usuario_id)
 
 
 class ConfiguracionNotificacion(models.Model):
@@ -157,6 +167,14 @@ class ColaNotificacion(models.Model):
         verbose_name = 'Cola de Notificación'
         verbose_name_plural = 'Cola de Notificaciones'
         ordering = ['-prioridad', 'created_at']
+        indexes = [
+            # procesar_cola solo lee pendientes, en orden de prioridad
+            models.Index(
+                fields=['-prioridad', 'created_at'],
+                condition=models.Q(procesado=False),
+                name='notif_cola_pendiente_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Cola: {self.notificacion.titulo}"
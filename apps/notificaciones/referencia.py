@@ -0,0 +1,51 @@
+"""
+Datos de referencia de notificaciones: plantillas activas y configuración de
+envío por email y WhatsApp, servidos desde ``apps.core.referencia``.
+"""
+from typing import Dict, Optional
+
+from apps.core.referencia import DatosReferencia
+from .models import PlantillaNotificacion, ConfiguracionEmail, ConfiguracionWhatsApp
+
+
+def _cargar_plantillas():
+    return {
+        (plantilla.evento, plantilla.tipo): plantilla
+        for plantilla in PlantillaNotificacion.objects.filter(is_active=True)
+    }
+
+
+plantillas = DatosReferencia(
+    'notificaciones.plantillas', _cargar_plantillas,
+    modelos=['notificaciones.PlantillaNotificacion'],
+)
+configuracion_email = DatosReferencia(
+    'notificaciones.configuracion_email',
+    lambda: ConfiguracionEmail.objects.filter(is_active=True).order_by('pk').first(),
+    modelos=['notificaciones.ConfiguracionEmail'],
+)
+configuracion_whatsapp = DatosReferencia(
+    'notificaciones.configuracion_whatsapp',
+    lambda: ConfiguracionWhatsApp.objects.filter(is_active=True).order_by('pk').first(),
+    modelos=['notificaciones.ConfiguracionWhatsApp'],
+)
+
+
+def plantilla(evento: str, tipo: str) -> Optional[PlantillaNotificacion]:
+    """Plantilla activa para el evento y el canal."""
+    return plantillas.obtener().get((evento, tipo))
+
+
+def plantillas_evento(evento: str) -> Dict[str, PlantillaNotificacion]:
+    """Plantillas activas del evento por canal."""
+    return {tipo: p for (ev, tipo), p in plantillas.obtener().items() if ev == evento}
+
+
+def email() -> Optional[ConfiguracionEmail]:
+    """Configuración de email activa."""
+    return configuracion_email.obtener()
+
+
+def whatsapp() -> Optional[ConfiguracionWhatsApp]:
+    """Configuración de WhatsApp activa."""
+    return configuracion_whatsapp.obtener()
@@ -7,13 +7,14 @@ from typing import Optional, Dict, Any, List
 
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.utils import timezone
 
 from .models import (
-    Notificacion, PlantillaNotificacion, ConfiguracionNotificacion,
-    ColaNotificacion, HistorialEnvio, ConfiguracionEmail, ConfiguracionWhatsApp
+    Notificacion, ConfiguracionNotificacion, ColaNotificacion, HistorialEnvio
 )
+from . import referencia, tiempo_real
 from apps.core.models import Usuario
 
 logger = logging.getLogger(__name__)
@@ -63,9 +64,7 @@ class NotificacionService:
 
         for tipo in tipos:
             # Buscar plantilla
-            plantilla = PlantillaNotificacion.objects.filter(
-                evento=evento, tipo=tipo, is_active=True
-            ).first()
+            plantilla = referencia.plantilla(evento, tipo)
 
             if not plantilla:
                 logger.warning(f"No hay plantilla activa para evento={evento}, tipo={tipo}")
@@ -95,8 +94,87 @@ class NotificacionService:
 
             notificaciones.append(notificacion)
 
+        tiempo_real.notificaciones_creadas(notificaciones)
         return notificaciones
 
+    @classmethod
+    def crear_notificaciones_masivas(
+        cls,
+        evento: str,
+        envios: List[Dict[str, Any]],
+        prioridad: int = 2,
+        preferencia: Optional[str] = None
+    ) -> int:
+        """
+        Crea notificaciones de un mismo evento para muchos destinatarios.
+
+        Las configuraciones de los usuarios y las plantillas del evento se
+        leen con una consulta cada una, y notificaciones y cola se insertan con
+        ``bulk_create``, independientemente del número de envíos.
+
+        Args:
+            evento: Tipo de evento (ver PlantillaNotificacion.Evento)
+            envios: Lista de diccionarios con ``usuario``, ``datos`` y
+                opcionalmente ``enlace``
+            prioridad: Prioridad en la cola (1-4)
+            preferencia: Campo booleano de ConfiguracionNotificacion que el
+                usuario debe tener activo (p. ej. 'notificar_tareas')
+
+        Returns:
+            Número de notificaciones creadas
+        """
+        if not envios:
+            return 0
+
+        usuarios = {envio['usuario'].pk: envio['usuario'] for envio in envios}
+        configs = {
+            config.usuario_id: config
+            for config in ConfiguracionNotificacion.objects.filter(usuario_id__in=usuarios)
+        }
+        faltantes = [
+            ConfiguracionNotificacion(usuario=usuario)
+            for pk, usuario in usuarios.items() if pk not in configs
+        ]
+        if faltantes:
+            ConfiguracionNotificacion.objects.bulk_create(faltantes, ignore_conflicts=True)
+            configs.update({config.usuario_id: config for config in faltantes})
+
+        plantillas = referencia.plantillas_evento(evento)
+        if not plantillas:
+            logger.warning(f"No hay plantillas activas para evento={evento}")
+            return 0
+
+        canales = [('EMAIL', 'email_activo'), ('WHATSAPP', 'whatsapp_activo'), ('SISTEMA', 'sistema_activo')]
+        notificaciones = []
+        for envio in envios:
+            config = configs[envio['usuario'].pk]
+            if preferencia and not getattr(config, preferencia):
+                continue
+            for tipo, campo in canales:
+                plantilla = plantillas.get(tipo)
+                if plantilla is None or not getattr(config, campo):
+                    continue
+                notificaciones.append(Notificacion(
+                    usuario=envio['usuario'],
+                    plantilla=plantilla,
+                    tipo=tipo,
+                    titulo=cls._renderizar_texto(plantilla.asunto, envio['datos']),
+                    mensaje=cls._renderizar_texto(plantilla.contenido, envio['datos']),
+                    datos=envio['datos'],
+                    enlace=envio.get('enlace', ''),
+                    estado=Notificacion.Estado.PENDIENTE
+                ))
+
+        with transaction.atomic():
+            Notificacion.objects.bulk_create(notificaciones, batch_size=500)
+            ColaNotificacion.objects.bulk_create(
+                [ColaNotificacion(notificacion=n, prioridad=prioridad) for n in notificaciones],
+                batch_size=500
+            )
+            tiempo_real.notificaciones_creadas(notificaciones)
+
+        return len(notificaciones)
+
     @classmethod
     def _renderizar_texto(cls, texto: str, datos: Dict[str, Any]) -> str:
         """Renderiza texto con variables."""
@@ -168,7 +246,7 @@ class NotificacionService:
         """Envía notificación por email."""
         try:
             # Obtener configuración de email
-            config_email = ConfiguracionEmail.objects.filter(is_active=True).first()
+            config_email = referencia.email()
 
             if not config_email:
                 logger.error("No hay configuración de email activa")
@@ -220,7 +298,7 @@ class NotificacionService:
             import requests
 
             # Obtener configuración de WhatsApp
-            config_wa = ConfiguracionWhatsApp.objects.filter(is_active=True).first()
+            config_wa = referencia.whatsapp()
 
             if not config_wa:
                 logger.error("No hay configuración de WhatsApp activa")
@@ -310,8 +388,8 @@ def notificar_tarea_asignada(tarea):
 
     datos = {
         'tarea': tarea.titulo,
-        'proveedor': tarea.implementacion.proveedor_proyecto.proveedor.razon_social,
-        'fecha_limite': tarea.fecha_limite.strftime('%d/%m/%Y') if tarea.fecha_limite else 'Sin fecha',
+        'proveedor': tarea.etapa3.proveedor_proyecto.proveedor.razon_social,
+        'fecha_limite': tarea.fecha_fin_planeada.strftime('%d/%m/%Y') if tarea.fecha_fin_planeada else 'Sin fecha',
     }
 
     NotificacionService.crear_notificacion(
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.core.models import Usuario
+from .models import Notificacion
+from .tiempo_real import ESTADOS_NO_LEIDA, TIPO_SISTEMA, notificaciones_leidas
+
+
+@receiver(post_delete, sender=Notificacion)
+def descontar_no_leida_eliminada(sender, instance, origin=None, **kwargs):
+    """Una notificación del sistema no leída eliminada sale del contador de su usuario."""
+    if isinstance(origin, Usuario):
+        # El usuario desaparece con sus notificaciones
+        return
+    if instance.tipo == TIPO_SISTEMA and instance.estado in ESTADOS_NO_LEIDA:
+        notificaciones_leidas(instance.usuario_id)
@@ -12,41 +12,21 @@ logger = logging.getLogger(__name__)
 @shared_task
 def procesar_cola_notificaciones():
     """Procesa la cola de notificaciones pendientes."""
+    from apps.core import configuracion
     from .services import NotificacionService
 
-    stats = NotificacionService.procesar_cola(limite=100)
+    stats = NotificacionService.procesar_cola(limite=configuracion.valor('notificaciones.lote_cola', 100))
     logger.info(f"Cola procesada: {stats}")
     return stats
 
 
 @shared_task
-def enviar_recordatorios_tareas():
-    """Envía recordatorios de tareas próximas a vencer."""
-    from apps.etapas.models import TareaImplementacion
-    from apps.notificaciones.services import NotificacionService
+def enviar_recordatorios_tareas(dias_riesgo: int = 2):
+    """Monitor de SLA: notifica tareas vencidas y próximas a vencer."""
+    from apps.etapas import sla
 
-    # Tareas que vencen mañana
-    manana = timezone.now().date() + timedelta(days=1)
-
-    tareas = TareaImplementacion.objects.filter(
-        fecha_limite=manana,
-        estado__in=['PENDIENTE', 'EN_PROGRESO']
-    ).select_related('responsable', 'implementacion__proveedor_proyecto__proveedor')
-
-    for tarea in tareas:
-        if tarea.responsable:
-            NotificacionService.crear_notificacion(
-                usuario=tarea.responsable,
-                evento='TAREA_VENCIDA',
-                datos={
-                    'tarea': tarea.titulo,
-                    'fecha_limite': tarea.fecha_limite.strftime('%d/%m/%Y'),
-                    'proveedor': tarea.implementacion.proveedor_proyecto.proveedor.razon_social,
-                },
-                prioridad=3
-            )
-
-    return f"Recordatorios enviados: {tareas.count()}"
+    stats = sla.monitorear(dias_riesgo=dias_riesgo)
+    return f"Tareas vencidas: {stats['vencidas']}, en riesgo: {stats['en_riesgo']}, notificaciones: {stats['notificaciones']}"
 
 
 @shared_task
@@ -90,7 +70,6 @@ def enviar_recordatorios_talleres():
 def generar_reportes_automaticos():
     """Genera reportes automáticos según configuración."""
     from apps.reportes.models import ConfiguracionReporteAutomatico
-    from apps.notificaciones.services import NotificacionService
 
     hoy = timezone.now()
     dia_semana = hoy.weekday()  # 0 = Lunes
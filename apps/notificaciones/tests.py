@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.core.models import Usuario
+from . import tiempo_real
+from .models import Notificacion
+
+
+@mock.patch('apps.notificaciones.tiempo_real._publicar')
+class ContadorNoLeidasTests(TestCase):
+    """Contador en caché de notificaciones del sistema no leídas."""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = Usuario.objects.create_user(
+            'usuario@example.com', 'x', nombre='Ana', apellido='Ruiz'
+        )
+        self.notificaciones = [
+            Notificacion.objects.create(
+                usuario=self.usuario, tipo=tiempo_real.TIPO_SISTEMA,
+                titulo=f'Aviso {i}', mensaje='Mensaje',
+            )
+            for i in range(3)
+        ]
+        self.assertEqual(tiempo_real.contar_no_leidas(self.usuario.pk), 3)
+
+    def test_marcar_leida_descuenta(self, publicar):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notificaciones[0].marcar_como_leida()
+
+        self.assertEqual(tiempo_real.contar_no_leidas(self.usuario.pk), 2)
+        publicar.assert_called_once()
+
+    def test_eliminar_no_leida_descuenta(self, publicar):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notificaciones[0].delete()
+
+        self.assertEqual(tiempo_real.contar_no_leidas(self.usuario.pk), 2)
+
+    def test_eliminacion_masiva(self, publicar):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notificaciones[0].marcar_como_leida()
+            Notificacion.objects.filter(usuario=self.usuario).delete()
+
+        self.assertEqual(tiempo_real.contar_no_leidas(self.usuario.pk), 0)
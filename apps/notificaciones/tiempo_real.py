@@ -0,0 +1,248 @@
+"""
+Canal en tiempo real de notificaciones del sistema.
+
+Sustituye el sondeo periódico de ``NotificacionesNoLeidasView`` por un flujo
+Server-Sent Events por usuario:
+
+- Las notificaciones SISTEMA nuevas y los cambios del contador de no leídas
+  se publican en el canal Redis ``notificaciones:<usuario>`` una vez
+  confirmada la transacción que las crea o modifica.
+- ``NotificacionesStreamView`` se suscribe a ese canal y reenvía los
+  mensajes como eventos SSE (``notificacion`` y ``contador``), con un
+  latido periódico para mantener abiertas las conexiones intermedias.
+- El número de no leídas se mantiene en caché por usuario y se ajusta con
+  ``incr``/``decr`` al crear, marcar como leída, marcar todas o eliminar
+  (también en borrados masivos, vía ``post_delete``); solo se recalcula
+  contra la base de datos cuando la clave no está en caché.
+
+El flujo solo se sirve con ``NOTIFICACIONES_STREAM_ACTIVO`` (desactivado por
+defecto); sin él, el navbar consulta el contador en caché periódicamente.
+Bajo ASGI el flujo usa ``redis.asyncio`` y no ocupa un hilo por conexión;
+bajo WSGI cada conexión abierta ocupa un worker hasta
+``NOTIFICACIONES_STREAM_DURACION`` segundos, tras los cuales el navegador
+reconecta, por lo que solo debe activarse al servir con ASGI. Si Redis no está disponible, el flujo degrada a enviar el contador
+en caché cada ``INTERVALO_RESPALDO`` segundos.
+"""
+import asyncio
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Notificacion, PlantillaNotificacion
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_NO_LEIDA = [Notificacion.Estado.PENDIENTE, Notificacion.Estado.ENVIADA]
+TIPO_SISTEMA = PlantillaNotificacion.TipoNotificacion.SISTEMA
+
+CLAVE_CONTADOR = 'notificaciones:no_leidas:{}'
+TTL_CONTADOR = 60 * 60 * 24
+CANAL = 'notificaciones:{}'
+
+LATIDO = 25
+INTERVALO_RESPALDO = 60
+REINTENTO_MS = 5000
+
+_cliente = None
+
+
+# Contador de no leídas
+
+def no_leidas(usuario_id):
+    """Notificaciones del sistema no leídas de un usuario."""
+    return Notificacion.objects.filter(
+        usuario_id=usuario_id, tipo=TIPO_SISTEMA, estado__in=ESTADOS_NO_LEIDA
+    )
+
+
+def contar_no_leidas(usuario_id):
+    """Número de no leídas desde caché; recalcula solo si la clave no existe."""
+    clave = CLAVE_CONTADOR.format(usuario_id)
+    valor = cache.get(clave)
+    if valor is None:
+        valor = no_leidas(usuario_id).count()
+        cache.add(clave, valor, TTL_CONTADOR)
+    return valor
+
+
+def _ajustar_contador(usuario_id, delta):
+    """
+    Suma ``delta`` al contador en caché.
+
+    Returns:
+        Nuevo valor, o None si la clave no estaba en caché (la siguiente
+        lectura lo recalcula) o quedó inconsistente
+    """
+    clave = CLAVE_CONTADOR.format(usuario_id)
+    try:
+        valor = cache.incr(clave, delta)
+    except ValueError:
+        return None
+    if valor < 0:
+        cache.delete(clave)
+        return None
+    return valor
+
+
+# Publicación
+
+def _redis():
+    global _cliente
+    if _cliente is None:
+        import redis
+
+        _cliente = redis.Redis.from_url(
+            settings.NOTIFICACIONES_REDIS_URL, socket_connect_timeout=2, socket_timeout=2
+        )
+    return _cliente
+
+
+def _mensaje(evento, datos):
+    return json.dumps({'evento': evento, 'datos': datos}, default=str)
+
+
+def _publicar(mensajes):
+    """Publica pares (usuario_id, mensaje) en un único pipeline."""
+    if not mensajes:
+        return
+    try:
+        pipeline = _redis().pipeline(transaction=False)
+        for usuario_id, mensaje in mensajes:
+            pipeline.publish(CANAL.format(usuario_id), mensaje)
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f"No se pudieron publicar notificaciones en tiempo real: {e}")
+
+
+def notificaciones_creadas(notificaciones):
+    """Ajusta contadores y publica las notificaciones SISTEMA nuevas al confirmar."""
+    por_usuario = {}
+    for notificacion in notificaciones:
+        if notificacion.tipo == TIPO_SISTEMA and notificacion.estado in ESTADOS_NO_LEIDA:
+            por_usuario.setdefault(notificacion.usuario_id, []).append(notificacion)
+    if not por_usuario:
+        return
+
+    def publicar():
+        mensajes = []
+        for usuario_id, grupo in por_usuario.items():
+            total = _ajustar_contador(usuario_id, len(grupo))
+            if total is None:
+                total = contar_no_leidas(usuario_id)
+            mensajes.extend(
+                (usuario_id, _mensaje('notificacion', {
+                    'id': str(n.pk),
+                    'titulo': n.titulo,
+                    'mensaje': n.mensaje,
+                    'enlace': n.enlace,
+                    'created_at': n.created_at,
+                    'no_leidas': total,
+                }))
+                for n in grupo
+            )
+        _publicar(mensajes)
+
+    transaction.on_commit(publicar)
+
+
+def notificaciones_leidas(usuario_id, cantidad=1):
+    """Descuenta ``cantidad`` del contador y publica el nuevo valor al confirmar."""
+    if not cantidad:
+        return
+
+    def publicar():
+        total = _ajustar_contador(usuario_id, -cantidad)
+        if total is None:
+            total = contar_no_leidas(usuario_id)
+        _publicar([(usuario_id, _mensaje('contador', {'no_leidas': total}))])
+
+    transaction.on_commit(publicar)
+
+
+def todas_leidas(usuario_id):
+    """Deja el contador en cero y lo publica al confirmar."""
+    def publicar():
+        cache.set(CLAVE_CONTADOR.format(usuario_id), 0, TTL_CONTADOR)
+        _publicar([(usuario_id, _mensaje('contador', {'no_leidas': 0}))])
+
+    transaction.on_commit(publicar)
+
+
+# Flujo Server-Sent Events
+
+def _sse(mensaje):
+    """Convierte un mensaje publicado en un evento SSE."""
+    if isinstance(mensaje, bytes):
+        mensaje = mensaje.decode()
+    contenido = json.loads(mensaje)
+    return f"event: {contenido['evento']}\ndata: {json.dumps(contenido['datos'])}\n\n"
+
+
+def _inicio(usuario_id):
+    return f"retry: {REINTENTO_MS}\n" + _sse(_mensaje('contador', {'no_leidas': contar_no_leidas(usuario_id)}))
+
+
+def flujo(usuario_id):
+    """Generador SSE síncrono (WSGI)."""
+    yield _inicio(usuario_id)
+    fin = time.monotonic() + settings.NOTIFICACIONES_STREAM_DURACION
+
+    pubsub = None
+    try:
+        pubsub = _redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(CANAL.format(usuario_id))
+    except Exception as e:
+        logger.warning(f"Flujo de notificaciones sin Redis, se usa el contador en caché: {e}")
+        pubsub = None
+
+    try:
+        while time.monotonic() < fin:
+            if pubsub is None:
+                time.sleep(INTERVALO_RESPALDO)
+                yield _sse(_mensaje('contador', {'no_leidas': contar_no_leidas(usuario_id)}))
+                continue
+            mensaje = pubsub.get_message(timeout=LATIDO)
+            yield _sse(mensaje['data']) if mensaje else ': latido\n\n'
+    finally:
+        if pubsub is not None:
+            pubsub.close()
+
+
+async def flujo_asincrono(usuario_id):
+    """Generador SSE asíncrono (ASGI)."""
+    from asgiref.sync import sync_to_async
+
+    yield await sync_to_async(_inicio)(usuario_id)
+    fin = time.monotonic() + settings.NOTIFICACIONES_STREAM_DURACION
+
+    cliente = pubsub = None
+    try:
+        import redis.asyncio
+
+        cliente = redis.asyncio.Redis.from_url(
+            settings.NOTIFICACIONES_REDIS_URL, socket_connect_timeout=2
+        )
+        pubsub = cliente.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(CANAL.format(usuario_id))
+    except Exception as e:
+        logger.warning(f"Flujo de notificaciones sin Redis, se usa el contador en caché: {e}")
+        pubsub = None
+
+    try:
+        while time.monotonic() < fin:
+            if pubsub is None:
+                await asyncio.sleep(INTERVALO_RESPALDO)
+                total = await sync_to_async(contar_no_leidas)(usuario_id)
+                yield _sse(_mensaje('contador', {'no_leidas': total}))
+                continue
+            mensaje = await pubsub.get_message(timeout=LATIDO)
+            yield _sse(mensaje['data']) if mensaje else ': latido\n\n'
+    finally:
+        if pubsub is not None:
+            await pubsub.close()
+        if cliente is not None:
+            await cliente.close()
@@ -1,9 +1,12 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.generic import ListView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.utils import timezone
 
 from .models import Notificacion, ConfiguracionNotificacion
+from . import tiempo_real
 
 
 class NotificacionListView(LoginRequiredMixin, ListView):
@@ -21,20 +24,50 @@ class NotificacionListView(LoginRequiredMixin, ListView):
 
 
 class NotificacionesNoLeidasView(LoginRequiredMixin, View):
-    """API para obtener notificaciones no leídas."""
+    """
+    API para obtener notificaciones no leídas.
+
+    El contador sale de la caché; con ``?solo_contador=1`` no se consulta la
+    base de datos.
+    """
 
     def get(self, request):
-        notificaciones = Notificacion.objects.filter(
-            usuario=request.user,
-            estado__in=['PENDIENTE', 'ENVIADA']
-        ).values('id', 'titulo', 'mensaje', 'enlace', 'created_at')[:10]
+        count = tiempo_real.contar_no_leidas(request.user.pk)
+        notificaciones = []
+        if count and not request.GET.get('solo_contador'):
+            notificaciones = list(
+                tiempo_real.no_leidas(request.user.pk).values(
+                    'id', 'titulo', 'mensaje', 'enlace', 'created_at'
+                )[:10]
+            )
 
         return JsonResponse({
-            'count': notificaciones.count(),
-            'notificaciones': list(notificaciones)
+            'count': count,
+            'notificaciones': notificaciones
         })
 
 
+class NotificacionesStreamView(LoginRequiredMixin, View):
+    """
+    Flujo Server-Sent Events con notificaciones nuevas y el contador de no leídas.
+
+    Responde 204 (el navegador deja de reconectar) si
+    ``NOTIFICACIONES_STREAM_ACTIVO`` está desactivado.
+    """
+
+    def get(self, request):
+        if not settings.NOTIFICACIONES_STREAM_ACTIVO:
+            return HttpResponse(status=204)
+        if isinstance(request, ASGIRequest):
+            contenido = tiempo_real.flujo_asincrono(request.user.pk)
+        else:
+            contenido = tiempo_real.flujo(request.user.pk)
+        response = StreamingHttpResponse(contenido, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
 class MarcarLeidaView(LoginRequiredMixin, View):
     """Marcar notificación como leída."""
 
@@ -55,6 +88,7 @@ class MarcarTodasLeidasView(LoginRequiredMixin, View):
             usuario=request.user,
             estado__in=['PENDIENTE', 'ENVIADA']
         ).update(estado='LEIDA', fecha_lectura=timezone.now())
+        tiempo_real.todas_leidas(request.user.pk)
 
         return JsonResponse({'success': True})
 
@@ -63,8 +97,10 @@ class ConfiguracionNotificacionView(LoginRequiredMixin, View):
     """Configuración de notificaciones del usuario."""
 
     def get(self, request):
-        config, created = ConfiguracionNotificacion.objects.get_or_create(
-            usuario=request.user
+        # Sin configuración guardada se responden los valores por defecto, sin crearla
+        config = (
+            ConfiguracionNotificacion.objects.filter(usuario=request.user).first()
+            or ConfiguracionNotificacion(usuario=request.user)
         )
         return JsonResponse({
             'email_activo': config.email_activo,
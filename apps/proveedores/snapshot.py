@@ -0,0 +1,295 @@
+"""
+Snapshot 360° de un proveedor: vinculaciones, participaciones y las cuatro
+etapas con sus registros hijos, KPIs y sesiones.
+
+El árbol se carga con un plan fijo de consultas (``select_related`` de las
+etapas y un ``Prefetch`` con ``only()`` por cada colección), de modo que el
+número de consultas no depende del tamaño del proveedor. El resultado se
+guarda en caché con una clave derivada de la marca de agua: ``updated_at``
+del proveedor, de sus vinculaciones y sus empresas ancla, y de cada
+participación visible junto con su proyecto y los usuarios cuyos nombres se
+incluyen (consultor asignado, responsables de tareas y consultores de
+sesiones). Las señales de etapas avanzan el ``updated_at`` de la participación
+cuando cambia cualquiera de sus registros, así que un snapshot sin cambios se
+sirve desde caché con las dos consultas de la marca de agua, y una petición
+condicional cuya marca coincide no llega a leerlo.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, Max, OuterRef, Prefetch, Subquery
+from django.utils import timezone
+
+from apps.etapas.models import (
+    VozCliente, DiagnosticoCompetitividad, ObjetivoFortalecimiento,
+    HallazgoProblema, AccionMejora, CronogramaImplementacion,
+    TareaImplementacion, EvidenciaImplementacion, SesionAcompanamiento,
+    IndicadorKPI, MedicionKPI
+)
+from apps.proyectos.models import ProveedorProyecto
+from .models import ProveedorEmpresaAncla
+
+CLAVE_SNAPSHOT = 'snapshot:proveedor:{}:{}'
+TTL_SNAPSHOT = 60 * 60 * 24
+
+CAMPOS_PROVEEDOR = [
+    'id', 'razon_social', 'nombre_comercial', 'nit', 'email', 'telefono', 'ciudad',
+    'departamento', 'sector_economico', 'tamano_empresa', 'numero_empleados',
+]
+
+_ETAPAS = ['etapa1', 'etapa2', 'etapa3', 'etapa4']
+
+_CAMPOS_PARTICIPACION = [
+    'id', 'proveedor_id', 'etapa_actual', 'estado', 'fecha_inicio', 'fecha_fin_planeada',
+    'fecha_fin_real', 'porcentaje_avance', 'horas_planeadas', 'horas_consumidas', 'updated_at',
+    'proyecto__id', 'proyecto__codigo', 'proyecto__nombre',
+    'consultor_asignado__id', 'consultor_asignado__nombre', 'consultor_asignado__apellido',
+    'etapa1__id', 'etapa1__estado', 'etapa1__fecha_inicio', 'etapa1__fecha_fin',
+    'etapa2__id', 'etapa2__estado', 'etapa2__fecha_inicio', 'etapa2__fecha_fin', 'etapa2__fecha_aprobacion',
+    'etapa3__id', 'etapa3__estado', 'etapa3__fecha_inicio', 'etapa3__fecha_fin',
+    'etapa3__porcentaje_avance', 'etapa3__horas_acompanamiento',
+    'etapa4__id', 'etapa4__estado', 'etapa4__fecha_inicio', 'etapa4__fecha_fin',
+    'etapa4__informe_final_generado',
+]
+
+
+def _prefetches():
+    """Plan fijo: una consulta por colección del árbol."""
+    return [
+        Prefetch('etapa1__voces_cliente', queryset=VozCliente.objects.only(
+            'id', 'etapa1_id', 'empresa_ancla_contacto', 'cargo_contacto', 'fecha_entrevista'
+        ).order_by('fecha_entrevista')),
+        Prefetch('etapa1__diagnosticos', queryset=DiagnosticoCompetitividad.objects.only(
+            'id', 'etapa1_id', 'area_evaluada', 'nivel_madurez', 'puntaje'
+        ).order_by('area_evaluada')),
+        Prefetch('etapa1__objetivos', queryset=ObjetivoFortalecimiento.objects.only(
+            'id', 'etapa1_id', 'objetivo', 'valor_inicial', 'valor_meta', 'unidad_medida', 'prioridad'
+        ).order_by('prioridad')),
+        Prefetch('etapa2__hallazgos', queryset=HallazgoProblema.objects.only(
+            'id', 'etapa2_id', 'codigo', 'hallazgo', 'area_impactada', 'prioridad', 'orden'
+        ).order_by('orden')),
+        Prefetch('etapa2__hallazgos__acciones', queryset=AccionMejora.objects.only(
+            'id', 'hallazgo_id', 'descripcion', 'tipo_accion', 'puntuacion_priorizacion', 'seleccionada'
+        ).order_by('-puntuacion_priorizacion')),
+        Prefetch('etapa2__cronograma', queryset=CronogramaImplementacion.objects.only(
+            'id', 'etapa2_id', 'actividad', 'responsable', 'fecha_inicio_planeada', 'fecha_fin_planeada', 'orden'
+        ).order_by('orden')),
+        Prefetch('etapa3__tareas', queryset=TareaImplementacion.objects.select_related('responsable').only(
+            'id', 'etapa3_id', 'titulo', 'estado', 'prioridad', 'fecha_fin_planeada', 'fecha_fin_real',
+            'porcentaje_avance', 'orden', 'responsable__id', 'responsable__nombre', 'responsable__apellido'
+        ).order_by('orden', 'fecha_fin_planeada')),
+        Prefetch('etapa3__tareas__evidencias', queryset=EvidenciaImplementacion.objects.only(
+            'id', 'tarea_id', 'tipo', 'nombre', 'archivo', 'uploaded_at'
+        ).order_by('uploaded_at')),
+        Prefetch('etapa3__sesiones', queryset=SesionAcompanamiento.objects.select_related('consultor').only(
+            'id', 'etapa3_id', 'fecha', 'duracion_horas', 'modalidad', 'temas_tratados',
+            'consultor__id', 'consultor__nombre', 'consultor__apellido'
+        ).order_by('-fecha')),
+        Prefetch('etapa4__indicadores', queryset=IndicadorKPI.objects.only(
+            'id', 'etapa4_id', 'nombre', 'unidad_medida', 'valor_inicial', 'valor_actual', 'valor_meta',
+            'direccion', 'tendencia'
+        ).order_by('nombre')),
+        Prefetch('etapa4__indicadores__mediciones', queryset=MedicionKPI.objects.only(
+            'id', 'indicador_id', 'fecha_medicion', 'valor'
+        ).order_by('fecha_medicion')),
+    ]
+
+
+def _etapa(participacion, nombre):
+    try:
+        return getattr(participacion, nombre)
+    except ObjectDoesNotExist:
+        return None
+
+
+def _usuario(usuario):
+    return {'id': str(usuario.pk), 'nombre': usuario.nombre_completo} if usuario else None
+
+
+def _valores(objeto, campos):
+    return {campo: getattr(objeto, campo) for campo in campos}
+
+
+def participaciones_visibles(proveedor, alcance):
+    return alcance.filtrar(ProveedorProyecto.objects.filter(proveedor=proveedor))
+
+
+def vinculaciones_visibles(proveedor, alcance, usuario):
+    """Un usuario de empresa ancla solo ve las vinculaciones con sus empresas."""
+    vinculaciones = ProveedorEmpresaAncla.objects.filter(proveedor=proveedor)
+    if usuario.es_empresa_ancla and not alcance.todo and proveedor.pk not in alcance.proveedores_propios:
+        vinculaciones = vinculaciones.filter(empresa_ancla_id__in=alcance.empresas)
+    return vinculaciones
+
+
+def _ultima_actualizacion(modelo, campo):
+    """Subconsulta: ``updated_at`` más reciente de ``campo`` en los registros de la etapa 3."""
+    return Subquery(
+        modelo.objects.filter(etapa3__proveedor_proyecto=OuterRef('pk')).order_by().values(
+            'etapa3'
+        ).annotate(ultima=Max(f'{campo}__updated_at')).values('ultima')[:1]
+    )
+
+
+def marca_de_agua(proveedor, participaciones, vinculaciones):
+    """Huella de las fechas de actualización de todo lo que compone el snapshot."""
+    filas = sorted(participaciones.annotate(
+        responsables=_ultima_actualizacion(TareaImplementacion, 'responsable'),
+        consultores=_ultima_actualizacion(SesionAcompanamiento, 'consultor'),
+    ).values_list(
+        'id', 'updated_at', 'proyecto__updated_at', 'consultor_asignado__updated_at',
+        'responsables', 'consultores',
+    ))
+    agregado = vinculaciones.aggregate(
+        total=Count('id'), ultima=Max('updated_at'), empresas=Max('empresa_ancla__updated_at')
+    )
+    base = (
+        f"{proveedor.updated_at.isoformat()}|{agregado['total']}|{agregado['ultima']}|"
+        f"{agregado['empresas']}|{filas}"
+    )
+    return hashlib.sha1(base.encode()).hexdigest()
+
+
+def construir_snapshot(proveedor, participaciones, vinculaciones):
+    """Carga el árbol completo con el plan fijo de consultas y lo serializa."""
+    vinculaciones = vinculaciones.select_related('empresa_ancla').only(
+        'id', 'estado', 'categoria', 'codigo_proveedor', 'fecha_vinculacion',
+        'empresa_ancla__id', 'empresa_ancla__nombre', 'empresa_ancla__nit'
+    ).order_by('empresa_ancla__nombre')
+    participaciones = participaciones.select_related(
+        'proyecto', 'consultor_asignado', *_ETAPAS
+    ).only(*_CAMPOS_PARTICIPACION).prefetch_related(*_prefetches()).order_by('-fecha_inicio')
+
+    return {
+        'proveedor': {**_valores(proveedor, CAMPOS_PROVEEDOR), 'id': str(proveedor.pk)},
+        'vinculaciones': [
+            {
+                'id': str(v.pk),
+                'empresa_ancla': {'id': str(v.empresa_ancla.pk), 'nombre': v.empresa_ancla.nombre,
+                                  'nit': v.empresa_ancla.nit},
+                'estado': v.estado,
+                'categoria': v.categoria,
+                'codigo_proveedor': v.codigo_proveedor,
+                'fecha_vinculacion': v.fecha_vinculacion,
+            }
+            for v in vinculaciones
+        ],
+        'participaciones': [_participacion(pp) for pp in participaciones],
+    }
+
+
+def _participacion(pp):
+    etapa1, etapa2, etapa3, etapa4 = (_etapa(pp, nombre) for nombre in _ETAPAS)
+    return {
+        'id': str(pp.pk),
+        'proyecto': {'id': str(pp.proyecto.pk), 'codigo': pp.proyecto.codigo, 'nombre': pp.proyecto.nombre},
+        'consultor_asignado': _usuario(pp.consultor_asignado),
+        **_valores(pp, [
+            'etapa_actual', 'estado', 'fecha_inicio', 'fecha_fin_planeada', 'fecha_fin_real',
+            'porcentaje_avance', 'horas_planeadas', 'horas_consumidas', 'updated_at',
+        ]),
+        'etapa1': etapa1 and {
+            'id': str(etapa1.pk),
+            **_valores(etapa1, ['estado', 'fecha_inicio', 'fecha_fin']),
+            'voces_cliente': [
+                {'id': str(v.pk), **_valores(v, ['empresa_ancla_contacto', 'cargo_contacto', 'fecha_entrevista'])}
+                for v in etapa1.voces_cliente.all()
+            ],
+            'diagnosticos': [
+                {'id': str(d.pk), **_valores(d, ['area_evaluada', 'nivel_madurez', 'puntaje'])}
+                for d in etapa1.diagnosticos.all()
+            ],
+            'objetivos': [
+                {'id': str(o.pk), **_valores(o, ['objetivo', 'valor_inicial', 'valor_meta', 'unidad_medida', 'prioridad'])}
+                for o in etapa1.objetivos.all()
+            ],
+        },
+        'etapa2': etapa2 and {
+            'id': str(etapa2.pk),
+            **_valores(etapa2, ['estado', 'fecha_inicio', 'fecha_fin', 'fecha_aprobacion']),
+            'hallazgos': [
+                {
+                    'id': str(h.pk),
+                    **_valores(h, ['codigo', 'hallazgo', 'area_impactada', 'prioridad']),
+                    'acciones': [
+                        {'id': str(a.pk), **_valores(a, ['descripcion', 'tipo_accion', 'puntuacion_priorizacion', 'seleccionada'])}
+                        for a in h.acciones.all()
+                    ],
+                }
+                for h in etapa2.hallazgos.all()
+            ],
+            'cronograma': [
+                {'id': str(c.pk), **_valores(c, ['actividad', 'responsable', 'fecha_inicio_planeada', 'fecha_fin_planeada'])}
+                for c in etapa2.cronograma.all()
+            ],
+        },
+        'etapa3': etapa3 and {
+            'id': str(etapa3.pk),
+            **_valores(etapa3, ['estado', 'fecha_inicio', 'fecha_fin', 'porcentaje_avance', 'horas_acompanamiento']),
+            'tareas': [
+                {
+                    'id': str(t.pk),
+                    **_valores(t, ['titulo', 'estado', 'prioridad', 'fecha_fin_planeada', 'fecha_fin_real', 'porcentaje_avance']),
+                    'responsable': _usuario(t.responsable),
+                    'evidencias': [
+                        {'id': str(e.pk), 'tipo': e.tipo, 'nombre': e.nombre,
+                         'archivo': e.archivo.name, 'uploaded_at': e.uploaded_at}
+                        for e in t.evidencias.all()
+                    ],
+                }
+                for t in etapa3.tareas.all()
+            ],
+            'sesiones': [
+                {
+                    'id': str(s.pk),
+                    **_valores(s, ['fecha', 'duracion_horas', 'modalidad', 'temas_tratados']),
+                    'consultor': _usuario(s.consultor),
+                }
+                for s in etapa3.sesiones.all()
+            ],
+        },
+        'etapa4': etapa4 and {
+            'id': str(etapa4.pk),
+            **_valores(etapa4, ['estado', 'fecha_inicio', 'fecha_fin', 'informe_final_generado']),
+            'indicadores': [
+                {
+                    'id': str(i.pk),
+                    **_valores(i, ['nombre', 'unidad_medida', 'valor_inicial', 'valor_actual', 'valor_meta',
+                                   'direccion', 'tendencia']),
+                    'mediciones': [
+                        {'fecha': m.fecha_medicion, 'valor': m.valor} for m in i.mediciones.all()
+                    ],
+                }
+                for i in etapa4.indicadores.all()
+            ],
+        },
+    }
+
+
+def obtener_snapshot(proveedor, usuario, alcance, conocidas=()):
+    """
+    Snapshot del proveedor visible para el usuario, servido desde caché si la
+    marca de agua no cambió.
+
+    Args:
+        conocidas: Marcas de agua que el cliente ya tiene (``If-None-Match``);
+            si la actual está entre ellas no se lee ni se construye el snapshot
+
+    Returns:
+        Tupla (snapshot o None si la marca es conocida, marca de agua)
+    """
+    participaciones = participaciones_visibles(proveedor, alcance)
+    vinculaciones = vinculaciones_visibles(proveedor, alcance, usuario)
+    marca = marca_de_agua(proveedor, participaciones, vinculaciones)
+    if marca in conocidas:
+        return None, marca
+    clave = CLAVE_SNAPSHOT.format(proveedor.pk, marca)
+
+    snapshot = cache.get(clave)
+    if snapshot is None:
+        snapshot = construir_snapshot(proveedor, participaciones, vinculaciones)
+        snapshot['marca_de_agua'] = marca
+        snapshot['generado'] = timezone.now()
+        cache.set(clave, snapshot, TTL_SNAPSHOT)
+    return snapshot, marca
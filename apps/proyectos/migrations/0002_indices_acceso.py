@@ -0,0 +1,20 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("proyectos", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="proveedorproyecto",
+            index=models.Index(
+                fields=["proyecto", "etapa_actual", "estado"],
+                name="proy_pp_etapa_estado_idx",
+            ),
+        ),
+    ]
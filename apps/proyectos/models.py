@@ -1,5 +1,5 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from apps.core.models import AuditoriaModel, Usuario
 from apps.empresas.models import EmpresaAncla
@@ -209,10 +209,29 @@ class ProveedorProyecto(AuditoriaModel):
         verbose_name_plural = 'Participaciones de Proveedores'
         unique_together = ['proveedor', 'proyecto']
         ordering = ['proyecto', 'proveedor']
+        indexes = [
+            # Embudo de etapas por proyecto (dashboards y reportes)
+            models.Index(
+                fields=['proyecto', 'etapa_actual', 'estado'],
+                name='proy_pp_etapa_estado_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.proveedor} en {self.proyecto}"
 
+    @property
+    def horas_disponibles(self):
+        """Horas restantes del presupuesto de acompañamiento."""
+        return self.horas_planeadas - self.horas_consumidas
+
+    @property
+    def porcentaje_horas(self):
+        """Porcentaje del presupuesto de horas consumido."""
+        if not self.horas_planeadas:
+            return 0
+        return round(self.horas_consumidas / self.horas_planeadas * 100, 2)
+
     @property
     def etapa_nombre(self):
         """Nombre de la etapa actual."""
@@ -240,6 +259,44 @@ class ProveedorProyecto(AuditoriaModel):
 
         return False
 
+    def save(self, *args, **kwargs):
+        """
+        Toda participación que entra en EN_PROCESO (al crearla o al cambiar
+        su estado por cualquier vía) recibe su Etapa 1.
+        """
+        from apps.etapas.models import Etapa1Diagnostico
+
+        if self.estado != self.EstadoParticipacion.EN_PROCESO:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            estado_previo = None if self._state.adding else (
+                ProveedorProyecto.objects.filter(pk=self.pk).values_list('estado', flat=True).first()
+            )
+            super().save(*args, **kwargs)
+            if estado_previo != self.EstadoParticipacion.EN_PROCESO:
+                Etapa1Diagnostico.objects.get_or_create(proveedor_proyecto=self)
+
+    def iniciar(self):
+        """
+        Inicia el proceso de fortalecimiento: pasa a EN_PROCESO y crea la
+        Etapa 1 si falta (también para participaciones ya iniciadas sin
+        ella). Las vistas de consulta no crean etapas.
+
+        Returns:
+            Etapa1Diagnostico de la participación
+        """
+        from apps.etapas.models import Etapa1Diagnostico
+
+        with transaction.atomic():
+            if self.estado == self.EstadoParticipacion.PENDIENTE:
+                self.estado = self.EstadoParticipacion.EN_PROCESO
+                if not self.fecha_inicio:
+                    self.fecha_inicio = timezone.now().date()
+                self.save()
+            etapa1, _ = Etapa1Diagnostico.objects.get_or_create(proveedor_proyecto=self)
+        return etapa1
+
     def avanzar_etapa(self):
         """Avanza a la siguiente etapa si es posible."""
         if self.puede_avanzar_etapa:
@@ -306,17 +306,9 @@ def iniciar_proveedor(request, pk, proveedor_pk):
 
     proveedor_proyecto = get_object_or_404(ProveedorProyecto, pk=proveedor_pk, proyecto_id=pk)
 
-    if proveedor_proyecto.estado != 'PENDIENTE':
+    if proveedor_proyecto.estado != 'PENDIENTE' and hasattr(proveedor_proyecto, 'etapa1'):
         return JsonResponse({'error': 'El proveedor ya fue iniciado'}, status=400)
 
-    proveedor_proyecto.estado = 'EN_PROCESO'
-    if not proveedor_proyecto.fecha_inicio:
-        from django.utils import timezone
-        proveedor_proyecto.fecha_inicio = timezone.now().date()
-    proveedor_proyecto.save()
-
-    # Crear registro de Etapa 1 si no existe
-    from apps.etapas.models import Etapa1Diagnostico
-    Etapa1Diagnostico.objects.get_or_create(proveedor_proyecto=proveedor_proyecto)
+    proveedor_proyecto.iniciar()
 
     return JsonResponse({'success': True, 'message': 'Proceso iniciado correctamente'})
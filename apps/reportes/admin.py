@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import ReporteGenerado, PlantillaReporte, ConfiguracionReporteAutomatico
+from .models import (
+    ReporteGenerado, PlantillaReporte, ConfiguracionReporteAutomatico,
+    ResumenParticipacion, ResumenProyecto, ResumenEmpresa, ConsumoHorasDiario
+)
 
 
 @admin.register(ReporteGenerado)
@@ -20,3 +23,30 @@ class PlantillaReporteAdmin(admin.ModelAdmin):
 class ConfiguracionReporteAutomaticoAdmin(admin.ModelAdmin):
     list_display = ('empresa_ancla', 'tipo_reporte', 'frecuencia', 'is_active')
     list_filter = ('tipo_reporte', 'frecuencia', 'is_active')
+
+
+@admin.register(ResumenParticipacion)
+class ResumenParticipacionAdmin(admin.ModelAdmin):
+    list_display = ('proveedor', 'proyecto', 'etapa_actual', 'tasa_completitud', 'cumplimiento_kpis', 'actualizado')
+    list_filter = ('estado', 'etapa_actual')
+    raw_id_fields = ('proveedor_proyecto', 'proyecto', 'empresa_ancla', 'proveedor')
+
+
+@admin.register(ResumenProyecto)
+class ResumenProyectoAdmin(admin.ModelAdmin):
+    list_display = ('proyecto', 'total_proveedores', 'tasa_completitud', 'cumplimiento_kpis', 'actualizado')
+    raw_id_fields = ('proyecto', 'empresa_ancla')
+
+
+@admin.register(ResumenEmpresa)
+class ResumenEmpresaAdmin(admin.ModelAdmin):
+    list_display = ('empresa_ancla', 'proyectos_activos', 'total_proveedores', 'cumplimiento_kpis', 'actualizado')
+    raw_id_fields = ('empresa_ancla',)
+
+
+@admin.register(ConsumoHorasDiario)
+class ConsumoHorasDiarioAdmin(admin.ModelAdmin):
+    list_display = ('proveedor_proyecto', 'proyecto', 'fecha', 'horas')
+    list_filter = ('fecha',)
+    date_hierarchy = 'fecha'
+    raw_id_fields = ('proveedor_proyecto', 'proyecto')
@@ -5,3 +5,6 @@ class ReportesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.reportes'
     verbose_name = 'Reportes y Documentos'
+
+    def ready(self):
+        import apps.reportes.signals  # noqa
@@ -0,0 +1,207 @@
+"""
+Benchmarking de competitividad sobre ``DiagnosticoCompetitividad``.
+
+Los diagnósticos de una cohorte (sector, tamaño de empresa o proyecto) se
+cargan en una sola consulta y se pivotean a una matriz participaciones ×
+áreas; percentiles, z-scores y brecha frente al mejor se calculan de forma
+vectorizada con pandas/NumPy. Los resultados se cachean bajo una versión
+propia de cada cohorte, que se renueva al guardar o eliminar un diagnóstico
+de alguna de sus participaciones o al cambiar el sector o el tamaño de uno
+de sus proveedores.
+"""
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+
+from apps.etapas.models import DiagnosticoCompetitividad
+from apps.proyectos.models import ProveedorProyecto
+
+logger = logging.getLogger(__name__)
+
+AREAS = list(DiagnosticoCompetitividad.AreaEvaluada.values)
+
+# Cohorte -> ruta ORM desde DiagnosticoCompetitividad
+COHORTES = {
+    'sector': 'etapa1__proveedor_proyecto__proveedor__sector_economico',
+    'tamano': 'etapa1__proveedor_proyecto__proveedor__tamano_empresa',
+    'proyecto': 'etapa1__proveedor_proyecto__proyecto_id',
+}
+
+CLAVE_VERSION = 'benchmarking:version:{}:{}'
+TIEMPO_CACHE = 60 * 60 * 6
+
+
+def version_actual(cohorte, valor):
+    """Versión vigente de la caché de una cohorte."""
+    return cache.get_or_set(CLAVE_VERSION.format(cohorte, valor), time.time_ns, None)
+
+
+def invalidar_cache(cohorte, valor):
+    """Invalida el benchmark cacheado de una cohorte (cambio de versión)."""
+    cache.set(CLAVE_VERSION.format(cohorte, valor), time.time_ns(), None)
+
+
+def invalidar_participacion(proveedor_proyecto_id):
+    """Invalida las cohortes (sector, tamaño y proyecto) de una participación."""
+    fila = ProveedorProyecto.objects.filter(pk=proveedor_proyecto_id).values(
+        'proyecto_id', 'proveedor__sector_economico', 'proveedor__tamano_empresa'
+    ).first()
+    if fila is None:
+        return
+    invalidar_cache('sector', fila['proveedor__sector_economico'])
+    invalidar_cache('tamano', fila['proveedor__tamano_empresa'])
+    invalidar_cache('proyecto', fila['proyecto_id'])
+
+
+def cargar_matriz(cohorte, valor):
+    """
+    Carga los diagnósticos de una cohorte como matriz participaciones × áreas.
+
+    Returns:
+        DataFrame indexado por participación con las columnas de ``AREAS``
+        (NaN donde el área no fue evaluada) y los datos del proveedor
+    """
+    ruta = COHORTES[cohorte]
+    filas = DiagnosticoCompetitividad.objects.filter(**{ruta: valor}).values_list(
+        'etapa1__proveedor_proyecto_id',
+        'etapa1__proveedor_proyecto__proveedor_id',
+        'etapa1__proveedor_proyecto__proveedor__razon_social',
+        'area_evaluada',
+        'nivel_madurez',
+    )
+    datos = pd.DataFrame.from_records(
+        list(filas),
+        columns=['participacion', 'proveedor', 'razon_social', 'area', 'nivel'],
+    )
+    if datos.empty:
+        return pd.DataFrame(columns=['proveedor', 'razon_social'] + AREAS)
+
+    matriz = datos.pivot_table(
+        index='participacion', columns='area', values='nivel', aggfunc='mean'
+    ).reindex(columns=AREAS).astype(float)
+    info = datos.drop_duplicates('participacion').set_index('participacion')[['proveedor', 'razon_social']]
+    return info.join(matriz)
+
+
+def calcular_estadisticas(matriz):
+    """
+    Estadísticas vectorizadas de una cohorte.
+
+    Returns:
+        Tupla (estadísticas por área, percentiles, z-scores, brechas), las
+        tres últimas con la misma forma que la matriz de niveles
+    """
+    niveles = matriz[AREAS]
+    media = niveles.mean()
+    desviacion = niveles.std(ddof=0)
+    mejor = niveles.max()
+
+    estadisticas = pd.DataFrame({
+        'n': niveles.count(),
+        'media': media,
+        'desviacion': desviacion,
+        'p25': niveles.quantile(0.25),
+        'p50': niveles.quantile(0.50),
+        'p75': niveles.quantile(0.75),
+        'mejor': mejor,
+    })
+
+    percentiles = niveles.rank(pct=True, method='max') * 100
+    zscores = (niveles - media) / desviacion.replace(0, np.nan)
+    zscores = zscores.where(niveles.isna(), zscores.fillna(0))
+    brechas = mejor - niveles
+    return estadisticas, percentiles, zscores, brechas
+
+
+def _redondear(valor):
+    return None if pd.isna(valor) else round(float(valor), 2)
+
+
+def _a_dict(serie):
+    """Serie a diccionario JSON-serializable (NaN -> None)."""
+    return {clave: _redondear(valor) for clave, valor in serie.items()}
+
+
+def benchmark_cohorte(cohorte, valor):
+    """
+    Benchmark completo de una cohorte (cacheado).
+
+    Args:
+        cohorte: 'sector', 'tamano' o 'proyecto'
+        valor: Valor de la cohorte (código de sector/tamaño o ID de proyecto)
+
+    Returns:
+        Diccionario con estadísticas por área y la posición de cada participación
+    """
+    if cohorte not in COHORTES:
+        raise ValueError(f"Cohorte no válida: {cohorte}")
+
+    clave = f'benchmarking:{version_actual(cohorte, valor)}:{cohorte}:{valor}'
+    resultado = cache.get(clave)
+    if resultado is not None:
+        return resultado
+
+    matriz = cargar_matriz(cohorte, valor)
+    resultado = {
+        'cohorte': cohorte,
+        'valor': str(valor),
+        'total': len(matriz),
+        'estadisticas': {},
+        'participaciones': {},
+    }
+
+    if not matriz.empty:
+        estadisticas, percentiles, zscores, brechas = calcular_estadisticas(matriz)
+        promedio = matriz[AREAS].mean(axis=1)
+
+        resultado['estadisticas'] = {
+            area: _a_dict(fila) for area, fila in estadisticas.iterrows()
+        }
+        resultado['participaciones'] = {
+            str(participacion): {
+                'proveedor': str(matriz.at[participacion, 'proveedor']),
+                'razon_social': matriz.at[participacion, 'razon_social'],
+                'promedio': _redondear(promedio[participacion]),
+                'niveles': _a_dict(matriz.loc[participacion, AREAS]),
+                'percentiles': _a_dict(percentiles.loc[participacion]),
+                'zscores': _a_dict(zscores.loc[participacion]),
+                'brechas': _a_dict(brechas.loc[participacion]),
+            }
+            for participacion in matriz.index
+        }
+
+    cache.set(clave, resultado, TIEMPO_CACHE)
+    logger.info(f"Benchmark calculado: {cohorte}={valor} ({resultado['total']} participaciones)")
+    return resultado
+
+
+def valor_cohorte(proveedor_proyecto, cohorte):
+    """Valor de la cohorte a la que pertenece una participación."""
+    if cohorte == 'sector':
+        return proveedor_proyecto.proveedor.sector_economico
+    if cohorte == 'tamano':
+        return proveedor_proyecto.proveedor.tamano_empresa
+    if cohorte == 'proyecto':
+        return proveedor_proyecto.proyecto_id
+    raise ValueError(f"Cohorte no válida: {cohorte}")
+
+
+def benchmark_participacion(proveedor_proyecto, cohorte):
+    """
+    Posición de una participación dentro de su cohorte.
+
+    Returns:
+        Diccionario con las estadísticas de la cohorte y la posición de la
+        participación (None si aún no tiene diagnósticos)
+    """
+    resultado = benchmark_cohorte(cohorte, valor_cohorte(proveedor_proyecto, cohorte))
+    return {
+        'cohorte': resultado['cohorte'],
+        'valor': resultado['valor'],
+        'total': resultado['total'],
+        'estadisticas': resultado['estadisticas'],
+        'posicion': resultado['participaciones'].get(str(proveedor_proyecto.pk)),
+    }
@@ -0,0 +1,280 @@
+"""
+Burn-down y pronóstico del presupuesto de horas por proyecto.
+
+Las horas de acompañamiento se acumulan en ``ConsumoHorasDiario`` (una fila
+por participación y día) a medida que se guardan o eliminan sesiones, de modo
+que el pronóstico no recorre ``SesionAcompanamiento``. Los consumos del
+proyecto se cargan en una consulta, se pivotean a una matriz días ×
+participaciones y el ritmo diario se estima de forma vectorizada para todas
+las columnas a la vez: pendiente de mínimos cuadrados del acumulado reciente
+(lineal) y media móvil exponencial del consumo diario (EWMA). El resultado se
+cachea por proyecto y día, y se invalida al registrar un consumo.
+"""
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.consultas import iterar
+from apps.proyectos.models import Proyecto, ProveedorProyecto
+from .models import ConsumoHorasDiario
+
+logger = logging.getLogger(__name__)
+
+VENTANA_LINEAL = 28
+SPAN_EWMA = 14
+HORIZONTE_MAXIMO = 3650
+TIEMPO_CACHE = 60 * 60 * 6
+TOTAL = 'total'
+
+
+def _clave(proyecto_id, dia=None):
+    return f'burndown:{proyecto_id}:{dia or timezone.localdate()}'
+
+
+def registrar_consumo(proveedor_proyecto_id, proyecto_id, fecha, delta):
+    """
+    Suma ``delta`` horas al consumo del día de la participación.
+
+    Un ``delta`` negativo solo descuenta de un día ya registrado; nunca crea
+    la fila (p. ej. para una participación que se está eliminando).
+
+    Args:
+        fecha: Fecha/hora de la sesión (se toma el día local)
+    """
+    delta = Decimal(str(delta))
+    if not delta:
+        return
+    dia = timezone.localdate(fecha) if hasattr(fecha, 'hour') else fecha
+    consumos = ConsumoHorasDiario.objects.filter(proveedor_proyecto_id=proveedor_proyecto_id, fecha=dia)
+
+    with transaction.atomic():
+        if not consumos.update(horas=F('horas') + delta) and delta > 0:
+            try:
+                with transaction.atomic():
+                    ConsumoHorasDiario.objects.create(
+                        proveedor_proyecto_id=proveedor_proyecto_id,
+                        proyecto_id=proyecto_id,
+                        fecha=dia,
+                        horas=delta,
+                    )
+            except IntegrityError:
+                # Otra transacción creó el día en paralelo
+                consumos.update(horas=F('horas') + delta)
+
+    cache.delete(_clave(proyecto_id))
+
+
+def horas_presupuestadas(proyecto):
+    """``horas_por_proveedor`` × participaciones no retiradas."""
+    participaciones = proyecto.proveedores.exclude(
+        estado=ProveedorProyecto.EstadoParticipacion.RETIRADO
+    ).count()
+    return float(proyecto.horas_por_proveedor * participaciones)
+
+
+def cargar_matriz(proyecto, hasta=None):
+    """
+    Consumo diario del proyecto como matriz días × participaciones.
+
+    Returns:
+        DataFrame indexado por fecha (días consecutivos hasta ``hasta``) con
+        una columna por participación y la columna ``total``
+    """
+    hasta = hasta or timezone.localdate()
+    filas = ConsumoHorasDiario.objects.filter(proyecto=proyecto).values_list(
+        'proveedor_proyecto_id', 'fecha', 'horas'
+    )
+    datos = pd.DataFrame.from_records(list(filas), columns=['participacion', 'fecha', 'horas'])
+    inicio = proyecto.fecha_inicio
+    if not datos.empty:
+        inicio = min(inicio, datos['fecha'].min())
+    dias = pd.date_range(inicio, max(hasta, inicio), freq='D').date
+
+    if datos.empty:
+        return pd.DataFrame({TOTAL: 0.0}, index=dias)
+
+    datos['horas'] = datos['horas'].astype(float)
+    datos['participacion'] = datos['participacion'].astype(str)
+    matriz = datos.pivot_table(
+        index='fecha', columns='participacion', values='horas', aggfunc='sum'
+    ).reindex(dias, fill_value=0).fillna(0)
+    matriz[TOTAL] = matriz.sum(axis=1)
+    return matriz
+
+
+def estimar_ritmo(diario):
+    """
+    Ritmo diario estimado por columna.
+
+    Returns:
+        Tupla (lineal, ewma) de Series con horas/día por columna
+    """
+    acumulado = diario.cumsum().tail(VENTANA_LINEAL).to_numpy()
+    n = len(acumulado)
+    if n < 2:
+        lineal = pd.Series(0.0, index=diario.columns)
+    else:
+        x = np.arange(n, dtype=float)
+        x -= x.mean()
+        pendiente = (x[:, None] * (acumulado - acumulado.mean(axis=0))).sum(axis=0) / (x ** 2).sum()
+        lineal = pd.Series(pendiente, index=diario.columns)
+    ewma = diario.ewm(span=SPAN_EWMA, adjust=False).mean().iloc[-1]
+    return lineal.clip(lower=0), ewma.clip(lower=0)
+
+
+def proyectar(consumido, presupuesto, ritmo, hoy, fecha_fin):
+    """
+    Fecha de agotamiento y consumo proyectado al cierre (vectorizado).
+
+    Args:
+        consumido, presupuesto, ritmo: Series alineadas por columna
+
+    Returns:
+        DataFrame con ritmo_diario, dias_para_agotar, fecha_agotamiento,
+        proyectado_fin y en_riesgo por columna
+    """
+    restante = (presupuesto - consumido).clip(lower=0)
+    dias = restante / ritmo.replace(0, np.nan)
+    dias = dias.where(dias <= HORIZONTE_MAXIMO)
+    dias_al_fin = max((fecha_fin - hoy).days, 0)
+    proyectado = consumido + ritmo * dias_al_fin
+
+    resultado = pd.DataFrame({
+        'ritmo_diario': ritmo.round(2),
+        'dias_para_agotar': np.ceil(dias),
+        'proyectado_fin': proyectado.round(2),
+    })
+    resultado['fecha_agotamiento'] = [
+        None if pd.isna(d) else (hoy + timedelta(days=int(d))).isoformat()
+        for d in resultado['dias_para_agotar']
+    ]
+    resultado['en_riesgo'] = (proyectado > presupuesto) & (presupuesto > 0)
+    # Ya agotado antes del cierre
+    resultado.loc[(consumido >= presupuesto) & (presupuesto > 0), 'en_riesgo'] = True
+    return resultado
+
+
+def _limpiar(valor):
+    if isinstance(valor, (float, np.floating)):
+        return None if np.isnan(valor) else round(float(valor), 2)
+    if isinstance(valor, np.bool_):
+        return bool(valor)
+    return valor
+
+
+def calcular_burndown(proyecto, incluir_serie=True):
+    """Burn-down y pronóstico del proyecto y de cada participación (sin caché)."""
+    hoy = timezone.localdate()
+    diario = cargar_matriz(proyecto, hoy)
+    consumido = diario.sum()
+    lineal, ewma = estimar_ritmo(diario)
+
+    participaciones = {
+        str(pk): (razon_social, float(horas_planeadas))
+        for pk, razon_social, horas_planeadas in proyecto.proveedores.exclude(
+            estado=ProveedorProyecto.EstadoParticipacion.RETIRADO
+        ).values_list('id', 'proveedor__razon_social', 'horas_planeadas')
+    }
+    presupuesto = pd.Series(
+        {columna: participaciones.get(columna, (None, 0.0))[1] for columna in diario.columns}
+    )
+    presupuesto[TOTAL] = horas_presupuestadas(proyecto)
+
+    modelos = {
+        'lineal': proyectar(consumido, presupuesto, lineal, hoy, proyecto.fecha_fin_planeada),
+        'ewma': proyectar(consumido, presupuesto, ewma, hoy, proyecto.fecha_fin_planeada),
+    }
+
+    costo_hora = None
+    if proyecto.presupuesto and presupuesto[TOTAL]:
+        costo_hora = float(proyecto.presupuesto) / presupuesto[TOTAL]
+
+    def resumen(columna):
+        return {
+            nombre: {clave: _limpiar(valor) for clave, valor in modelo.loc[columna].items()}
+            for nombre, modelo in modelos.items()
+        }
+
+    resultado = {
+        'proyecto': str(proyecto.pk),
+        'fecha': hoy.isoformat(),
+        'fecha_fin_planeada': proyecto.fecha_fin_planeada.isoformat(),
+        'horas_presupuestadas': _limpiar(presupuesto[TOTAL]),
+        'horas_consumidas': _limpiar(consumido[TOTAL]),
+        'porcentaje_consumido': _limpiar(
+            consumido[TOTAL] / presupuesto[TOTAL] * 100 if presupuesto[TOTAL] else np.nan
+        ),
+        'costo_hora': _limpiar(costo_hora) if costo_hora else None,
+        'presupuesto_proyectado_fin': _limpiar(
+            modelos['ewma'].at[TOTAL, 'proyectado_fin'] * costo_hora
+        ) if costo_hora else None,
+        'pronostico': resumen(TOTAL),
+        'en_riesgo': bool(modelos['lineal'].at[TOTAL, 'en_riesgo'] or modelos['ewma'].at[TOTAL, 'en_riesgo']),
+        'proveedores': [
+            {
+                'participacion': columna,
+                'proveedor': participaciones[columna][0],
+                'horas_presupuestadas': _limpiar(presupuesto[columna]),
+                'horas_consumidas': _limpiar(consumido[columna]),
+                'pronostico': resumen(columna),
+            }
+            for columna in diario.columns if columna in participaciones
+        ],
+    }
+    if incluir_serie:
+        resultado['serie'] = [
+            {'fecha': fecha.isoformat(), 'horas': round(float(horas), 2), 'acumulado': round(float(acum), 2)}
+            for fecha, horas, acum in zip(diario.index, diario[TOTAL], diario[TOTAL].cumsum())
+        ]
+    return resultado
+
+
+def burndown_proyecto(proyecto):
+    """Burn-down del proyecto (cacheado por día; se invalida al registrar consumos)."""
+    clave = _clave(proyecto.pk)
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = calcular_burndown(proyecto)
+        cache.set(clave, resultado, TIEMPO_CACHE)
+    return resultado
+
+
+def reconstruir_consumos(proyectos=None):
+    """
+    Reconstruye los consumos diarios desde las sesiones (reparación).
+
+    Returns:
+        Número de filas de consumo generadas
+    """
+    from apps.etapas.models import SesionAcompanamiento
+
+    proyectos = proyectos if proyectos is not None else Proyecto.objects.all()
+    sesiones = SesionAcompanamiento.objects.filter(
+        etapa3__proveedor_proyecto__proyecto__in=proyectos
+    ).values_list(
+        'etapa3__proveedor_proyecto_id', 'etapa3__proveedor_proyecto__proyecto_id', 'fecha', 'duracion_horas'
+    )
+
+    consumos = {}
+    for pp_id, proyecto_id, fecha, horas in iterar(sesiones):
+        clave = (pp_id, timezone.localdate(fecha))
+        if clave not in consumos:
+            consumos[clave] = ConsumoHorasDiario(
+                proveedor_proyecto_id=pp_id, proyecto_id=proyecto_id, fecha=clave[1], horas=0
+            )
+        consumos[clave].horas += horas
+
+    with transaction.atomic():
+        ConsumoHorasDiario.objects.filter(proyecto__in=proyectos).delete()
+        ConsumoHorasDiario.objects.bulk_create(consumos.values(), batch_size=1000)
+
+    for proyecto_id in proyectos.values_list('id', flat=True):
+        cache.delete(_clave(proyecto_id))
+    return len(consumos)
@@ -0,0 +1,236 @@
+"""
+Analítica de impacto antes/después sobre ``IndicadorKPI`` y ``ObjetivoFortalecimiento``.
+
+Todos los indicadores del alcance se leen en una sola consulta ``values()`` y
+las métricas (mejora, avance hacia la meta, cumplimiento) se calculan de forma
+vectorizada con pandas, de modo que miles de indicadores se procesan en
+segundos. El conjunto agregado puede exportarse a CSV o Excel.
+"""
+import logging
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from apps.proyectos.models import ProveedorProyecto
+from apps.etapas.models import IndicadorKPI
+
+logger = logging.getLogger(__name__)
+
+CAMPOS = {
+    'id': 'indicador',
+    'nombre': 'nombre',
+    'unidad_medida': 'unidad_medida',
+    'valor_inicial': 'valor_inicial',
+    'valor_actual': 'valor_actual',
+    'valor_meta': 'valor_meta',
+    'objetivo_id': 'objetivo',
+    'objetivo__objetivo': 'objetivo_texto',
+    'etapa4__proveedor_proyecto_id': 'participacion',
+    'etapa4__proveedor_proyecto__estado': 'estado_participacion',
+    'etapa4__proveedor_proyecto__fecha_fin_real': 'fecha_cierre',
+    'etapa4__proveedor_proyecto__proveedor__nit': 'nit_proveedor',
+    'etapa4__proveedor_proyecto__proveedor__razon_social': 'proveedor',
+    'etapa4__proveedor_proyecto__proveedor__sector_economico': 'sector',
+    'etapa4__proveedor_proyecto__proveedor__tamano_empresa': 'tamano',
+    'etapa4__proveedor_proyecto__proyecto__codigo': 'proyecto',
+    'etapa4__proveedor_proyecto__proyecto__empresa_ancla__nombre': 'empresa_ancla',
+}
+
+AGRUPACIONES = {
+    'proyecto': 'proyecto',
+    'empresa': 'empresa_ancla',
+    'sector': 'sector',
+    'tamano': 'tamano',
+}
+
+RANGOS_AVANCE = [-np.inf, 0, 50, 100, np.inf]
+ETIQUETAS_AVANCE = ['Retroceso', '0-50%', '50-100%', 'Meta alcanzada']
+
+
+def cargar_indicadores(solo_cerradas=True, proyecto=None, empresa_ancla=None, anio=None):
+    """
+    Carga los indicadores del alcance como DataFrame con métricas de impacto.
+
+    Args:
+        solo_cerradas: Solo participaciones completadas
+        proyecto: Filtrar por proyecto (instancia o ID)
+        empresa_ancla: Filtrar por empresa ancla (instancia o ID)
+        anio: Año de cierre de la participación
+
+    Returns:
+        DataFrame con una fila por indicador
+    """
+    queryset = IndicadorKPI.objects.all()
+    if solo_cerradas:
+        queryset = queryset.filter(
+            etapa4__proveedor_proyecto__estado=ProveedorProyecto.EstadoParticipacion.COMPLETADO
+        )
+    if proyecto:
+        queryset = queryset.filter(etapa4__proveedor_proyecto__proyecto=proyecto)
+    if empresa_ancla:
+        queryset = queryset.filter(etapa4__proveedor_proyecto__proyecto__empresa_ancla=empresa_ancla)
+    if anio:
+        queryset = queryset.filter(etapa4__proveedor_proyecto__fecha_fin_real__year=anio)
+
+    datos = pd.DataFrame.from_records(
+        list(queryset.order_by().values_list(*CAMPOS)), columns=list(CAMPOS.values())
+    )
+    return calcular_metricas(datos)
+
+
+def calcular_metricas(datos):
+    """
+    Agrega al DataFrame las columnas de impacto (vectorizado).
+
+    - ``mejora``: valor_actual - valor_inicial
+    - ``mejora_pct``: mejora relativa al valor inicial
+    - ``avance_meta``: % del recorrido entre valor inicial y meta
+    - ``cumplimiento``: mismo criterio que ``IndicadorKPI.porcentaje_cumplimiento``
+    - ``cumple_meta``: la meta se alcanzó en la dirección esperada
+    """
+    for campo in ('valor_inicial', 'valor_actual', 'valor_meta'):
+        datos[campo] = pd.to_numeric(datos[campo], errors='coerce').astype(float)
+
+    inicial, actual, meta = datos['valor_inicial'], datos['valor_actual'], datos['valor_meta']
+    recorrido = (meta - inicial).replace(0, np.nan)
+
+    datos['mejora'] = actual - inicial
+    datos['mejora_pct'] = datos['mejora'] / inicial.abs().replace(0, np.nan) * 100
+    datos['avance_meta'] = (actual - inicial) / recorrido * 100
+    datos['cumplimiento'] = (actual / meta.replace(0, np.nan) * 100).clip(upper=100).fillna(0)
+    datos['cumple_meta'] = np.where(meta >= inicial, actual >= meta, actual <= meta)
+    datos['rango_avance'] = pd.cut(
+        datos['avance_meta'], bins=RANGOS_AVANCE, labels=ETIQUETAS_AVANCE, right=False
+    )
+    return datos
+
+
+def _redondear(valor):
+    return None if pd.isna(valor) else round(float(valor), 2)
+
+
+def resumen_programa(datos):
+    """
+    Métricas de impacto a nivel de programa.
+
+    Returns:
+        Diccionario con totales, % de indicadores en meta, distribución del
+        avance hacia la meta y logro de objetivos
+    """
+    if datos.empty:
+        return {
+            'indicadores': 0, 'participaciones': 0, 'porcentaje_en_meta': None,
+            'cumplimiento_promedio': None, 'avance_meta': {}, 'distribucion': {},
+            'objetivos': 0, 'porcentaje_objetivos_logrados': None,
+        }
+
+    avance = datos['avance_meta']
+    # Un objetivo se considera logrado si todos sus KPIs asociados están en meta
+    objetivos = datos.dropna(subset=['objetivo']).groupby('objetivo')['cumple_meta'].all()
+
+    return {
+        'indicadores': int(len(datos)),
+        'participaciones': int(datos['participacion'].nunique()),
+        'porcentaje_en_meta': _redondear(datos['cumple_meta'].mean() * 100),
+        'cumplimiento_promedio': _redondear(datos['cumplimiento'].mean()),
+        'avance_meta': {
+            'media': _redondear(avance.mean()),
+            'p25': _redondear(avance.quantile(0.25)),
+            'mediana': _redondear(avance.median()),
+            'p75': _redondear(avance.quantile(0.75)),
+        },
+        'distribucion': {
+            str(rango): int(total)
+            for rango, total in datos['rango_avance'].value_counts(sort=False).items()
+        },
+        'objetivos': int(len(objetivos)),
+        'porcentaje_objetivos_logrados': _redondear(objetivos.mean() * 100) if len(objetivos) else None,
+    }
+
+
+def resumen_por(datos, agrupacion):
+    """
+    Impacto agregado por proyecto, empresa, sector o tamaño.
+
+    Returns:
+        DataFrame con una fila por grupo
+    """
+    columna = AGRUPACIONES[agrupacion]
+    if datos.empty:
+        return pd.DataFrame()
+
+    return datos.groupby(columna, observed=True).agg(
+        participaciones=('participacion', 'nunique'),
+        indicadores=('indicador', 'count'),
+        en_meta=('cumple_meta', 'sum'),
+        porcentaje_en_meta=('cumple_meta', 'mean'),
+        cumplimiento_promedio=('cumplimiento', 'mean'),
+        avance_meta_promedio=('avance_meta', 'mean'),
+        avance_meta_mediana=('avance_meta', 'median'),
+        mejora_pct_promedio=('mejora_pct', 'mean'),
+    ).assign(
+        porcentaje_en_meta=lambda df: df['porcentaje_en_meta'] * 100
+    ).round(2).reset_index()
+
+
+def exportar(datos, formato='csv', agrupacion='proyecto'):
+    """
+    Exporta el conjunto de indicadores y su agregado.
+
+    Args:
+        datos: DataFrame de ``cargar_indicadores``
+        formato: 'csv' (solo el detalle) o 'xlsx' (detalle, agregado y resumen)
+        agrupacion: Agrupación para la hoja de agregado
+
+    Returns:
+        Bytes del archivo generado
+    """
+    detalle = datos.drop(columns=['objetivo'], errors='ignore').round(2)
+    salida = BytesIO()
+
+    if formato == 'csv':
+        salida.write(detalle.to_csv(index=False).encode('utf-8-sig'))
+        return salida.getvalue()
+
+    if formato != 'xlsx':
+        raise ValueError(f"Formato no soportado: {formato}")
+
+    resumen = resumen_programa(datos)
+    filas_resumen = [
+        (clave, valor) for clave, valor in resumen.items() if not isinstance(valor, dict)
+    ] + [
+        (f'avance_meta_{clave}', valor) for clave, valor in resumen['avance_meta'].items()
+    ] + [
+        (f'distribucion_{clave}', valor) for clave, valor in resumen['distribucion'].items()
+    ]
+
+    with pd.ExcelWriter(salida, engine='openpyxl') as writer:
+        pd.DataFrame(filas_resumen, columns=['metrica', 'valor']).to_excel(
+            writer, index=False, sheet_name='Resumen'
+        )
+        resumen_por(datos, agrupacion).to_excel(writer, index=False, sheet_name='Agregado')
+        detalle.astype({'rango_avance': str, 'fecha_cierre': str}).to_excel(
+            writer, index=False, sheet_name='Indicadores'
+        )
+    return salida.getvalue()
+
+
+def resultados_kpis(etapa4):
+    """
+    Resultados de KPIs de una etapa 4 para ``InformeCierre.resultados_kpis``.
+
+    Returns:
+        Diccionario {nombre del indicador: {inicial, final, meta, cumplimiento}}
+    """
+    resultados = {}
+    for nombre, inicial, final, meta in etapa4.indicadores.values_list(
+        'nombre', 'valor_inicial', 'valor_actual', 'valor_meta'
+    ):
+        resultados[nombre] = {
+            'inicial': float(inicial),
+            'final': float(final),
+            'meta': float(meta),
+            'cumplimiento': round(min(float(final) / float(meta) * 100, 100), 2) if meta else 0,
+        }
+    return resultados
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reportes import impacto
+
+
+class Command(BaseCommand):
+    help = 'Exporta el análisis de impacto de indicadores (p. ej. informe anual ANDI).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('salida', help='Ruta del archivo a generar (.csv o .xlsx)')
+        parser.add_argument('--anio', type=int, help='Año de cierre de las participaciones')
+        parser.add_argument('--proyecto', help='ID del proyecto')
+        parser.add_argument('--empresa', help='ID de la empresa ancla')
+        parser.add_argument('--agrupacion', default='proyecto', choices=list(impacto.AGRUPACIONES))
+        parser.add_argument('--todas', action='store_true', help='Incluir participaciones no cerradas')
+
+    def handle(self, *args, **options):
+        salida = Path(options['salida'])
+        formato = salida.suffix.lstrip('.').lower()
+        if formato not in ('csv', 'xlsx'):
+            raise CommandError('La salida debe tener extensión .csv o .xlsx')
+
+        datos = impacto.cargar_indicadores(
+            solo_cerradas=not options['todas'],
+            proyecto=options['proyecto'],
+            empresa_ancla=options['empresa'],
+            anio=options['anio'],
+        )
+        salida.write_bytes(impacto.exportar(datos, formato=formato, agrupacion=options['agrupacion']))
+
+        resumen = impacto.resumen_programa(datos)
+        self.stdout.write(
+            f"Indicadores: {resumen['indicadores']} | "
+            f"Participaciones: {resumen['participaciones']} | "
+            f"En meta: {resumen['porcentaje_en_meta']}%"
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archivo generado: {salida}'))
@@ -0,0 +1,471 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("proyectos", "0001_initial"),
+        ("proveedores", "0001_initial"),
+        ("empresas", "0001_initial"),
+        ("reportes", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumenProyecto",
+            fields=[
+                (
+                    "duracion_etapa1",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 1 (días)"
+                    ),
+                ),
+                (
+                    "duracion_etapa2",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 2 (días)"
+                    ),
+                ),
+                (
+                    "duracion_etapa3",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 3 (días)"
+                    ),
+                ),
+                (
+                    "duracion_etapa4",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 4 (días)"
+                    ),
+                ),
+                (
+                    "madurez_promedio",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=4,
+                        null=True,
+                        verbose_name="Madurez promedio",
+                    ),
+                ),
+                (
+                    "madurez_por_area",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Madurez por área"
+                    ),
+                ),
+                (
+                    "tareas_total",
+                    models.PositiveIntegerField(default=0, verbose_name="Tareas"),
+                ),
+                (
+                    "tareas_completadas",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Tareas completadas"
+                    ),
+                ),
+                (
+                    "tasa_completitud",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=5,
+                        verbose_name="Tasa de completitud (%)",
+                    ),
+                ),
+                (
+                    "kpis_total",
+                    models.PositiveIntegerField(default=0, verbose_name="KPIs"),
+                ),
+                (
+                    "cumplimiento_kpis",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=5,
+                        null=True,
+                        verbose_name="Cumplimiento KPIs (%)",
+                    ),
+                ),
+                (
+                    "horas_consumidas",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=10,
+                        verbose_name="Horas consumidas",
+                    ),
+                ),
+                (
+                    "horas_planeadas",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=10,
+                        verbose_name="Horas planeadas",
+                    ),
+                ),
+                ("actualizado", models.DateTimeField(verbose_name="Actualizado")),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "total_proveedores",
+                    models.PositiveIntegerField(default=0, verbose_name="Proveedores"),
+                ),
+                (
+                    "proveedores_completados",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Proveedores completados"
+                    ),
+                ),
+                (
+                    "distribucion_etapas",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Distribución por etapas"
+                    ),
+                ),
+                (
+                    "empresa_ancla",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_proyecto",
+                        to="empresas.empresaancla",
+                        verbose_name="Empresa ancla",
+                    ),
+                ),
+                (
+                    "proyecto",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumen_analitico",
+                        to="proyectos.proyecto",
+                        verbose_name="Proyecto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen de Proyecto",
+                "verbose_name_plural": "Resúmenes de Proyectos",
+                "ordering": ["proyecto"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ResumenEmpresa",
+            fields=[
+                (
+                    "duracion_etapa1",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 1 (días)"
+                    ),
+                ),
+                (
+                    "duracion_etapa2",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 2 (días)"
+                    ),
+                ),
+                (
+                    "duracion_etapa3",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 3 (días)"
+                    ),
+                ),
+                (
+                    "duracion_etapa4",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 4 (días)"
+                    ),
+                ),
+                (
+                    "madurez_promedio",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=4,
+                        null=True,
+                        verbose_name="Madurez promedio",
+                    ),
+                ),
+                (
+                    "madurez_por_area",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Madurez por área"
+                    ),
+                ),
+                (
+                    "tareas_total",
+                    models.PositiveIntegerField(default=0, verbose_name="Tareas"),
+                ),
+                (
+                    "tareas_completadas",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Tareas completadas"
+                    ),
+                ),
+                (
+                    "tasa_completitud",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=5,
+                        verbose_name="Tasa de completitud (%)",
+                    ),
+                ),
+                (
+                    "kpis_total",
+                    models.PositiveIntegerField(default=0, verbose_name="KPIs"),
+                ),
+                (
+                    "cumplimiento_kpis",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=5,
+                        null=True,
+                        verbose_name="Cumplimiento KPIs (%)",
+                    ),
+                ),
+                (
+                    "horas_consumidas",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=10,
+                        verbose_name="Horas consumidas",
+                    ),
+                ),
+                (
+                    "horas_planeadas",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=10,
+                        verbose_name="Horas planeadas",
+                    ),
+                ),
+                ("actualizado", models.DateTimeField(verbose_name="Actualizado")),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "proyectos_activos",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Proyectos activos"
+                    ),
+                ),
+                (
+                    "proyectos_finalizados",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Proyectos finalizados"
+                    ),
+                ),
+                (
+                    "total_proveedores",
+                    models.PositiveIntegerField(default=0, verbose_name="Proveedores"),
+                ),
+                (
+                    "proveedores_completados",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Proveedores completados"
+                    ),
+                ),
+                (
+                    "distribucion_etapas",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Distribución por etapas"
+                    ),
+                ),
+                (
+                    "empresa_ancla",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumen_analitico",
+                        to="empresas.empresaancla",
+                        verbose_name="Empresa ancla",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen de Empresa Ancla",
+                "verbose_name_plural": "Resúmenes de Empresas Ancla",
+                "ordering": ["empresa_ancla"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ResumenParticipacion",
+            fields=[
+                (
+                    "duracion_etapa1",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 1 (días)"
+                    ),
+                ),
+                (
+                    "duracion_etapa2",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 2 (días)"
+                    ),
+                ),
+                (
+                    "duracion_etapa3",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 3 (días)"
+                    ),
+                ),
+                (
+                    "duracion_etapa4",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Duración etapa 4 (días)"
+                    ),
+                ),
+                (
+                    "madurez_promedio",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=4,
+                        null=True,
+                        verbose_name="Madurez promedio",
+                    ),
+                ),
+                (
+                    "madurez_por_area",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Madurez por área"
+                    ),
+                ),
+                (
+                    "tareas_total",
+                    models.PositiveIntegerField(default=0, verbose_name="Tareas"),
+                ),
+                (
+                    "tareas_completadas",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Tareas completadas"
+                    ),
+                ),
+                (
+                    "tasa_completitud",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=5,
+                        verbose_name="Tasa de completitud (%)",
+                    ),
+                ),
+                (
+                    "kpis_total",
+                    models.PositiveIntegerField(default=0, verbose_name="KPIs"),
+                ),
+                (
+                    "cumplimiento_kpis",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=5,
+                        null=True,
+                        verbose_name="Cumplimiento KPIs (%)",
+                    ),
+                ),
+                (
+                    "horas_consumidas",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=10,
+                        verbose_name="Horas consumidas",
+                    ),
+                ),
+                (
+                    "horas_planeadas",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=10,
+                        verbose_name="Horas planeadas",
+                    ),
+                ),
+                ("actualizado", models.DateTimeField(verbose_name="Actualizado")),
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "etapa_actual",
+                    models.PositiveSmallIntegerField(
+                        default=1, verbose_name="Etapa actual"
+                    ),
+                ),
+                ("estado", models.CharField(max_length=15, verbose_name="Estado")),
+                (
+                    "empresa_ancla",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_participacion",
+                        to="empresas.empresaancla",
+                        verbose_name="Empresa ancla",
+                    ),
+                ),
+                (
+                    "proveedor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_participacion",
+                        to="proveedores.proveedor",
+                        verbose_name="Proveedor",
+                    ),
+                ),
+                (
+                    "proveedor_proyecto",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumen_analitico",
+                        to="proyectos.proveedorproyecto",
+                        verbose_name="Participación",
+                    ),
+                ),
+                (
+                    "proyecto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_participacion",
+                        to="proyectos.proyecto",
+                        verbose_name="Proyecto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Resumen de Participación",
+                "verbose_name_plural": "Resúmenes de Participaciones",
+                "ordering": ["proyecto", "proveedor"],
+                "indexes": [
+                    models.Index(
+                        fields=["empresa_ancla", "estado"],
+                        name="reportes_re_empresa_7845ca_idx",
+                    )
+                ],
+            },
+        ),
+    ]
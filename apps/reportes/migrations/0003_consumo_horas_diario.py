@@ -0,0 +1,85 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:37
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def cargar_consumos(apps, schema_editor):
+    """Construye los consumos diarios a partir de las sesiones existentes."""
+    SesionAcompanamiento = apps.get_model('etapas', 'SesionAcompanamiento')
+    ConsumoHorasDiario = apps.get_model('reportes', 'ConsumoHorasDiario')
+
+    consumos = defaultdict(int)
+    proyectos = {}
+    for pp_id, proyecto_id, fecha, horas in SesionAcompanamiento.objects.values_list(
+        'etapa3__proveedor_proyecto_id', 'etapa3__proveedor_proyecto__proyecto_id',
+        'fecha', 'duracion_horas'
+    ).iterator():
+        clave = (pp_id, timezone.localdate(fecha))
+        consumos[clave] += horas
+        proyectos[pp_id] = proyecto_id
+
+    ConsumoHorasDiario.objects.bulk_create([
+        ConsumoHorasDiario(
+            proveedor_proyecto_id=pp_id, proyecto_id=proyectos[pp_id], fecha=fecha, horas=horas
+        )
+        for (pp_id, fecha), horas in consumos.items()
+    ], batch_size=1000)
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("proyectos", "0001_initial"),
+        ("etapas", "0004_agenda_sesiones"),
+        ("reportes", "0002_resumenes_analiticos"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConsumoHorasDiario",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("fecha", models.DateField(verbose_name="Fecha")),
+                (
+                    "horas",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=8, verbose_name="Horas"
+                    ),
+                ),
+                (
+                    "proveedor_proyecto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="consumos_diarios",
+                        to="proyectos.proveedorproyecto",
+                        verbose_name="Participación",
+                    ),
+                ),
+                (
+                    "proyecto",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="consumos_diarios",
+                        to="proyectos.proyecto",
+                        verbose_name="Proyecto",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Consumo Diario de Horas",
+                "verbose_name_plural": "Consumos Diarios de Horas",
+                "ordering": ["proyecto", "fecha"],
+                "indexes": [
+                    models.Index(
+                        fields=["proyecto", "fecha"], name="reportes_consumo_proy_idx"
+                    )
+                ],
+                "unique_together": {("proveedor_proyecto", "fecha")},
+            },
+        ),
+        migrations.RunPython(cargar_consumos, migrations.RunPython.noop),
+    ]
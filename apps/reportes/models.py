@@ -80,3 +80,160 @@ class ConfiguracionReporteAutomatico(models.Model):
 
     def __str__(self):
         return f"{self.empresa_ancla} - {self.get_tipo_reporte_display()}"
+
+
+# ============================================================================
+# RESÚMENES ANALÍTICOS (tablas materializadas)
+# ============================================================================
+
+class MetricasResumen(models.Model):
+    """Métricas comunes de los resúmenes analíticos precalculados."""
+
+    # Duración promedio (días) de las etapas finalizadas
+    duracion_etapa1 = models.FloatField('Duración etapa 1 (días)', null=True, blank=True)
+    duracion_etapa2 = models.FloatField('Duración etapa 2 (días)', null=True, blank=True)
+    duracion_etapa3 = models.FloatField('Duración etapa 3 (días)', null=True, blank=True)
+    duracion_etapa4 = models.FloatField('Duración etapa 4 (días)', null=True, blank=True)
+
+    # Diagnóstico de competitividad
+    madurez_promedio = models.DecimalField(
+        'Madurez promedio', max_digits=4, decimal_places=2, null=True, blank=True
+    )
+    madurez_por_area = models.JSONField('Madurez por área', default=dict, blank=True)
+
+    # Tareas de implementación
+    tareas_total = models.PositiveIntegerField('Tareas', default=0)
+    tareas_completadas = models.PositiveIntegerField('Tareas completadas', default=0)
+    tasa_completitud = models.DecimalField(
+        'Tasa de completitud (%)', max_digits=5, decimal_places=2, default=0
+    )
+
+    # Indicadores KPI
+    kpis_total = models.PositiveIntegerField('KPIs', default=0)
+    cumplimiento_kpis = models.DecimalField(
+        'Cumplimiento KPIs (%)', max_digits=5, decimal_places=2, null=True, blank=True
+    )
+
+    # Horas de acompañamiento
+    horas_consumidas = models.DecimalField('Horas consumidas', max_digits=10, decimal_places=2, default=0)
+    horas_planeadas = models.DecimalField('Horas planeadas', max_digits=10, decimal_places=2, default=0)
+
+    actualizado = models.DateTimeField('Actualizado')
+
+    class Meta:
+        abstract = True
+
+    @property
+    def porcentaje_horas(self):
+        if not self.horas_planeadas:
+            return 0
+        return round(self.horas_consumidas / self.horas_planeadas * 100, 2)
+
+
+class ResumenParticipacion(MetricasResumen):
+    """Resumen precalculado de una participación de proveedor en un proyecto."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    proveedor_proyecto = models.OneToOneField(
+        'proyectos.ProveedorProyecto', on_delete=models.CASCADE,
+        related_name='resumen_analitico', verbose_name='Participación'
+    )
+    proyecto = models.ForeignKey(
+        'proyectos.Proyecto', on_delete=models.CASCADE,
+        related_name='resumenes_participacion', verbose_name='Proyecto'
+    )
+    empresa_ancla = models.ForeignKey(
+        EmpresaAncla, on_delete=models.CASCADE,
+        related_name='resumenes_participacion', verbose_name='Empresa ancla'
+    )
+    proveedor = models.ForeignKey(
+        'proveedores.Proveedor', on_delete=models.CASCADE,
+        related_name='resumenes_participacion', verbose_name='Proveedor'
+    )
+    etapa_actual = models.PositiveSmallIntegerField('Etapa actual', default=1)
+    estado = models.CharField('Estado', max_length=15)
+
+    class Meta:
+        verbose_name = 'Resumen de Participación'
+        verbose_name_plural = 'Resúmenes de Participaciones'
+        ordering = ['proyecto', 'proveedor']
+        indexes = [models.Index(fields=['empresa_ancla', 'estado'])]
+
+    def __str__(self):
+        return f"Resumen {self.proveedor_proyecto_id}"
+
+
+class ResumenProyecto(MetricasResumen):
+    """Resumen precalculado de un proyecto."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    proyecto = models.OneToOneField(
+        'proyectos.Proyecto', on_delete=models.CASCADE,
+        related_name='resumen_analitico', verbose_name='Proyecto'
+    )
+    empresa_ancla = models.ForeignKey(
+        EmpresaAncla, on_delete=models.CASCADE,
+        related_name='resumenes_proyecto', verbose_name='Empresa ancla'
+    )
+    total_proveedores = models.PositiveIntegerField('Proveedores', default=0)
+    proveedores_completados = models.PositiveIntegerField('Proveedores completados', default=0)
+    distribucion_etapas = models.JSONField('Distribución por etapas', default=dict, blank=True)
+
+    class Meta:
+        verbose_name = 'Resumen de Proyecto'
+        verbose_name_plural = 'Resúmenes de Proyectos'
+        ordering = ['proyecto']
+
+    def __str__(self):
+        return f"Resumen {self.proyecto_id}"
+
+
+class ResumenEmpresa(MetricasResumen):
+    """Resumen precalculado del portafolio de una empresa ancla."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    empresa_ancla = models.OneToOneField(
+        EmpresaAncla, on_delete=models.CASCADE,
+        related_name='resumen_analitico', verbose_name='Empresa ancla'
+    )
+    proyectos_activos = models.PositiveIntegerField('Proyectos activos', default=0)
+    proyectos_finalizados = models.PositiveIntegerField('Proyectos finalizados', default=0)
+    total_proveedores = models.PositiveIntegerField('Proveedores', default=0)
+    proveedores_completados = models.PositiveIntegerField('Proveedores completados', default=0)
+    distribucion_etapas = models.JSONField('Distribución por etapas', default=dict, blank=True)
+
+    class Meta:
+        verbose_name = 'Resumen de Empresa Ancla'
+        verbose_name_plural = 'Resúmenes de Empresas Ancla'
+        ordering = ['empresa_ancla']
+
+    def __str__(self):
+        return f"Resumen {self.empresa_ancla_id}"
+
+
+class ConsumoHorasDiario(models.Model):
+    """Horas de acompañamiento consumidas por participación y día (burn-down)."""
+
+    id = models.BigAutoField(primary_key=True)
+    proveedor_proyecto = models.ForeignKey(
+        'proyectos.ProveedorProyecto', on_delete=models.CASCADE,
+        related_name='consumos_diarios', verbose_name='Participación'
+    )
+    proyecto = models.ForeignKey(
+        'proyectos.Proyecto', on_delete=models.CASCADE,
+        related_name='consumos_diarios', verbose_name='Proyecto'
+    )
+    fecha = models.DateField('Fecha')
+    horas = models.DecimalField('Horas', max_digits=8, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = 'Consumo Diario de Horas'
+        verbose_name_plural = 'Consumos Diarios de Horas'
+        ordering = ['proyecto', 'fecha']
+        unique_together = ['proveedor_proyecto', 'fecha']
+        indexes = [
+            models.Index(fields=['proyecto', 'fecha'], name='reportes_consumo_proy_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.proveedor_proyecto_id} {self.fecha}: {self.horas}"
@@ -0,0 +1,396 @@
+"""
+Servicios de resúmenes analíticos.
+
+Los tableros ejecutivos leen ``ResumenParticipacion``, ``ResumenProyecto`` y
+``ResumenEmpresa`` en lugar de recorrer las tablas de etapas. Cada métrica se
+calcula con una sola consulta agregada sobre el conjunto de participaciones a
+refrescar y las filas se escriben en lote (upsert).
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+from apps.core import replica
+from apps.proyectos.models import Proyecto, ProveedorProyecto
+from apps.etapas.models import (
+    Etapa1Diagnostico, Etapa2Plan, Etapa3Implementacion, Etapa4Monitoreo,
+    DiagnosticoCompetitividad, TareaImplementacion, IndicadorKPI, MedicionKPI
+)
+from .models import ResumenParticipacion, ResumenProyecto, ResumenEmpresa
+
+logger = logging.getLogger(__name__)
+
+ETAPAS = {1: Etapa1Diagnostico, 2: Etapa2Plan, 3: Etapa3Implementacion, 4: Etapa4Monitoreo}
+
+CAMPOS_METRICAS = [
+    'duracion_etapa1', 'duracion_etapa2', 'duracion_etapa3', 'duracion_etapa4',
+    'madurez_promedio', 'madurez_por_area',
+    'tareas_total', 'tareas_completadas', 'tasa_completitud',
+    'kpis_total', 'cumplimiento_kpis',
+    'horas_consumidas', 'horas_planeadas', 'actualizado',
+]
+
+LOTE = 500
+
+
+def _redondear(valor):
+    """Convierte a Decimal con dos decimales (None se conserva)."""
+    if valor is None:
+        return None
+    return Decimal(str(valor)).quantize(Decimal('0.01'))
+
+
+def _porcentaje(parte, total):
+    return _redondear(Decimal(parte or 0) * 100 / total) if total else Decimal('0')
+
+
+def _cumplimiento(valor_actual, valor_meta):
+    """Mismo criterio que ``IndicadorKPI.porcentaje_cumplimiento``."""
+    if not valor_meta:
+        return Decimal('0')
+    return min(valor_actual / valor_meta * 100, Decimal('100'))
+
+
+def participaciones_modificadas(desde):
+    """
+    Participaciones con cambios (propios, de su proyecto o en sus etapas)
+    desde una fecha.
+
+    Returns:
+        Conjunto de IDs de ProveedorProyecto
+    """
+    ids = set(ProveedorProyecto.objects.filter(
+        Q(updated_at__gte=desde) | Q(proyecto__updated_at__gte=desde)
+    ).values_list('id', flat=True))
+    for modelo in ETAPAS.values():
+        ids.update(
+            modelo.objects.filter(updated_at__gte=desde).values_list('proveedor_proyecto_id', flat=True)
+        )
+    ids.update(
+        DiagnosticoCompetitividad.objects.filter(updated_at__gte=desde)
+        .values_list('etapa1__proveedor_proyecto_id', flat=True)
+    )
+    ids.update(
+        TareaImplementacion.objects.filter(updated_at__gte=desde)
+        .values_list('etapa3__proveedor_proyecto_id', flat=True)
+    )
+    ids.update(
+        IndicadorKPI.objects.filter(updated_at__gte=desde)
+        .values_list('etapa4__proveedor_proyecto_id', flat=True)
+    )
+    # Las mediciones actualizan valor_actual sin tocar updated_at del indicador
+    ids.update(
+        MedicionKPI.objects.filter(created_at__gte=desde)
+        .values_list('indicador__etapa4__proveedor_proyecto_id', flat=True)
+    )
+    return ids
+
+
+def refrescar_participaciones(ids=None, momento=None):
+    """
+    Recalcula los resúmenes de participaciones.
+
+    Args:
+        ids: IDs (lista o subconsulta) de ProveedorProyecto; None = todas
+        momento: Marca de tiempo a registrar en ``actualizado``
+
+    Returns:
+        Tupla (filas escritas, IDs de proyectos afectados, IDs de empresas afectadas)
+    """
+    momento = momento or timezone.now()
+    participaciones = ProveedorProyecto.objects.all()
+    if ids is not None:
+        participaciones = participaciones.filter(id__in=ids)
+    alcance = participaciones.values('id')
+
+    filas = list(participaciones.order_by().values(
+        'id', 'proveedor_id', 'proyecto_id', 'proyecto__empresa_ancla_id',
+        'etapa_actual', 'estado', 'horas_consumidas', 'horas_planeadas'
+    ))
+    if not filas:
+        return 0, set(), set()
+
+    # Duración de las etapas finalizadas
+    duraciones = defaultdict(dict)
+    for numero, modelo in ETAPAS.items():
+        registros = modelo.objects.filter(
+            proveedor_proyecto__in=alcance,
+            fecha_inicio__isnull=False,
+            fecha_fin__isnull=False
+        ).values_list('proveedor_proyecto_id', 'fecha_inicio', 'fecha_fin')
+        for pp_id, inicio, fin in registros:
+            duraciones[pp_id][numero] = round((fin - inicio).total_seconds() / 86400, 2)
+
+    # Madurez por área
+    madurez = defaultdict(dict)
+    registros = DiagnosticoCompetitividad.objects.filter(
+        etapa1__proveedor_proyecto__in=alcance
+    ).values_list('etapa1__proveedor_proyecto_id', 'area_evaluada', 'nivel_madurez')
+    for pp_id, area, nivel in registros:
+        madurez[pp_id][area] = nivel
+
+    # Tareas
+    tareas = {
+        fila['etapa3__proveedor_proyecto_id']: fila
+        for fila in TareaImplementacion.objects.filter(
+            etapa3__proveedor_proyecto__in=alcance
+        ).order_by().values('etapa3__proveedor_proyecto_id').annotate(
+            total=Count('id'),
+            completadas=Count('id', filter=Q(estado=TareaImplementacion.Estado.COMPLETADA))
+        )
+    }
+
+    # KPIs
+    kpis = defaultdict(list)
+    registros = IndicadorKPI.objects.filter(
+        etapa4__proveedor_proyecto__in=alcance
+    ).values_list('etapa4__proveedor_proyecto_id', 'valor_actual', 'valor_meta')
+    for pp_id, valor_actual, valor_meta in registros:
+        kpis[pp_id].append(_cumplimiento(valor_actual, valor_meta))
+
+    resumenes = []
+    for fila in filas:
+        pp_id = fila['id']
+        areas = madurez.get(pp_id, {})
+        conteo_tareas = tareas.get(pp_id, {'total': 0, 'completadas': 0})
+        cumplimientos = kpis.get(pp_id, [])
+        resumenes.append(ResumenParticipacion(
+            proveedor_proyecto_id=pp_id,
+            proyecto_id=fila['proyecto_id'],
+            empresa_ancla_id=fila['proyecto__empresa_ancla_id'],
+            proveedor_id=fila['proveedor_id'],
+            etapa_actual=fila['etapa_actual'],
+            estado=fila['estado'],
+            duracion_etapa1=duraciones[pp_id].get(1),
+            duracion_etapa2=duraciones[pp_id].get(2),
+            duracion_etapa3=duraciones[pp_id].get(3),
+            duracion_etapa4=duraciones[pp_id].get(4),
+            madurez_promedio=_redondear(sum(areas.values()) / len(areas)) if areas else None,
+            madurez_por_area=areas,
+            tareas_total=conteo_tareas['total'],
+            tareas_completadas=conteo_tareas['completadas'],
+            tasa_completitud=_porcentaje(conteo_tareas['completadas'], conteo_tareas['total']),
+            kpis_total=len(cumplimientos),
+            cumplimiento_kpis=(
+                _redondear(sum(cumplimientos) / len(cumplimientos)) if cumplimientos else None
+            ),
+            horas_consumidas=fila['horas_consumidas'],
+            horas_planeadas=fila['horas_planeadas'],
+            actualizado=momento,
+        ))
+
+    ResumenParticipacion.objects.bulk_create(
+        resumenes,
+        batch_size=LOTE,
+        update_conflicts=True,
+        unique_fields=['proveedor_proyecto'],
+        update_fields=['proyecto', 'empresa_ancla', 'proveedor', 'etapa_actual', 'estado'] + CAMPOS_METRICAS,
+    )
+
+    proyectos = {r.proyecto_id for r in resumenes}
+    empresas = {r.empresa_ancla_id for r in resumenes}
+    return len(resumenes), proyectos, empresas
+
+
+def _agregar_por(campo, ids, ruta_diagnostico):
+    """
+    Agrega los resúmenes de participación por proyecto o empresa ancla.
+
+    Returns:
+        Diccionario {id del grupo: métricas}
+    """
+    base = ResumenParticipacion.objects.filter(**{f'{campo}__in': ids}).order_by()
+
+    grupos = {
+        fila.pop(campo): fila
+        for fila in base.values(campo).annotate(
+            total_proveedores=Count('id'),
+            proveedores_completados=Count(
+                'id', filter=Q(estado=ProveedorProyecto.EstadoParticipacion.COMPLETADO)
+            ),
+            duracion_etapa1=Avg('duracion_etapa1'),
+            duracion_etapa2=Avg('duracion_etapa2'),
+            duracion_etapa3=Avg('duracion_etapa3'),
+            duracion_etapa4=Avg('duracion_etapa4'),
+            tareas_total=Sum('tareas_total'),
+            tareas_completadas=Sum('tareas_completadas'),
+            kpis_total=Sum('kpis_total'),
+            cumplimiento_kpis=Avg('cumplimiento_kpis'),
+            horas_consumidas=Sum('horas_consumidas'),
+            horas_planeadas=Sum('horas_planeadas'),
+        )
+    }
+
+    for grupo, etapa, total in base.values_list(campo, 'etapa_actual').annotate(total=Count('id')):
+        grupos[grupo].setdefault('distribucion_etapas', {})[str(etapa)] = total
+
+    diagnosticos = DiagnosticoCompetitividad.objects.filter(
+        **{f'{ruta_diagnostico}__in': ids}
+    ).order_by()
+    for grupo, promedio in diagnosticos.values_list(ruta_diagnostico).annotate(Avg('nivel_madurez')):
+        if grupo in grupos:
+            grupos[grupo]['madurez_promedio'] = _redondear(promedio)
+    for grupo, area, promedio in diagnosticos.values_list(
+        ruta_diagnostico, 'area_evaluada'
+    ).annotate(Avg('nivel_madurez')):
+        if grupo in grupos:
+            grupos[grupo].setdefault('madurez_por_area', {})[area] = float(_redondear(promedio))
+
+    for metricas in grupos.values():
+        metricas['tasa_completitud'] = _porcentaje(
+            metricas['tareas_completadas'], metricas['tareas_total']
+        )
+        metricas['cumplimiento_kpis'] = _redondear(metricas['cumplimiento_kpis'])
+        metricas.setdefault('distribucion_etapas', {})
+        metricas.setdefault('madurez_promedio', None)
+        metricas.setdefault('madurez_por_area', {})
+    return grupos
+
+
+def refrescar_proyectos(ids, momento=None):
+    """
+    Recalcula los resúmenes de los proyectos indicados; elimina los de
+    proyectos que ya no tienen participaciones.
+    """
+    momento = momento or timezone.now()
+    ids = list(ids)
+    if not ids:
+        return 0
+
+    grupos = _agregar_por('proyecto_id', ids, 'etapa1__proveedor_proyecto__proyecto_id')
+    ResumenProyecto.objects.filter(proyecto_id__in=ids).exclude(proyecto_id__in=list(grupos)).delete()
+    empresas = dict(Proyecto.objects.filter(id__in=ids).values_list('id', 'empresa_ancla_id'))
+
+    resumenes = [
+        ResumenProyecto(proyecto_id=proyecto_id, empresa_ancla_id=empresas[proyecto_id],
+                        actualizado=momento, **metricas)
+        for proyecto_id, metricas in grupos.items()
+        if proyecto_id in empresas
+    ]
+    ResumenProyecto.objects.bulk_create(
+        resumenes,
+        batch_size=LOTE,
+        update_conflicts=True,
+        unique_fields=['proyecto'],
+        update_fields=[
+            'empresa_ancla', 'total_proveedores', 'proveedores_completados', 'distribucion_etapas'
+        ] + CAMPOS_METRICAS,
+    )
+    return len(resumenes)
+
+
+def refrescar_empresas(ids, momento=None):
+    """
+    Recalcula los resúmenes de las empresas ancla indicadas; elimina los de
+    empresas que ya no tienen participaciones.
+    """
+    momento = momento or timezone.now()
+    ids = list(ids)
+    if not ids:
+        return 0
+
+    grupos = _agregar_por(
+        'empresa_ancla_id', ids, 'etapa1__proveedor_proyecto__proyecto__empresa_ancla_id'
+    )
+    ResumenEmpresa.objects.filter(empresa_ancla_id__in=ids).exclude(empresa_ancla_id__in=list(grupos)).delete()
+    proyectos = {
+        fila['empresa_ancla_id']: fila
+        for fila in Proyecto.objects.filter(empresa_ancla_id__in=ids).order_by()
+        .values('empresa_ancla_id').annotate(
+            activos=Count('id', filter=Q(estado=Proyecto.EstadoProyecto.EN_CURSO)),
+            finalizados=Count('id', filter=Q(estado=Proyecto.EstadoProyecto.FINALIZADO)),
+        )
+    }
+
+    resumenes = []
+    for empresa_id, metricas in grupos.items():
+        conteo = proyectos.get(empresa_id, {'activos': 0, 'finalizados': 0})
+        resumenes.append(ResumenEmpresa(
+            empresa_ancla_id=empresa_id,
+            proyectos_activos=conteo['activos'],
+            proyectos_finalizados=conteo['finalizados'],
+            actualizado=momento,
+            **metricas
+        ))
+    ResumenEmpresa.objects.bulk_create(
+        resumenes,
+        batch_size=LOTE,
+        update_conflicts=True,
+        unique_fields=['empresa_ancla'],
+        update_fields=[
+            'proyectos_activos', 'proyectos_finalizados', 'total_proveedores',
+            'proveedores_completados', 'distribucion_etapas'
+        ] + CAMPOS_METRICAS,
+    )
+    return len(resumenes)
+
+
+def refrescar_resumenes(completo=False, participaciones=None):
+    """
+    Refresca las tablas de resúmenes analíticos.
+
+    Args:
+        completo: Recalcular todo (carga nocturna) en lugar de solo los cambios
+        participaciones: IDs (lista o subconsulta) a refrescar explícitamente
+
+    Returns:
+        Diccionario con el número de filas escritas por nivel
+    """
+    momento = timezone.now()
+    # Proyectos y empresas a recalcular aunque ninguna participación cambie
+    # (p. ej. para eliminar el resumen de un proyecto sin participaciones)
+    proyectos_extra, empresas_extra = set(), set()
+
+    if participaciones is not None:
+        ids = participaciones
+    elif completo:
+        ids = None
+    else:
+        desde = ResumenParticipacion.objects.aggregate(ultimo=Max('actualizado'))['ultimo']
+        if desde is not None and replica.leyendo_de_replica():
+            # Cambios anteriores a la última carga que la réplica aún no tenía
+            desde -= timedelta(seconds=settings.REPLICA_FIJACION_SEGUNDOS)
+        ids = None if desde is None else participaciones_modificadas(desde)
+        if desde is not None:
+            for proyecto_id, empresa_id in Proyecto.objects.filter(
+                updated_at__gte=desde
+            ).values_list('id', 'empresa_ancla_id'):
+                proyectos_extra.add(proyecto_id)
+                empresas_extra.add(empresa_id)
+
+    if isinstance(ids, (list, set, tuple)) and not ids and not proyectos_extra:
+        return {'participaciones': 0, 'proyectos': 0, 'empresas': 0}
+
+    total, proyectos, empresas = refrescar_participaciones(ids, momento)
+    stats = {
+        'participaciones': total,
+        'proyectos': refrescar_proyectos(proyectos | proyectos_extra, momento),
+        'empresas': refrescar_empresas(empresas | empresas_extra, momento),
+    }
+    if completo:
+        # Lo que la carga completa no reescribió ya no corresponde a ninguna participación
+        for modelo in (ResumenParticipacion, ResumenProyecto, ResumenEmpresa):
+            modelo.objects.filter(actualizado__lt=momento).delete()
+    logger.info(f"Resúmenes analíticos refrescados: {stats}")
+    return stats
+
+
+def obtener_resumen_empresa(empresa):
+    """
+    Resumen precalculado de la empresa, o None si la tarea programada aún no
+    lo ha generado (las lecturas no refrescan).
+    """
+    return ResumenEmpresa.objects.filter(empresa_ancla=empresa).first()
+
+
+def obtener_resumen_proyecto(proyecto):
+    """
+    Resumen precalculado del proyecto, o None si la tarea programada aún no
+    lo ha generado (las lecturas no refrescan).
+    """
+    return ResumenProyecto.objects.filter(proyecto=proyecto).first()
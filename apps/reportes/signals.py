@@ -0,0 +1,41 @@
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from apps.etapas.models import DiagnosticoCompetitividad, Etapa1Diagnostico
+from apps.proveedores.models import Proveedor
+from .benchmarking import invalidar_cache, invalidar_participacion
+
+# Campos del proveedor que definen sus cohortes o aparecen en el benchmark
+CAMPOS_BENCHMARKING_PROVEEDOR = ('sector_economico', 'tamano_empresa', 'razon_social')
+
+
+@receiver([post_save, post_delete], sender=DiagnosticoCompetitividad)
+def invalidar_benchmarking_diagnostico(sender, instance, **kwargs):
+    """Un diagnóstico cambió: los benchmarks de las cohortes de su participación dejan de ser válidos."""
+    proveedor_proyecto_id = Etapa1Diagnostico.objects.filter(
+        pk=instance.etapa1_id
+    ).values_list('proveedor_proyecto_id', flat=True).first()
+    if proveedor_proyecto_id is not None:
+        invalidar_participacion(proveedor_proyecto_id)
+
+
+@receiver(pre_save, sender=Proveedor)
+def recordar_benchmarking_proveedor(sender, instance, **kwargs):
+    """Guarda los valores previos para invalidar también las cohortes que el proveedor deja."""
+    instance._benchmarking_previo = None if instance._state.adding else (
+        Proveedor.objects.filter(pk=instance.pk).values_list(*CAMPOS_BENCHMARKING_PROVEEDOR).first()
+    )
+
+
+@receiver(post_save, sender=Proveedor)
+def invalidar_benchmarking_proveedor(sender, instance, created, **kwargs):
+    """El sector o tamaño del proveedor define su cohorte."""
+    previo = getattr(instance, '_benchmarking_previo', None)
+    actual = tuple(getattr(instance, campo) for campo in CAMPOS_BENCHMARKING_PROVEEDOR)
+    if created or previo is None or previo == actual:
+        return
+    for cohorte, anterior, nuevo in zip(('sector', 'tamano'), previo, actual):
+        invalidar_cache(cohorte, anterior)
+        invalidar_cache(cohorte, nuevo)
+    for proyecto_id in instance.participaciones.values_list('proyecto_id', flat=True):
+        invalidar_cache('proyecto', proyecto_id)
@@ -0,0 +1,20 @@
+"""
+Tareas de Celery para reportes.
+"""
+from celery import shared_task
+import logging
+
+from apps.core.replica import lectura_replica
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+@lectura_replica
+def refrescar_resumenes_analiticos(completo: bool = False):
+    """Refresca las tablas de resúmenes analíticos (incremental o completo)."""
+    from .services import refrescar_resumenes
+
+    stats = refrescar_resumenes(completo=completo)
+    logger.info(f"Resúmenes analíticos ({'completo' if completo else 'incremental'}): {stats}")
+    return stats
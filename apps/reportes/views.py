@@ -11,6 +11,7 @@ from .models import ReporteGenerado
 class ReporteListView(ConsultorRequiredMixin, ListView):
     model = ReporteGenerado
     template_name = 'reportes/lista.html'
+    usar_replica = True
     context_object_name = 'reportes'
     paginate_by = 20
 
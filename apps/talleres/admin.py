@@ -10,6 +10,15 @@ class SesionInline(admin.TabularInline):
 class InscripcionInline(admin.TabularInline):
     model = InscripcionTaller
     extra = 0
+    # El estado lo gestiona apps.talleres.inscripciones (cupos y lista de espera):
+    # las inscripciones se crean y cancelan desde la API o las vistas
+    readonly_fields = ('estado',)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Taller)
@@ -33,6 +42,13 @@ class InscripcionTallerAdmin(admin.ModelAdmin):
     list_display = ('participante_nombre', 'sesion', 'proveedor', 'estado', 'fecha_inscripcion')
     list_filter = ('estado', 'fecha_inscripcion')
     search_fields = ('participante_nombre', 'participante_email')
+    readonly_fields = ('estado',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(CertificadoTaller)
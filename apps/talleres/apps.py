@@ -5,3 +5,6 @@ class TalleresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.talleres'
     verbose_name = 'Talleres Especializados'
+
+    def ready(self):
+        import apps.talleres.signals  # noqa
@@ -0,0 +1,163 @@
+"""
+Registro masivo de asistencia a sesiones de talleres.
+
+Toda la planilla de una sesión se aplica con ``bulk_create(update_conflicts=True)``
+sobre ``AsistenciaTaller`` (una asistencia por inscripción) y dos ``UPDATE``
+para el estado de las inscripciones, todo en una transacción. Cada fila solo
+sobrescribe los campos que trae: las filas se agrupan por conjunto de campos
+enviados y cada grupo es un upsert (a lo sumo ocho). El modo de check-in por
+QR usa el mismo upsert actualizando ``asistio`` y conserva la hora de entrada
+más temprana, de modo que reenviar las lecturas acumuladas sin conexión es
+idempotente.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from .models import AsistenciaTaller, InscripcionTaller, SesionTaller
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_OPCIONALES = ('hora_entrada', 'hora_salida', 'observaciones')
+
+
+def _inscripciones_validas(sesion, ids):
+    """IDs (como texto) de las inscripciones activas de la sesión entre ``ids``."""
+    return {
+        str(pk) for pk in InscripcionTaller.objects.filter(
+            sesion=sesion, pk__in=ids
+        ).exclude(
+            estado__in=[InscripcionTaller.Estado.CANCELADO, InscripcionTaller.Estado.EN_ESPERA]
+        ).values_list('pk', flat=True)
+    }
+
+
+def _actualizar_estados(asistentes, ausentes):
+    if asistentes:
+        InscripcionTaller.objects.filter(pk__in=asistentes).update(
+            estado=InscripcionTaller.Estado.ASISTIO
+        )
+    if ausentes:
+        InscripcionTaller.objects.filter(pk__in=ausentes).update(
+            estado=InscripcionTaller.Estado.NO_ASISTIO
+        )
+
+
+def registrar_planilla(sesion, registros, finalizar=False):
+    """
+    Aplica la planilla de asistencia de una sesión.
+
+    Args:
+        sesion: ``SesionTaller``
+        registros: Lista de diccionarios con ``inscripcion`` (ID) y
+            opcionalmente asistio, hora_entrada, hora_salida y observaciones
+        finalizar: Marcar la sesión como finalizada
+
+    Returns:
+        Diccionario con registradas, asistentes e ignoradas (IDs que no
+        pertenecen a la sesión, canceladas o en lista de espera)
+    """
+    registros = {str(r['inscripcion']): r for r in registros}
+    validas = _inscripciones_validas(sesion, list(registros))
+
+    # Campos enviados -> asistencias; los campos omitidos no se sobrescriben
+    grupos = defaultdict(list)
+    for pk, registro in registros.items():
+        if pk not in validas:
+            continue
+        campos = ('asistio',) + tuple(campo for campo in CAMPOS_OPCIONALES if campo in registro)
+        grupos[campos].append(AsistenciaTaller(
+            inscripcion_id=pk,
+            asistio=bool(registro.get('asistio', True)),
+            hora_entrada=registro.get('hora_entrada'),
+            hora_salida=registro.get('hora_salida'),
+            observaciones=registro.get('observaciones') or '',
+        ))
+    asistencias = [a for grupo in grupos.values() for a in grupo]
+    asistentes = [a.inscripcion_id for a in asistencias if a.asistio]
+    ausentes = [a.inscripcion_id for a in asistencias if not a.asistio]
+
+    with transaction.atomic():
+        for campos, grupo in grupos.items():
+            AsistenciaTaller.objects.bulk_create(
+                grupo,
+                update_conflicts=True,
+                unique_fields=['inscripcion'],
+                update_fields=list(campos),
+            )
+        _actualizar_estados(asistentes, ausentes)
+        if finalizar:
+            SesionTaller.objects.filter(pk=sesion.pk).update(estado=SesionTaller.Estado.FINALIZADA)
+
+    ignoradas = sorted(set(registros) - validas)
+    logger.info(
+        f"Asistencia sesión {sesion.pk}: {len(asistencias)} registradas, "
+        f"{len(asistentes)} asistentes, {len(ignoradas)} ignoradas"
+    )
+    return {
+        'registradas': len(asistencias),
+        'asistentes': len(asistentes),
+        'ignoradas': ignoradas,
+    }
+
+
+def registrar_checkins(sesion, lecturas):
+    """
+    Registra lecturas de QR (en línea o acumuladas sin conexión).
+
+    Cada lectura crea la asistencia con su hora de entrada; si la asistencia
+    ya existe se marca ``asistio`` y la hora de entrada solo se fija si no
+    tenía o si la lectura es anterior, por lo que repetir una lectura o
+    reenviar un lote no altera la hora registrada.
+
+    Args:
+        lecturas: Lista de diccionarios con ``inscripcion`` (ID del QR) y
+            opcionalmente ``hora`` de la lectura
+
+    Returns:
+        Diccionario con registradas e ignoradas
+    """
+    ahora = timezone.localtime().time().replace(microsecond=0)
+    primeras = {}
+    for lectura in lecturas:
+        pk = str(lectura['inscripcion'])
+        hora = lectura.get('hora') or ahora
+        if pk not in primeras or hora < primeras[pk]:
+            primeras[pk] = hora
+    validas = _inscripciones_validas(sesion, list(primeras))
+
+    asistencias = [
+        AsistenciaTaller(inscripcion_id=pk, asistio=True, hora_entrada=hora)
+        for pk, hora in primeras.items() if pk in validas
+    ]
+    with transaction.atomic():
+        AsistenciaTaller.objects.bulk_create(
+            asistencias,
+            update_conflicts=True,
+            unique_fields=['inscripcion'],
+            update_fields=['asistio'],
+        )
+        # Asistencias previas (p. ej. de la planilla) sin hora o con una posterior
+        if asistencias:
+            AsistenciaTaller.objects.filter(
+                inscripcion_id__in=[a.inscripcion_id for a in asistencias]
+            ).update(hora_entrada=Case(
+                *[
+                    When(
+                        Q(inscripcion_id=a.inscripcion_id)
+                        & (Q(hora_entrada__isnull=True) | Q(hora_entrada__gt=a.hora_entrada)),
+                        then=Value(a.hora_entrada),
+                    )
+                    for a in asistencias
+                ],
+                default=F('hora_entrada'),
+            ))
+        _actualizar_estados([a.inscripcion_id for a in asistencias], [])
+
+    return {
+        'registradas': len(asistencias),
+        'ignoradas': sorted(set(primeras) - validas),
+    }
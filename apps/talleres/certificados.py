@@ -0,0 +1,330 @@
+"""
+Generación y envío por lotes de certificados de talleres.
+
+Las inscripciones con asistencia de una sesión se seleccionan en una sola
+consulta y los PDF se renderizan con ReportLab en un pool de procesos (el
+renderizado es intensivo en CPU). Cada proceso registra las fuentes y carga
+el fondo de la plantilla una única vez en su inicializador; los procesos solo
+reciben diccionarios simples y devuelven los bytes del PDF, sin tocar la base
+de datos. Los certificados se emiten con ``bulk_create`` y los correos se
+envían por una única conexión SMTP.
+
+El renderizado ocurre fuera de cualquier transacción: los certificados se
+reclaman marcando ``reclamado_en`` en una transacción corta y cada PDF
+almacenado se confirma con su propio ``UPDATE`` condicionado al reclamo.
+
+El pool solo puede crearse desde un proceso no daemon: el comando
+``generar_certificados`` o un worker de Celery con ``--pool=solo`` o
+``--pool=threads``. En un worker prefork (daemon) se renderiza en serie.
+"""
+import logging
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FUENTE = 'Helvetica'
+FUENTE_NEGRITA = 'Helvetica-Bold'
+
+# Un reclamo más antiguo se considera abandonado (ejecución caída)
+VIGENCIA_RECLAMO = timedelta(minutes=30)
+
+# Plantilla cargada por proceso (ver ``_inicializar_worker``)
+_PLANTILLA = None
+
+
+def _inicializar_worker(ruta_fondo='', ruta_fuente='', ruta_fuente_negrita=''):
+    """
+    Prepara la plantilla del proceso: registra las fuentes TTF configuradas y
+    carga la imagen de fondo, de modo que cada PDF solo dibuja los textos.
+    """
+    global _PLANTILLA
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    fuente, fuente_negrita = FUENTE, FUENTE_NEGRITA
+    if ruta_fuente:
+        pdfmetrics.registerFont(TTFont('CertificadoRegular', ruta_fuente))
+        fuente = fuente_negrita = 'CertificadoRegular'
+    if ruta_fuente_negrita:
+        pdfmetrics.registerFont(TTFont('CertificadoNegrita', ruta_fuente_negrita))
+        fuente_negrita = 'CertificadoNegrita'
+
+    _PLANTILLA = {
+        'fondo': ImageReader(ruta_fondo) if ruta_fondo else None,
+        'fuente': fuente,
+        'fuente_negrita': fuente_negrita,
+    }
+
+
+def _configuracion_plantilla():
+    return (
+        getattr(settings, 'CERTIFICADOS_FONDO', ''),
+        getattr(settings, 'CERTIFICADOS_FUENTE', ''),
+        getattr(settings, 'CERTIFICADOS_FUENTE_NEGRITA', ''),
+    )
+
+
+def renderizar_pdf(datos):
+    """
+    Renderiza un certificado.
+
+    Args:
+        datos: Diccionario con codigo, participante, proveedor, taller,
+            duracion_horas, fecha y facilitador
+
+    Returns:
+        Tupla (código, bytes del PDF)
+    """
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+
+    if _PLANTILLA is None:
+        _inicializar_worker(*_configuracion_plantilla())
+
+    ancho, alto = landscape(A4)
+    salida = BytesIO()
+    pdf = canvas.Canvas(salida, pagesize=(ancho, alto), pageCompression=1)
+    pdf.setTitle(f"Certificado {datos['codigo']}")
+
+    if _PLANTILLA['fondo'] is not None:
+        pdf.drawImage(_PLANTILLA['fondo'], 0, 0, width=ancho, height=alto)
+    else:
+        pdf.setLineWidth(3)
+        pdf.rect(30, 30, ancho - 60, alto - 60)
+
+    centro = ancho / 2
+    pdf.setFont(_PLANTILLA['fuente_negrita'], 30)
+    pdf.drawCentredString(centro, alto - 140, 'CERTIFICADO DE PARTICIPACIÓN')
+    pdf.setFont(_PLANTILLA['fuente'], 14)
+    pdf.drawCentredString(centro, alto - 200, 'Se certifica que')
+    pdf.setFont(_PLANTILLA['fuente_negrita'], 24)
+    pdf.drawCentredString(centro, alto - 240, datos['participante'])
+    pdf.setFont(_PLANTILLA['fuente'], 14)
+    if datos['proveedor']:
+        pdf.drawCentredString(centro, alto - 265, datos['proveedor'])
+    pdf.drawCentredString(centro, alto - 310, 'participó en el taller')
+    pdf.setFont(_PLANTILLA['fuente_negrita'], 18)
+    pdf.drawCentredString(centro, alto - 340, datos['taller'])
+    pdf.setFont(_PLANTILLA['fuente'], 12)
+    pdf.drawCentredString(
+        centro, alto - 370,
+        f"Intensidad: {datos['duracion_horas']} horas  ·  Fecha: {datos['fecha']}"
+    )
+    if datos['facilitador']:
+        pdf.drawCentredString(centro, 120, datos['facilitador'])
+        pdf.drawCentredString(centro, 105, 'Facilitador')
+    pdf.setFont(_PLANTILLA['fuente'], 9)
+    pdf.drawString(45, 45, f"Código de verificación: {datos['codigo']}")
+
+    pdf.showPage()
+    pdf.save()
+    return datos['codigo'], salida.getvalue()
+
+
+def renderizar_lote(lote, procesos=None):
+    """
+    Renderiza varios certificados en paralelo.
+
+    Dentro de un proceso daemon (p. ej. un worker prefork de Celery) no se
+    pueden crear procesos hijos, por lo que se renderiza en el mismo proceso.
+
+    Returns:
+        Diccionario {código: bytes del PDF}
+    """
+    procesos = procesos or getattr(settings, 'CERTIFICADOS_PROCESOS', 4)
+    procesos = min(procesos, len(lote))
+
+    if procesos <= 1 or multiprocessing.current_process().daemon:
+        return dict(map(renderizar_pdf, lote))
+
+    with ProcessPoolExecutor(
+        max_workers=procesos,
+        initializer=_inicializar_worker,
+        initargs=_configuracion_plantilla(),
+    ) as pool:
+        chunksize = max(1, len(lote) // (procesos * 4))
+        return dict(pool.map(renderizar_pdf, lote, chunksize=chunksize))
+
+
+def nuevo_codigo():
+    return f"CERT-{uuid.uuid4().hex[:8].upper()}"
+
+
+def _datos_certificado(inscripcion, codigo):
+    sesion = inscripcion.sesion
+    taller = sesion.taller
+    facilitador = taller.facilitador.get_full_name() if taller.facilitador else ''
+    return {
+        'codigo': codigo,
+        'participante': inscripcion.participante_nombre,
+        'proveedor': inscripcion.proveedor.razon_social if inscripcion.proveedor else '',
+        'taller': taller.nombre,
+        'duracion_horas': taller.duracion_horas,
+        'fecha': sesion.fecha.strftime('%d/%m/%Y'),
+        'facilitador': facilitador,
+    }
+
+
+def pendientes_sesion(sesion):
+    """Inscripciones con asistencia de la sesión sin certificado o sin PDF (una consulta)."""
+    from .models import InscripcionTaller
+
+    return InscripcionTaller.objects.filter(
+        sesion=sesion, asistencia__asistio=True
+    ).filter(
+        Q(certificado__isnull=True) | Q(certificado__archivo_pdf='') | Q(certificado__archivo_pdf__isnull=True)
+    ).select_related(
+        'sesion__taller__facilitador', 'proveedor', 'certificado'
+    )
+
+
+def generar_certificados(inscripciones, procesos=None):
+    """
+    Emite y renderiza los certificados de las inscripciones dadas.
+
+    Las inscripciones deben venir con ``sesion__taller``, ``proveedor`` y
+    ``certificado`` precargados (ver ``pendientes_sesion``).
+
+    Antes de renderizar, los certificados faltantes se emiten sin PDF (la
+    restricción única de la inscripción descarta los ya emitidos por otra
+    ejecución) y los que siguen sin PDF y sin reclamo vigente se reclaman en
+    una transacción corta: una ejecución concurrente los omite en lugar de
+    renderizarlos de nuevo. El renderizado y el almacenamiento ocurren fuera
+    de la transacción; cada PDF se confirma con un ``UPDATE`` condicionado a
+    que el reclamo siga siendo de esta ejecución (si no, el archivo se borra).
+
+    Returns:
+        Lista de ``CertificadoTaller`` con su PDF almacenado (solo los que
+        esta ejecución generó)
+    """
+    from .models import CertificadoTaller
+
+    inscripciones = {inscripcion.pk: inscripcion for inscripcion in inscripciones}
+    if not inscripciones:
+        return []
+
+    CertificadoTaller.objects.bulk_create(
+        [
+            CertificadoTaller(inscripcion_id=pk, codigo_certificado=nuevo_codigo())
+            for pk, inscripcion in inscripciones.items()
+            if getattr(inscripcion, 'certificado', None) is None
+        ],
+        ignore_conflicts=True,
+    )
+
+    reclamo = timezone.now()
+    with transaction.atomic():
+        certificados = list(
+            CertificadoTaller.objects.select_for_update(skip_locked=True).filter(
+                inscripcion_id__in=list(inscripciones)
+            ).filter(
+                Q(archivo_pdf='') | Q(archivo_pdf__isnull=True)
+            ).filter(
+                Q(reclamado_en__isnull=True) | Q(reclamado_en__lt=reclamo - VIGENCIA_RECLAMO)
+            )
+        )
+        CertificadoTaller.objects.filter(pk__in=[c.pk for c in certificados]).update(reclamado_en=reclamo)
+    if not certificados:
+        return []
+
+    generados = []
+    try:
+        for certificado in certificados:
+            certificado.inscripcion = inscripciones[certificado.inscripcion_id]
+        pdfs = renderizar_lote(
+            [_datos_certificado(c.inscripcion, c.codigo_certificado) for c in certificados], procesos
+        )
+        for certificado in certificados:
+            certificado.archivo_pdf.save(
+                f"{certificado.codigo_certificado}.pdf",
+                ContentFile(pdfs[certificado.codigo_certificado]),
+                save=False,
+            )
+            confirmado = CertificadoTaller.objects.filter(
+                pk=certificado.pk, reclamado_en=reclamo
+            ).update(archivo_pdf=certificado.archivo_pdf.name, reclamado_en=None)
+            if confirmado:
+                generados.append(certificado)
+            else:
+                # Otra ejecución retomó el reclamo vencido
+                certificado.archivo_pdf.delete(save=False)
+    finally:
+        # Libera lo que quedó sin confirmar (p. ej. si el renderizado falló)
+        CertificadoTaller.objects.filter(
+            pk__in=[c.pk for c in certificados], reclamado_en=reclamo
+        ).update(reclamado_en=None)
+
+    logger.info(f"Certificados generados: {len(generados)}")
+    return generados
+
+
+def generar_certificados_sesion(sesion, procesos=None):
+    """Genera los certificados pendientes de una sesión."""
+    return generar_certificados(pendientes_sesion(sesion), procesos)
+
+
+def enviar_certificados(certificados):
+    """
+    Envía los certificados por correo con una única conexión SMTP y marca
+    los enviados con un solo ``bulk_update``.
+
+    Returns:
+        Número de correos enviados
+    """
+    from .models import CertificadoTaller
+
+    mensajes, enviados = [], []
+    for certificado in certificados:
+        inscripcion = certificado.inscripcion
+        if not inscripcion.participante_email or not certificado.archivo_pdf:
+            continue
+        taller = inscripcion.sesion.taller
+        mensaje = EmailMessage(
+            subject=f"Certificado de participación - {taller.nombre}",
+            body=(
+                f"Hola {inscripcion.participante_nombre},\n\n"
+                f"Adjuntamos tu certificado de participación en el taller "
+                f"\"{taller.nombre}\".\n\nCódigo de verificación: {certificado.codigo_certificado}\n"
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[inscripcion.participante_email],
+        )
+        with certificado.archivo_pdf.open('rb') as archivo:
+            mensaje.attach(f"{certificado.codigo_certificado}.pdf", archivo.read(), 'application/pdf')
+        mensajes.append(mensaje)
+        enviados.append(certificado)
+
+    if not mensajes:
+        return 0
+
+    with get_connection() as conexion:
+        total = conexion.send_messages(mensajes) or 0
+
+    ahora = timezone.now()
+    for certificado in enviados:
+        certificado.enviado = True
+        certificado.fecha_envio = ahora
+    CertificadoTaller.objects.bulk_update(enviados, ['enviado', 'fecha_envio'])
+    logger.info(f"Certificados enviados: {total}")
+    return total
+
+
+def certificados_por_enviar(sesion):
+    """Certificados con PDF de la sesión aún no enviados."""
+    from .models import CertificadoTaller
+
+    return CertificadoTaller.objects.filter(
+        inscripcion__sesion=sesion, enviado=False
+    ).exclude(archivo_pdf='').select_related('inscripcion__sesion__taller')
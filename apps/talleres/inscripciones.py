@@ -0,0 +1,167 @@
+"""
+Motor de inscripciones a sesiones de talleres con control de cupo.
+
+El cupo se controla con el contador ``SesionTaller.cupos_ocupados``: cada
+inscripción intenta reservar un cupo con un único ``UPDATE`` condicional
+(``cupos_ocupados < capacidad``), que la base de datos serializa sobre la fila
+de la sesión, de modo que solicitudes concurrentes nunca sobrepasan la
+capacidad y ninguna paga un ``COUNT`` de las inscripciones. Si no hay cupo la
+inscripción queda en lista de espera; al cancelar o eliminar una inscripción
+con cupo, este se transfiere a la primera inscripción en espera.
+``recalcular_cupos`` (comando ``recalcular_cupos``) repara el contador.
+"""
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import InscripcionTaller, SesionTaller
+
+logger = logging.getLogger(__name__)
+
+# Estados que ocupan un cupo de la sesión
+OCUPAN_CUPO = [
+    InscripcionTaller.Estado.INSCRITO,
+    InscripcionTaller.Estado.CONFIRMADO,
+    InscripcionTaller.Estado.ASISTIO,
+    InscripcionTaller.Estado.NO_ASISTIO,
+]
+
+
+def _reservar_cupo(sesion_id, capacidad):
+    """Reserva un cupo de forma atómica. Devuelve False si la sesión está llena."""
+    return SesionTaller.objects.filter(
+        pk=sesion_id, cupos_ocupados__lt=capacidad
+    ).update(cupos_ocupados=F('cupos_ocupados') + 1) == 1
+
+
+def inscribir(sesion, proveedor, participante_nombre, participante_email, participante_cargo=''):
+    """
+    Inscribe a un participante en una sesión o lo deja en lista de espera.
+
+    Una inscripción cancelada previamente con el mismo email se reactiva con
+    una nueva fecha de inscripción, de modo que en la lista de espera queda
+    detrás de quienes ya esperaban.
+
+    Raises:
+        ValueError: Si la sesión no admite inscripciones o el participante ya
+            está inscrito o en espera
+
+    Returns:
+        ``InscripcionTaller`` con estado INSCRITO o EN_ESPERA
+    """
+    if sesion.estado != SesionTaller.Estado.PROGRAMADA:
+        raise ValueError('La sesión no admite inscripciones')
+
+    # Se lee antes de la transacción: la primera sentencia de la transacción
+    # es la escritura sobre la fila de la sesión
+    capacidad = sesion.taller.capacidad_maxima
+    email = participante_email.strip().lower()
+
+    with transaction.atomic():
+        con_cupo = _reservar_cupo(sesion.pk, capacidad)
+        estado = InscripcionTaller.Estado.INSCRITO if con_cupo else InscripcionTaller.Estado.EN_ESPERA
+        try:
+            with transaction.atomic():
+                inscripcion = InscripcionTaller.objects.create(
+                    sesion=sesion,
+                    proveedor=proveedor,
+                    participante_nombre=participante_nombre,
+                    participante_email=email,
+                    participante_cargo=participante_cargo,
+                    estado=estado,
+                )
+        except IntegrityError:
+            inscripcion = InscripcionTaller.objects.select_for_update().get(
+                sesion=sesion, participante_email=email
+            )
+            if inscripcion.estado != InscripcionTaller.Estado.CANCELADO:
+                # Revierte también la reserva del cupo
+                raise ValueError('El participante ya está inscrito en esta sesión')
+            inscripcion.proveedor = proveedor
+            inscripcion.participante_nombre = participante_nombre
+            inscripcion.participante_cargo = participante_cargo
+            inscripcion.estado = estado
+            inscripcion.fecha_inscripcion = timezone.now()
+            inscripcion.confirmacion_enviada = False
+            inscripcion.save()
+
+    return inscripcion
+
+
+def cancelar(inscripcion):
+    """
+    Cancela una inscripción y promueve a la primera inscripción en espera.
+
+    La cancelación es un ``UPDATE`` condicional sobre el estado, por lo que
+    dos cancelaciones simultáneas de la misma inscripción liberan un solo cupo.
+
+    Returns:
+        La inscripción promovida o None
+    """
+    with transaction.atomic():
+        libera_cupo = InscripcionTaller.objects.filter(
+            pk=inscripcion.pk, estado__in=OCUPAN_CUPO
+        ).update(estado=InscripcionTaller.Estado.CANCELADO)
+        if not libera_cupo:
+            InscripcionTaller.objects.filter(
+                pk=inscripcion.pk, estado=InscripcionTaller.Estado.EN_ESPERA
+            ).update(estado=InscripcionTaller.Estado.CANCELADO)
+            return None
+        return liberar_cupo(inscripcion.sesion_id)
+
+
+def liberar_cupo(sesion_id):
+    """
+    Transfiere un cupo liberado a la primera inscripción en espera o, si no
+    hay ninguna, lo descuenta del contador de la sesión.
+
+    Returns:
+        La inscripción promovida o None
+    """
+    with transaction.atomic():
+        en_espera = InscripcionTaller.objects.select_for_update(skip_locked=True).filter(
+            sesion_id=sesion_id, estado=InscripcionTaller.Estado.EN_ESPERA
+        ).order_by('fecha_inscripcion')
+        for promovida in en_espera[:5]:
+            # El cupo liberado pasa a la inscripción promovida; el contador no cambia
+            if InscripcionTaller.objects.filter(
+                pk=promovida.pk, estado=InscripcionTaller.Estado.EN_ESPERA
+            ).update(estado=InscripcionTaller.Estado.INSCRITO):
+                promovida.estado = InscripcionTaller.Estado.INSCRITO
+                break
+        else:
+            promovida = None
+            SesionTaller.objects.filter(
+                pk=sesion_id, cupos_ocupados__gt=0
+            ).update(cupos_ocupados=F('cupos_ocupados') - 1)
+
+    if promovida is not None:
+        logger.info(f"Inscripción {promovida.pk} promovida desde lista de espera")
+    return promovida
+
+
+def lista_espera(sesion):
+    return sesion.inscripciones.filter(
+        estado=InscripcionTaller.Estado.EN_ESPERA
+    ).order_by('fecha_inscripcion')
+
+
+def recalcular_cupos(sesiones=None):
+    """
+    Recalcula el contador de cupos desde las inscripciones (reparación).
+
+    Returns:
+        Número de sesiones corregidas
+    """
+    sesiones = (sesiones if sesiones is not None else SesionTaller.objects.all()).annotate(
+        ocupados=Count('inscripciones', filter=Q(inscripciones__estado__in=OCUPAN_CUPO))
+    ).exclude(cupos_ocupados=F('ocupados'))
+
+    corregidas = []
+    for sesion in sesiones:
+        sesion.cupos_ocupados = sesion.ocupados
+        corregidas.append(sesion)
+    SesionTaller.objects.bulk_update(corregidas, ['cupos_ocupados'], batch_size=500)
+    return len(corregidas)
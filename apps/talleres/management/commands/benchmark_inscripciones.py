@@ -0,0 +1,129 @@
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from apps.proveedores.models import Proveedor
+from apps.talleres import inscripciones
+from apps.talleres.models import InscripcionTaller, SesionTaller, Taller
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga de inscripciones concurrentes a una sesión de taller: '
+        'verifica que no haya sobrecupo y que la lista de espera se promueva al cancelar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solicitudes', type=int, default=500, help='Inscripciones a enviar')
+        parser.add_argument('--capacidad', type=int, default=50, help='Capacidad del taller de prueba')
+        parser.add_argument('--hilos', type=int, default=32, help='Hilos concurrentes')
+        parser.add_argument('--cancelaciones', type=int, default=20, help='Cancelaciones concurrentes')
+        parser.add_argument('--conservar', action='store_true', help='No eliminar los datos de prueba')
+
+    def handle(self, *args, **options):
+        proveedor = Proveedor.objects.first()
+        if proveedor is None:
+            raise CommandError('Se requiere al menos un proveedor registrado')
+
+        taller = Taller.objects.create(
+            nombre=f'Benchmark inscripciones {uuid.uuid4().hex[:6]}',
+            descripcion='Taller temporal de prueba de carga',
+            capacidad_maxima=options['capacidad'],
+        )
+        sesion = SesionTaller.objects.create(
+            taller=taller,
+            fecha=timezone.localdate() + timedelta(days=30),
+            hora_inicio='08:00',
+            hora_fin='12:00',
+            lugar='Benchmark',
+        )
+
+        try:
+            self._inscribir(sesion, proveedor, options)
+            self._cancelar(sesion, options)
+        finally:
+            if not options['conservar']:
+                taller.delete()
+
+    def _concurrente(self, tareas, hilos, funcion):
+        """Ejecuta ``funcion`` sobre ``tareas`` repartidas entre hilos que arrancan a la vez."""
+        barrera = threading.Barrier(hilos)
+        errores = []
+
+        def trabajador(lote):
+            barrera.wait()
+            try:
+                for tarea in lote:
+                    try:
+                        funcion(tarea)
+                    except (DatabaseError, ValueError) as e:
+                        errores.append(e)
+            finally:
+                connection.close()
+
+        lotes = [tareas[i::hilos] for i in range(hilos)]
+        trabajadores = [threading.Thread(target=trabajador, args=(lote,)) for lote in lotes]
+        inicio = time.perf_counter()
+        for t in trabajadores:
+            t.start()
+        for t in trabajadores:
+            t.join()
+        return time.perf_counter() - inicio, errores
+
+    def _verificar(self, sesion, capacidad):
+        sesion.refresh_from_db()
+        estados = InscripcionTaller.objects.filter(sesion=sesion)
+        ocupados = estados.filter(estado__in=inscripciones.OCUPAN_CUPO).count()
+        en_espera = estados.filter(estado=InscripcionTaller.Estado.EN_ESPERA).count()
+
+        if ocupados > capacidad:
+            raise CommandError(f'Sobrecupo: {ocupados} inscritos para {capacidad} cupos')
+        if ocupados != sesion.cupos_ocupados:
+            raise CommandError(
+                f'Contador inconsistente: {sesion.cupos_ocupados} en contador, {ocupados} inscritos'
+            )
+        if en_espera and ocupados < capacidad:
+            raise CommandError(f'Hay {en_espera} en espera con {capacidad - ocupados} cupos libres')
+        return ocupados, en_espera
+
+    def _inscribir(self, sesion, proveedor, options):
+        solicitudes = options['solicitudes']
+        capacidad = options['capacidad']
+
+        def inscribir(i):
+            inscripciones.inscribir(sesion, proveedor, f'Participante {i}', f'participante{i}@benchmark.test')
+
+        duracion, errores = self._concurrente(list(range(solicitudes)), options['hilos'], inscribir)
+        ocupados, en_espera = self._verificar(sesion, capacidad)
+
+        self.stdout.write(
+            f'Inscripciones: {solicitudes} en {duracion:.2f}s '
+            f'({solicitudes / duracion:.0f} sol/s, {options["hilos"]} hilos) | '
+            f'Inscritos: {ocupados}/{capacidad} | En espera: {en_espera} | Errores: {len(errores)}'
+        )
+        if ocupados + en_espera + len(errores) != solicitudes:
+            raise CommandError('Se perdieron solicitudes de inscripción')
+
+    def _cancelar(self, sesion, options):
+        capacidad = options['capacidad']
+        inscritas = list(
+            InscripcionTaller.objects.filter(
+                sesion=sesion, estado__in=inscripciones.OCUPAN_CUPO
+            )[:options['cancelaciones']]
+        )
+
+        duracion, errores = self._concurrente(
+            inscritas, min(options['hilos'], max(len(inscritas), 1)), inscripciones.cancelar
+        )
+        ocupados, en_espera = self._verificar(sesion, capacidad)
+
+        self.stdout.write(
+            f'Cancelaciones: {len(inscritas)} en {duracion:.2f}s | '
+            f'Inscritos: {ocupados}/{capacidad} | En espera: {en_espera} | Errores: {len(errores)}'
+        )
+        self.stdout.write(self.style.SUCCESS('Sin sobrecupo y contador consistente'))
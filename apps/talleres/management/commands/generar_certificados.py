@@ -0,0 +1,41 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.talleres import certificados
+from apps.talleres.models import SesionTaller
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera los certificados pendientes de una o varias sesiones renderizando los PDF '
+        'en un pool de procesos (fuera de los workers daemon de Celery).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sesiones', nargs='*', help='IDs de sesión (por defecto, todas las finalizadas)')
+        parser.add_argument('--procesos', type=int, default=None, help='Procesos de renderizado (CERTIFICADOS_PROCESOS)')
+        parser.add_argument('--enviar', action='store_true', help='Enviar por correo los certificados generados')
+
+    def handle(self, *args, **options):
+        sesiones = SesionTaller.objects.all()
+        if options['sesiones']:
+            try:
+                sesiones = sesiones.filter(pk__in=options['sesiones'])
+                encontradas = sesiones.count()
+            except ValidationError:
+                raise CommandError('Identificador de sesión no válido')
+            if encontradas != len(set(options['sesiones'])):
+                raise CommandError('Alguna de las sesiones indicadas no existe')
+        else:
+            sesiones = sesiones.filter(estado=SesionTaller.Estado.FINALIZADA)
+
+        total = enviados = 0
+        for sesion in sesiones.select_related('taller'):
+            generados = certificados.generar_certificados_sesion(sesion, procesos=options['procesos'])
+            total += len(generados)
+            if options['enviar']:
+                enviados += certificados.enviar_certificados(certificados.certificados_por_enviar(sesion))
+            if generados and options['verbosity'] >= 2:
+                self.stdout.write(f'{sesion}: {len(generados)} certificados')
+
+        self.stdout.write(self.style.SUCCESS(f'Certificados generados: {total}, enviados: {enviados}'))
@@ -0,0 +1,26 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.talleres import inscripciones
+from apps.talleres.models import SesionTaller
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el contador de cupos ocupados de las sesiones desde sus inscripciones.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sesiones', nargs='*', help='IDs de sesión (por defecto, todas)')
+
+    def handle(self, *args, **options):
+        sesiones = SesionTaller.objects.all()
+        if options['sesiones']:
+            try:
+                sesiones = sesiones.filter(pk__in=options['sesiones'])
+                encontradas = sesiones.count()
+            except ValidationError:
+                raise CommandError('Identificador de sesión no válido')
+            if encontradas != len(set(options['sesiones'])):
+                raise CommandError('Alguna de las sesiones indicadas no existe')
+
+        corregidas = inscripciones.recalcular_cupos(sesiones)
+        self.stdout.write(self.style.SUCCESS(f'Sesiones corregidas: {corregidas}'))
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:30
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def inicializar_cupos(apps, schema_editor):
+    """Inicializa el contador de cupos con las inscripciones vigentes."""
+    SesionTaller = apps.get_model('talleres', 'SesionTaller')
+    sesiones = SesionTaller.objects.annotate(
+        ocupados=Count('inscripciones', filter=~Q(inscripciones__estado__in=['CANCELADO', 'EN_ESPERA']))
+    )
+    for sesion in sesiones:
+        sesion.cupos_ocupados = sesion.ocupados
+    SesionTaller.objects.bulk_update(sesiones, ['cupos_ocupados'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("talleres", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sesiontaller",
+            name="cupos_ocupados",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Cupos ocupados"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="inscripciontaller",
+            name="estado",
+            field=models.CharField(
+                choices=[
+                    ("INSCRITO", "Inscrito"),
+                    ("CONFIRMADO", "Confirmado"),
+                    ("ASISTIO", "Asistió"),
+                    ("NO_ASISTIO", "No asistió"),
+                    ("CANCELADO", "Cancelado"),
+                    ("EN_ESPERA", "En lista de espera"),
+                ],
+                default="INSCRITO",
+                max_length=15,
+                verbose_name="Estado",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inscripciontaller",
+            index=models.Index(
+                fields=["sesion", "estado", "fecha_inscripcion"],
+                name="talleres_insc_espera_idx",
+            ),
+        ),
+        migrations.RunPython(inicializar_cupos, migrations.RunPython.noop),
+    ]
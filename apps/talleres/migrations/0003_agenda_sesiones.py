@@ -0,0 +1,19 @@
+# Generated by Django 4.2.21 on 2026-10-19 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("talleres", "0002_cupos_lista_espera"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sesiontaller",
+            index=models.Index(
+                fields=["fecha", "hora_inicio"], name="talleres_sesion_agenda_idx"
+            ),
+        ),
+    ]
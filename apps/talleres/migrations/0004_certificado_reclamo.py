@@ -0,0 +1,23 @@
+# Generated by Django 4.2.21 on 2026-10-19 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("talleres", "0003_agenda_sesiones"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="certificadotaller",
+            name="reclamado_en",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Reclamado para renderizar",
+            ),
+        ),
+    ]
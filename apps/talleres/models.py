@@ -67,19 +67,27 @@ class SesionTaller(models.Model):
     estado = models.CharField('Estado', max_length=15, choices=Estado.choices, default=Estado.PROGRAMADA)
     notas = models.TextField('Notas', blank=True)
     grabacion_url = models.URLField('URL de grabación', blank=True)
+    cupos_ocupados = models.PositiveIntegerField('Cupos ocupados', default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         verbose_name = 'Sesión de Taller'
         verbose_name_plural = 'Sesiones de Talleres'
         ordering = ['-fecha', '-hora_inicio']
+        indexes = [
+            models.Index(fields=['fecha', 'hora_inicio'], name='talleres_sesion_agenda_idx'),
+        ]
 
     def __str__(self):
         return f"{self.taller.nombre} - {self.fecha}"
 
     @property
     def inscritos_count(self):
-        return self.inscripciones.exclude(estado='CANCELADO').count()
+        return self.cupos_ocupados
+
+    @property
+    def cupos_disponibles(self):
+        return max(self.taller.capacidad_maxima - self.cupos_ocupados, 0)
 
 
 class InscripcionTaller(models.Model):
@@ -91,6 +99,7 @@ class InscripcionTaller(models.Model):
         ASISTIO = 'ASISTIO', 'Asistió'
         NO_ASISTIO = 'NO_ASISTIO', 'No asistió'
         CANCELADO = 'CANCELADO', 'Cancelado'
+        EN_ESPERA = 'EN_ESPERA', 'En lista de espera'
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     sesion = models.ForeignKey(SesionTaller, on_delete=models.CASCADE, related_name='inscripciones')
@@ -106,6 +115,9 @@ class InscripcionTaller(models.Model):
         verbose_name = 'Inscripción'
         verbose_name_plural = 'Inscripciones'
         unique_together = ['sesion', 'participante_email']
+        indexes = [
+            models.Index(fields=['sesion', 'estado', 'fecha_inscripcion'], name='talleres_insc_espera_idx'),
+        ]
 
     def __str__(self):
         return f"{self.participante_nombre} - {self.sesion}"
@@ -139,6 +151,7 @@ class CertificadoTaller(models.Model):
     archivo_pdf = models.FileField('PDF', upload_to='talleres/certificados/', blank=True, null=True)
     enviado = models.BooleanField('Enviado', default=False)
     fecha_envio = models.DateTimeField('Fecha de envío', null=True, blank=True)
+    reclamado_en = models.DateTimeField('Reclamado para renderizar', null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = 'Certificado'
@@ -0,0 +1,207 @@
+"""
+Analítica de satisfacción sobre ``EvaluacionTaller``.
+
+Los agregados de cada taller (total, suma e histograma 1-5 de cada
+calificación) se calculan con una consulta agrupada (``Count``, ``Sum`` y
+``Case/When`` para los histogramas) y se cachean por taller. Como sumas e
+histogramas son aditivos, las tarjetas por facilitador o proyecto se componen
+combinando los agregados cacheados de sus talleres, sin recorrer
+evaluaciones. Al guardar o eliminar una evaluación, una sesión o una
+inscripción se descarta el agregado cacheado de su taller al confirmar la
+transacción; la siguiente lectura lo recalcula.
+"""
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Case, Count, IntegerField, Sum, When
+from django.db.models.functions import TruncMonth
+
+from .models import EvaluacionTaller, Taller
+
+logger = logging.getLogger(__name__)
+
+CALIFICACIONES = [
+    'calificacion_general',
+    'calificacion_facilitador',
+    'calificacion_contenido',
+    'calificacion_logistica',
+]
+ESCALA = range(1, 6)
+
+# Agrupación -> campo de Taller
+AGRUPACIONES = {
+    'taller': 'id',
+    'facilitador': 'facilitador_id',
+    'proyecto': 'proyecto_id',
+}
+
+RUTA_TALLER = 'inscripcion__sesion__taller'
+TIEMPO_CACHE = 60 * 60 * 24
+
+
+def _clave(taller_id):
+    return f'satisfaccion:taller:{taller_id}'
+
+
+def _expresiones():
+    """Agregados SQL por grupo: total, sumas e histogramas por calificación."""
+    expresiones = {'n': Count('id')}
+    for campo in CALIFICACIONES:
+        expresiones[f'{campo}__suma'] = Sum(campo)
+        for valor in ESCALA:
+            expresiones[f'{campo}__{valor}'] = Sum(
+                Case(When(**{campo: valor}, then=1), default=0, output_field=IntegerField())
+            )
+    return expresiones
+
+
+def _vacio():
+    return {
+        'n': 0,
+        **{f'{campo}__suma': 0 for campo in CALIFICACIONES},
+        **{f'{campo}__{valor}': 0 for campo in CALIFICACIONES for valor in ESCALA},
+    }
+
+
+def calcular_agregados(taller_ids):
+    """
+    Agregados crudos de varios talleres en una sola consulta agrupada.
+
+    Returns:
+        Diccionario {taller_id (str): agregados}; los talleres sin
+        evaluaciones quedan con ceros
+    """
+    agregados = {str(taller_id): _vacio() for taller_id in taller_ids}
+    filas = EvaluacionTaller.objects.filter(
+        **{f'{RUTA_TALLER}__in': taller_ids}
+    ).values(RUTA_TALLER).annotate(**_expresiones()).order_by()
+
+    for fila in filas:
+        taller_id = str(fila.pop(RUTA_TALLER))
+        agregados[taller_id] = {clave: valor or 0 for clave, valor in fila.items()}
+    return agregados
+
+
+def invalidar_taller(taller_id):
+    """Descarta el agregado cacheado del taller al confirmar la transacción."""
+    transaction.on_commit(lambda: cache.delete(_clave(taller_id)))
+
+
+def agregados_talleres(taller_ids):
+    """
+    Agregados de varios talleres desde caché; los faltantes se calculan juntos.
+
+    Returns:
+        Diccionario {taller_id (str): agregados}
+    """
+    taller_ids = [str(taller_id) for taller_id in taller_ids]
+    en_cache = cache.get_many([_clave(taller_id) for taller_id in taller_ids])
+    agregados = {
+        taller_id: en_cache[_clave(taller_id)]
+        for taller_id in taller_ids if _clave(taller_id) in en_cache
+    }
+
+    faltantes = [taller_id for taller_id in taller_ids if taller_id not in agregados]
+    if faltantes:
+        calculados = calcular_agregados(faltantes)
+        cache.set_many({_clave(taller_id): agregado for taller_id, agregado in calculados.items()}, TIEMPO_CACHE)
+        agregados.update(calculados)
+    return agregados
+
+
+def combinar(agregados):
+    """Suma varios agregados crudos en uno."""
+    total = _vacio()
+    for agregado in agregados:
+        for clave, valor in agregado.items():
+            total[clave] += valor
+    return total
+
+
+def tarjeta(agregado):
+    """
+    Presenta un agregado: promedios y distribución de cada calificación.
+
+    Returns:
+        Diccionario {evaluaciones, <calificación>: {promedio, distribucion}}
+    """
+    n = agregado['n']
+    resultado = {'evaluaciones': n}
+    for campo in CALIFICACIONES:
+        nombre = campo.replace('calificacion_', '')
+        resultado[nombre] = {
+            'promedio': round(agregado[f'{campo}__suma'] / n, 2) if n else None,
+            'distribucion': {str(valor): agregado[f'{campo}__{valor}'] for valor in ESCALA},
+        }
+    return resultado
+
+
+def satisfaccion_taller(taller):
+    """Tarjeta de satisfacción de un taller."""
+    agregado = agregados_talleres([taller.pk])[str(taller.pk)]
+    return tarjeta(agregado)
+
+
+def satisfaccion_por(agrupacion, valor=None):
+    """
+    Tarjetas de satisfacción por taller, facilitador o proyecto.
+
+    Args:
+        agrupacion: 'taller', 'facilitador' o 'proyecto'
+        valor: Limitar a un grupo (ID)
+
+    Returns:
+        Lista de {agrupacion, valor, talleres, ...tarjeta} ordenada por
+        promedio general descendente
+    """
+    if agrupacion not in AGRUPACIONES:
+        raise ValueError(f"Agrupación no válida: {agrupacion}")
+
+    campo = AGRUPACIONES[agrupacion]
+    talleres = Taller.objects.exclude(**{f'{campo}__isnull': True})
+    if valor:
+        talleres = talleres.filter(**{campo: valor})
+    grupos = {}
+    for taller_id, grupo in talleres.values_list('id', campo):
+        grupos.setdefault(str(grupo), []).append(str(taller_id))
+
+    agregados = agregados_talleres([t for ids in grupos.values() for t in ids])
+    resultado = []
+    for grupo, ids in grupos.items():
+        combinado = combinar(agregados[t] for t in ids)
+        resultado.append({'agrupacion': agrupacion, 'valor': grupo, 'talleres': len(ids), **tarjeta(combinado)})
+
+    resultado.sort(key=lambda r: (r['general']['promedio'] is None, -(r['general']['promedio'] or 0)))
+    return resultado
+
+
+def tendencia(agrupacion=None, valor=None):
+    """
+    Promedios mensuales de las calificaciones (consulta agrupada por mes).
+
+    Returns:
+        Lista de {mes, evaluaciones, <calificación>: promedio}
+    """
+    evaluaciones = EvaluacionTaller.objects.all()
+    if agrupacion:
+        if agrupacion not in AGRUPACIONES:
+            raise ValueError(f"Agrupación no válida: {agrupacion}")
+        evaluaciones = evaluaciones.filter(**{f'{RUTA_TALLER}__{AGRUPACIONES[agrupacion]}': valor})
+
+    filas = evaluaciones.annotate(mes=TruncMonth('fecha_evaluacion')).values('mes').annotate(
+        evaluaciones=Count('id'),
+        **{campo.replace('calificacion_', ''): Avg(campo) for campo in CALIFICACIONES}
+    ).order_by('mes')
+
+    return [
+        {
+            **fila,
+            'mes': fila['mes'].strftime('%Y-%m'),
+            **{
+                campo.replace('calificacion_', ''): round(fila[campo.replace('calificacion_', '')], 2)
+                for campo in CALIFICACIONES
+            },
+        }
+        for fila in filas
+    ]
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import EvaluacionTaller, InscripcionTaller, SesionTaller, Taller
+from .inscripciones import OCUPAN_CUPO, liberar_cupo
+from .satisfaccion import invalidar_taller
+
+
+@receiver([post_save, post_delete], sender=EvaluacionTaller)
+def invalidar_satisfaccion(sender, instance, **kwargs):
+    """Descarta el agregado de satisfacción del taller de la evaluación."""
+    taller_id = InscripcionTaller.objects.filter(pk=instance.inscripcion_id).values_list(
+        'sesion__taller_id', flat=True
+    ).first()
+    if taller_id:
+        invalidar_taller(taller_id)
+
+
+@receiver(post_delete, sender=SesionTaller)
+def invalidar_satisfaccion_sesion(sender, instance, origin=None, **kwargs):
+    """Las evaluaciones de la sesión eliminada salen del agregado del taller."""
+    if not isinstance(origin, Taller):
+        invalidar_taller(instance.taller_id)
+
+
+@receiver(post_delete, sender=InscripcionTaller)
+def invalidar_satisfaccion_inscripcion(sender, instance, origin=None, **kwargs):
+    """La evaluación de la inscripción eliminada sale del agregado del taller."""
+    if isinstance(origin, (SesionTaller, Taller)):
+        # Cubierto por la sesión eliminada (o el taller ya no existe)
+        return
+    taller_id = SesionTaller.objects.filter(pk=instance.sesion_id).values_list('taller_id', flat=True).first()
+    if taller_id:
+        invalidar_taller(taller_id)
+
+
+@receiver(post_delete, sender=InscripcionTaller)
+def liberar_cupo_inscripcion(sender, instance, origin=None, **kwargs):
+    """Una inscripción con cupo eliminada libera su cupo y promueve la lista de espera."""
+    if isinstance(origin, (SesionTaller, Taller)) or instance.estado not in OCUPAN_CUPO:
+        # La sesión desaparece con sus inscripciones
+        return
+    liberar_cupo(instance.sesion_id)
@@ -0,0 +1,37 @@
+"""
+Tareas de Celery para talleres.
+"""
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def generar_certificados_sesion(sesion_id, enviar: bool = True):
+    """Genera los certificados pendientes de una sesión y encola su envío."""
+    from .models import SesionTaller
+    from . import certificados
+
+    try:
+        sesion = SesionTaller.objects.get(pk=sesion_id)
+    except SesionTaller.DoesNotExist:
+        logger.warning(f"Sesión {sesion_id} no encontrada para certificados")
+        return 0
+
+    generados = certificados.generar_certificados_sesion(sesion)
+    if enviar and generados:
+        enviar_certificados_sesion.delay(str(sesion.pk))
+    return len(generados)
+
+
+@shared_task
+def enviar_certificados_sesion(sesion_id):
+    """Envía en un solo lote los certificados pendientes de envío de la sesión."""
+    from .models import SesionTaller
+    from . import certificados
+
+    sesion = SesionTaller.objects.filter(pk=sesion_id).first()
+    if sesion is None:
+        return 0
+    return certificados.enviar_certificados(certificados.certificados_por_enviar(sesion))
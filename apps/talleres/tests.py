@@ -0,0 +1,78 @@
+from datetime import time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.proveedores.models import Proveedor
+from . import inscripciones
+from .models import InscripcionTaller, SesionTaller, Taller
+
+
+class InscripcionesTests(TestCase):
+    """Cupos y lista de espera de las sesiones de talleres."""
+
+    def setUp(self):
+        self.proveedor = Proveedor.objects.create(
+            razon_social='Proveedor SAS', nit='800000010', representante_legal='Luis',
+            email='proveedor@example.com', telefono='1', direccion='Calle 1',
+            ciudad='Bogotá', departamento='Cundinamarca',
+        )
+        taller = Taller.objects.create(nombre='Taller', descripcion='Taller', capacidad_maxima=1)
+        self.sesion = SesionTaller.objects.create(
+            taller=taller, fecha=timezone.localdate() + timedelta(days=7),
+            hora_inicio=time(8), hora_fin=time(12), lugar='Sala 1',
+        )
+
+    def _inscribir(self, nombre):
+        return inscripciones.inscribir(self.sesion, self.proveedor, nombre, f'{nombre}@example.com')
+
+    def _cupos(self):
+        self.sesion.refresh_from_db()
+        return self.sesion.cupos_ocupados
+
+    def test_cancelar_promueve_primera_en_espera(self):
+        inscrita = self._inscribir('ana')
+        primera = self._inscribir('beto')
+        segunda = self._inscribir('carla')
+        self.assertEqual(primera.estado, InscripcionTaller.Estado.EN_ESPERA)
+
+        promovida = inscripciones.cancelar(inscrita)
+
+        self.assertEqual(promovida.pk, primera.pk)
+        segunda.refresh_from_db()
+        self.assertEqual(segunda.estado, InscripcionTaller.Estado.EN_ESPERA)
+        self.assertEqual(self._cupos(), 1)
+
+    def test_reinscripcion_tras_cancelar_va_al_final_de_la_espera(self):
+        self._inscribir('ana')
+        beto = self._inscribir('beto')
+        inscripciones.cancelar(beto)
+        carla = self._inscribir('carla')
+
+        beto = self._inscribir('beto')
+
+        self.assertEqual(beto.estado, InscripcionTaller.Estado.EN_ESPERA)
+        self.assertEqual(list(inscripciones.lista_espera(self.sesion)), [carla, beto])
+
+    def test_eliminar_inscripcion_libera_cupo(self):
+        inscrita = self._inscribir('ana')
+        en_espera = self._inscribir('beto')
+
+        inscrita.delete()
+
+        en_espera.refresh_from_db()
+        self.assertEqual(en_espera.estado, InscripcionTaller.Estado.INSCRITO)
+        self.assertEqual(self._cupos(), 1)
+
+        en_espera.delete()
+        self.assertEqual(self._cupos(), 0)
+
+    def test_comando_recalcular_cupos(self):
+        self._inscribir('ana')
+        SesionTaller.objects.filter(pk=self.sesion.pk).update(cupos_ocupados=5)
+
+        call_command('recalcular_cupos', stdout=StringIO())
+
+        self.assertEqual(self._cupos(), 1)
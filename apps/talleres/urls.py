@@ -11,6 +11,7 @@ urlpatterns = [
     path('<uuid:pk>/sesion/', views.SesionCreateView.as_view(), name='sesion_crear'),
     path('sesion/<uuid:pk>/inscribir/', views.InscripcionCreateView.as_view(), name='inscribir'),
     path('sesion/<uuid:pk>/asistencia/', views.registrar_asistencia, name='asistencia'),
+    path('sesion/<uuid:pk>/certificados/', views.generar_certificados_sesion, name='certificados_sesion'),
     path('inscripcion/<uuid:pk>/certificado/', views.generar_certificado, name='certificado'),
     path('inscripcion/<uuid:pk>/evaluar/', views.EvaluacionCreateView.as_view(), name='evaluar'),
 ]
@@ -1,11 +1,17 @@
+from datetime import datetime
+
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
-from django.shortcuts import get_object_or_404
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
+from django.utils import timezone
 from django.views.generic import ListView, CreateView, UpdateView, DetailView
 
+from apps.core import calendario
 from apps.core.mixins import ConsultorRequiredMixin
-from .models import Taller, SesionTaller, InscripcionTaller, AsistenciaTaller, CertificadoTaller, EvaluacionTaller
+from .models import Taller, SesionTaller, InscripcionTaller, EvaluacionTaller
+from . import asistencia, certificados, inscripciones, tasks
 
 
 class TallerListView(ConsultorRequiredMixin, ListView):
@@ -53,7 +59,18 @@ class SesionCreateView(ConsultorRequiredMixin, CreateView):
     fields = ['fecha', 'hora_inicio', 'hora_fin', 'lugar', 'notas']
 
     def form_valid(self, form):
-        form.instance.taller = get_object_or_404(Taller, pk=self.kwargs['pk'])
+        taller = get_object_or_404(Taller, pk=self.kwargs['pk'])
+        form.instance.taller = taller
+
+        datos = form.cleaned_data
+        inicio = timezone.make_aware(datetime.combine(datos['fecha'], datos['hora_inicio']))
+        fin = timezone.make_aware(datetime.combine(datos['fecha'], datos['hora_fin']))
+        cruces = calendario.conflictos(inicio, fin, consultor=taller.facilitador_id, lugar=datos['lugar'])
+        if cruces:
+            messages.warning(
+                self.request,
+                'La sesión se cruza con: ' + ', '.join(evento.titulo for evento in cruces)
+            )
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -66,51 +83,84 @@ class InscripcionCreateView(ConsultorRequiredMixin, CreateView):
     fields = ['proveedor', 'participante_nombre', 'participante_email', 'participante_cargo']
 
     def form_valid(self, form):
-        form.instance.sesion = get_object_or_404(SesionTaller, pk=self.kwargs['pk'])
-        return super().form_valid(form)
+        sesion = get_object_or_404(SesionTaller.objects.select_related('taller'), pk=self.kwargs['pk'])
+        try:
+            self.object = inscripciones.inscribir(sesion, **form.cleaned_data)
+        except ValueError as e:
+            form.add_error(None, str(e))
+            return self.form_invalid(form)
+
+        if self.object.estado == InscripcionTaller.Estado.EN_ESPERA:
+            messages.warning(self.request, 'La sesión está llena; el participante quedó en lista de espera.')
+        else:
+            messages.success(self.request, 'Participante inscrito exitosamente.')
+        return redirect(self.get_success_url())
 
     def get_success_url(self):
         sesion = get_object_or_404(SesionTaller, pk=self.kwargs['pk'])
         return reverse_lazy('talleres:detalle', kwargs={'pk': sesion.taller.pk})
 
 
+@login_required
 def registrar_asistencia(request, pk):
     """Registrar asistencia de una sesión."""
     if request.method != 'POST':
         return JsonResponse({'error': 'Método no permitido'}, status=405)
+    if not (request.user.es_admin or request.user.es_consultor):
+        return JsonResponse({'error': 'No autorizado'}, status=403)
 
     sesion = get_object_or_404(SesionTaller, pk=pk)
-    inscripcion_ids = request.POST.getlist('inscripciones')
+    asistentes = set(request.POST.getlist('inscripciones'))
 
-    for inscripcion in sesion.inscripciones.all():
-        asistio = str(inscripcion.id) in inscripcion_ids
-        AsistenciaTaller.objects.update_or_create(
-            inscripcion=inscripcion,
-            defaults={'asistio': asistio}
-        )
-        inscripcion.estado = 'ASISTIO' if asistio else 'NO_ASISTIO'
-        inscripcion.save()
-
-    sesion.estado = 'FINALIZADA'
-    sesion.save()
+    registros = [
+        {'inscripcion': inscripcion_id, 'asistio': str(inscripcion_id) in asistentes}
+        for inscripcion_id in sesion.inscripciones.values_list('pk', flat=True)
+    ]
+    asistencia.registrar_planilla(sesion, registros, finalizar=True)
 
     return JsonResponse({'success': True})
 
 
+@login_required
 def generar_certificado(request, pk):
-    """Generar certificado para un participante."""
-    inscripcion = get_object_or_404(InscripcionTaller, pk=pk)
+    """Generar certificado (con PDF) para un participante."""
+    if not (request.user.es_admin or request.user.es_consultor):
+        return JsonResponse({'error': 'No autorizado'}, status=403)
+
+    inscripcion = get_object_or_404(
+        InscripcionTaller.objects.select_related('sesion__taller__facilitador', 'proveedor'), pk=pk
+    )
 
     if not hasattr(inscripcion, 'asistencia') or not inscripcion.asistencia.asistio:
         return JsonResponse({'error': 'El participante no asistió al taller'}, status=400)
 
-    import uuid
-    certificado, created = CertificadoTaller.objects.get_or_create(
-        inscripcion=inscripcion,
-        defaults={'codigo_certificado': f"CERT-{uuid.uuid4().hex[:8].upper()}"}
-    )
+    certificado = getattr(inscripcion, 'certificado', None)
+    if certificado is None or not certificado.archivo_pdf:
+        generados = certificados.generar_certificados([inscripcion], procesos=1)
+        if not generados:
+            return JsonResponse({'error': 'El certificado se está generando, intente de nuevo'}, status=409)
+        certificado = generados[0]
+
+    return JsonResponse({
+        'success': True,
+        'codigo': certificado.codigo_certificado,
+        'archivo': certificado.archivo_pdf.url,
+    })
+
+
+@login_required
+def generar_certificados_sesion(request, pk):
+    """Encolar la generación y envío de todos los certificados de una sesión."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Método no permitido'}, status=405)
+    if not (request.user.es_admin or request.user.es_consultor):
+        return JsonResponse({'error': 'No autorizado'}, status=403)
+
+    sesion = get_object_or_404(SesionTaller, pk=pk)
+    enviar = request.POST.get('enviar', '1') != '0'
+    tasks.generar_certificados_sesion.delay(str(sesion.pk), enviar=enviar)
 
-    return JsonResponse({'success': True, 'codigo': certificado.codigo_certificado})
+    return JsonResponse({'success': True, 'encolado': True})
 
 
 class EvaluacionCreateView(ConsultorRequiredMixin, CreateView):
@@ -2,6 +2,13 @@
 ASGI config for gestion_proveedores project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+
+Serving the project through ASGI (e.g. ``gunicorn -k uvicorn.workers.UvicornWorker
+config.asgi:application``) lets the notification stream
+(``/notificaciones/stream/``) hold its Server-Sent Events connections without
+tying up a worker each. The stream is only served when
+``NOTIFICACIONES_STREAM_ACTIVO`` is enabled, which should be done only when
+running under ASGI.
 """
 
 import os
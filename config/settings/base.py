@@ -4,6 +4,7 @@ Django base settings for gestion_proveedores project.
 import os
 from pathlib import Path
 
+from celery.schedules import crontab
 from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -52,11 +53,13 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'apps.core.instrumentacion.InstrumentacionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.replica.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -170,6 +173,21 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_BEAT_SCHEDULE = {
+    'resumenes-analiticos-incremental': {
+        'task': 'apps.reportes.tasks.refrescar_resumenes_analiticos',
+        'schedule': crontab(minute='*/15'),
+    },
+    'resumenes-analiticos-completo': {
+        'task': 'apps.reportes.tasks.refrescar_resumenes_analiticos',
+        'schedule': crontab(hour=2, minute=0),
+        'kwargs': {'completo': True},
+    },
+    'sla-tareas-implementacion': {
+        'task': 'apps.notificaciones.tasks.enviar_recordatorios_tareas',
+        'schedule': crontab(hour=7, minute=0),
+    },
+}
 
 # Email Configuration
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
@@ -185,6 +203,51 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 MAX_UPLOAD_SIZE = 52428800  # 50MB
 
+# Certificados de talleres (renderizado por lotes)
+CERTIFICADOS_PROCESOS = config('CERTIFICADOS_PROCESOS', default=4, cast=int)
+CERTIFICADOS_FONDO = config('CERTIFICADOS_FONDO', default='')
+CERTIFICADOS_FUENTE = config('CERTIFICADOS_FUENTE', default='')
+CERTIFICADOS_FUENTE_NEGRITA = config('CERTIFICADOS_FUENTE_NEGRITA', default='')
+
+# Instrumentación por petición (consultas, tiempo de BD y latencia)
+INSTRUMENTACION_ACTIVA = config('INSTRUMENTACION_ACTIVA', default=True, cast=bool)
+INSTRUMENTACION_MUESTREO = config('INSTRUMENTACION_MUESTREO', default=0.1, cast=float)
+INSTRUMENTACION_UMBRAL_LENTO_MS = config('INSTRUMENTACION_UMBRAL_LENTO_MS', default=1000, cast=int)
+INSTRUMENTACION_CAPACIDAD = config('INSTRUMENTACION_CAPACIDAD', default=500, cast=int)
+INSTRUMENTACION_EXCLUIR = [
+    '/static/', '/media/', '/__debug__/', '/api/instrumentacion/', '/notificaciones/stream/',
+]
+
+# Notificaciones en tiempo real (Server-Sent Events sobre Redis pub/sub).
+# Cada flujo abierto ocupa una conexión hasta NOTIFICACIONES_STREAM_DURACION:
+# activarlo solo al servir con ASGI (gunicorn -k uvicorn.workers.UvicornWorker
+# config.asgi:application). Desactivado, el navbar consulta el contador en caché.
+NOTIFICACIONES_STREAM_ACTIVO = config('NOTIFICACIONES_STREAM_ACTIVO', default=False, cast=bool)
+NOTIFICACIONES_REDIS_URL = config('NOTIFICACIONES_REDIS_URL', default=CELERY_BROKER_URL)
+NOTIFICACIONES_STREAM_DURACION = config('NOTIFICACIONES_STREAM_DURACION', default=300, cast=int)
+
+# Datos de referencia: LRU por proceso delante de la caché compartida, con
+# invalidación difundida por Redis pub/sub (ver apps.core.referencia)
+REFERENCIA_REDIS_URL = config('REFERENCIA_REDIS_URL', default=CELERY_BROKER_URL)
+REFERENCIA_CAPACIDAD_LOCAL = config('REFERENCIA_CAPACIDAD_LOCAL', default=64, cast=int)
+REFERENCIA_TTL_LOCAL = config('REFERENCIA_TTL_LOCAL', default=5, cast=int)
+REFERENCIA_TTL_LOCAL_SUSCRITO = config('REFERENCIA_TTL_LOCAL_SUSCRITO', default=300, cast=int)
+
+# Conexiones a la base de datos: persistentes durante DB_CONN_MAX_AGE segundos
+# con verificación de salud antes de reutilizarlas (web y workers de Celery,
+# cuyo fixup de Django cierra las caducadas o rotas en task_prerun/postrun).
+# DB_PGBOUNCER desactiva los cursores del servidor para pgbouncer en modo
+# transacción; los recorridos grandes usan apps.core.consultas.iterar.
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+DB_PGBOUNCER = config('DB_PGBOUNCER', default=False, cast=bool)
+
+# Réplica de lectura para dashboards, reportes y analítica (ver apps.core.replica).
+# Solo se usa si el alias está definido en DATABASES; la fijación al primario
+# tras escribir debe superar el retraso de replicación esperado.
+DATABASE_ROUTERS = ['apps.core.replica.RouterReplica']
+REPLICA_ALIAS = 'replica'
+REPLICA_FIJACION_SEGUNDOS = config('REPLICA_FIJACION_SEGUNDOS', default=10, cast=int)
+
 # Allowed file types
 ALLOWED_DOCUMENT_TYPES = [
     'application/pdf',
@@ -13,9 +13,21 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_MAX_AGE > 0,
     }
 }
 
+# Read replica for local testing of apps.core.replica: a second SQLite file
+# (e.g. a copy of db.sqlite3) or any database kept in sync with 'default'.
+# DATABASE_REPLICA_NAME=db_replica.sqlite3 python manage.py runserver
+if config('DATABASE_REPLICA_NAME', default=''):
+    DATABASES[REPLICA_ALIAS] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / config('DATABASE_REPLICA_NAME'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
 # For PostgreSQL in development (uncomment if needed):
 # import dj_database_url
 # DATABASES = {
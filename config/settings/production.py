@@ -8,13 +8,28 @@ DEBUG = False
 
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=Csv())
 
-# Database
+# Database: persistent connections with health checks; pgbouncer-safe when
+# DB_PGBOUNCER is set (no server-side cursors)
+OPCIONES_CONEXION = {
+    'conn_max_age': DB_CONN_MAX_AGE,
+    'conn_health_checks': DB_CONN_MAX_AGE > 0,
+}
 DATABASES = {
-    'default': dj_database_url.config(
-        default=config('DATABASE_URL')
-    )
+    'default': {
+        **dj_database_url.config(default=config('DATABASE_URL'), **OPCIONES_CONEXION),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+    }
 }
 
+# Read replica (optional): dashboards, reports and analytics read from it
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES[REPLICA_ALIAS] = {
+        **dj_database_url.parse(DATABASE_REPLICA_URL, **OPCIONES_CONEXION),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+        'TEST': {'MIRROR': 'default'},
+    }
+
 # Security Settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True